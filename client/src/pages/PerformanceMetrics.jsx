@@ -5,29 +5,29 @@ import './PerformanceMetrics.css';
 const PerformanceMetrics = () => {
   const [metrics] = useState({
     contentBased: {
-      rmse: 1.0381,
-      mae: 0.7829,
-      precision: 0.5784,
-      recall: 0.6399,
-      f1Score: 0.6076,
+      rmse: 0.9192,
+      mae: 0.7086,
+      precision: 0.6028,
+      recall: 0.6520,
+      f1Score: 0.6264,
       coverage: 52.78,
       diversity: 1.0000
     },
     collaborative: {
-      rmse: 1.0047,
-      mae: 0.7687,
-      precision: 0.6202,
-      recall: 0.6631,
-      f1Score: 0.6409,
+      rmse: 1.5685,
+      mae: 1.1018,
+      precision: 0.6239,
+      recall: 0.6656,
+      f1Score: 0.6441,
       coverage: 52.78,
       diversity: 1.0000
     },
     hybrid: {
-      rmse: 0.9276,
-      mae: 0.7117,
-      precision: 0.6169,
-      recall: 0.6611,
-      f1Score: 0.6382,
+      rmse: 0.9797,
+      mae: 0.7583,
+      precision: 0.6320,
+      recall: 0.6683,
+      f1Score: 0.6496,
       coverage: 52.78,
       diversity: 1.0000
     }
@@ -36,50 +36,50 @@ const PerformanceMetrics = () => {
   const comparisonData = [
     {
       metric: 'RMSE',
-      'Content-Based': 1.0381,
-      'Collaborative': 1.0047,
-      'Hybrid': 0.9276,
+      'Content-Based': 0.9192,
+      'Collaborative': 1.5685,
+      'Hybrid': 0.9797,
       target: 1.0
     },
     {
       metric: 'MAE',
-      'Content-Based': 0.7829,
-      'Collaborative': 0.7687,
-      'Hybrid': 0.7117
+      'Content-Based': 0.7086,
+      'Collaborative': 1.1018,
+      'Hybrid': 0.7583
     },
     {
       metric: 'Precision@10',
-      'Content-Based': 0.5784,
-      'Collaborative': 0.6202,
-      'Hybrid': 0.6169
+      'Content-Based': 0.6028,
+      'Collaborative': 0.6239,
+      'Hybrid': 0.6320
     },
     {
       metric: 'Recall@10',
-      'Content-Based': 0.6399,
-      'Collaborative': 0.6631,
-      'Hybrid': 0.6611
+      'Content-Based': 0.6520,
+      'Collaborative': 0.6656,
+      'Hybrid': 0.6683
     },
     {
       metric: 'F1-Score',
-      'Content-Based': 0.6076,
-      'Collaborative': 0.6409,
-      'Hybrid': 0.6382
+      'Content-Based': 0.6264,
+      'Collaborative': 0.6441,
+      'Hybrid': 0.6496
     }
   ];
 
   const radarData = [
     {
       metric: 'Accuracy',
-      'Content-Based': 0.65,
-      'Collaborative': 0.72,
-      'Hybrid': 0.85,
+      'Content-Based': 0.85,
+      'Collaborative': 0.45,
+      'Hybrid': 0.80,
       fullMark: 1
     },
     {
       metric: 'Ranking',
-      'Content-Based': 0.61,
+      'Content-Based': 0.63,
       'Collaborative': 0.64,
-      'Hybrid': 0.64,
+      'Hybrid': 0.65,
       fullMark: 1
     },
     {
@@ -132,17 +132,17 @@ const PerformanceMetrics = () => {
         <div className="finding-card best">
           <div className="finding-icon">🏆</div>
           <div className="finding-content">
-            <h3>Best Overall</h3>
-            <p className="finding-value">Hybrid System</p>
-            <p className="finding-desc">RMSE: 0.9276 (10.6% better than Content-Based)</p>
+            <h3>Best Accuracy</h3>
+            <p className="finding-value">Content-Based</p>
+            <p className="finding-desc">RMSE: 0.9192 (6.2% better than Hybrid)</p>
           </div>
         </div>
         <div className="finding-card">
           <div className="finding-icon">🎯</div>
           <div className="finding-content">
             <h3>Best Ranking</h3>
-            <p className="finding-value">Collaborative</p>
-            <p className="finding-desc">F1-Score: 0.6409</p>
+            <p className="finding-value">Hybrid System</p>
+            <p className="finding-desc">F1-Score: 0.6496</p>
           </div>
         </div>
         <div className="finding-card">
@@ -150,7 +150,7 @@ const PerformanceMetrics = () => {
           <div className="finding-content">
             <h3>Target Achieved</h3>
             <p className="finding-value">{'RMSE < 1.0'}</p>
-            <p className="finding-desc">Hybrid system meets production criteria</p>
+            <p className="finding-desc">Content-Based and Hybrid meet production criteria</p>
           </div>
         </div>
       </div>
@@ -341,22 +341,22 @@ const PerformanceMetrics = () => {
           <div className="interpretation-card">
             <h4>RMSE (Root Mean Squared Error)</h4>
             <p><strong>Lower is better</strong></p>
-            <p>Measures prediction accuracy. Our hybrid system achieves 0.9276, meeting the RMSE &lt; 1.0 production target.</p>
+            <p>Measures prediction accuracy. Content-based achieves 0.9192 and the hybrid system 0.9797, both meeting the RMSE &lt; 1.0 production target.</p>
           </div>
           <div className="interpretation-card">
             <h4>Precision@10</h4>
             <p><strong>Higher is better</strong></p>
-            <p>Of top 10 recommendations, how many are relevant? Collaborative achieves 62%, meaning 6+ movies are good matches.</p>
+            <p>Of top 10 recommendations, how many are relevant? Hybrid achieves 63%, meaning 6+ movies are good matches.</p>
           </div>
           <div className="interpretation-card">
             <h4>Recall@10</h4>
             <p><strong>Higher is better</strong></p>
-            <p>Of all relevant movies, how many appear in top 10? Our systems achieve ~66%, capturing most user preferences.</p>
+            <p>Of all relevant movies, how many appear in top 10? Our systems achieve ~65-67%, capturing most user preferences.</p>
           </div>
           <div className="interpretation-card">
             <h4>F1-Score</h4>
             <p><strong>Higher is better</strong></p>
-            <p>Harmonic mean of Precision and Recall. Collaborative's 0.64 shows balanced performance.</p>
+            <p>Harmonic mean of Precision and Recall. Hybrid's 0.65 shows balanced performance.</p>
           </div>
           <div className="interpretation-card">
             <h4>Coverage</h4>
@@ -377,13 +377,13 @@ const PerformanceMetrics = () => {
         <div className="summary-content">
           <div className="conclusion-box">
             <h3>Best Accuracy</h3>
-            <p>✅ <strong>Hybrid System</strong> with RMSE of 0.9276</p>
-            <p>10.6% improvement over Content-Based</p>
-            <p>7.7% improvement over Collaborative</p>
+            <p>✅ <strong>Content-Based Filtering</strong> with RMSE of 0.9192</p>
+            <p>6.2% improvement over Hybrid</p>
+            <p>41.4% improvement over Collaborative</p>
           </div>
           <div className="conclusion-box">
             <h3>Best Ranking</h3>
-            <p>✅ <strong>Collaborative Filtering</strong> with F1-Score of 0.6409</p>
+            <p>✅ <strong>Hybrid System</strong> with F1-Score of 0.6496</p>
             <p>Superior precision and recall</p>
             <p>Best for discovering relevant content</p>
           </div>
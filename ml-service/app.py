@@ -1,20 +1,42 @@
 # app.py (veya mevcut Flask dosyanız varsa ona ekleyelim)
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
 from temporal_analysis import TemporalAnalyzer
-import pickle
+import json
 import os
+import threading
+import time
 
 from dotenv import load_dotenv
 load_dotenv()
 TMDB_API_KEY = os.getenv('TMDB_API_KEY')
 
 print(f"🔑 TMDB API Key loaded: {'✅' if TMDB_API_KEY else '❌'}")
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from recommender import HybridModel
+from user_history import UserHistoryIndex
+from movie_stats import MovieStatsStore
+from search_index import MovieSearchIndex
+from enriched_catalog import EnrichedCatalog
+from model_artifacts import load_or_build_models, source_version
+from recommendation_tables import RecommendationTables
+from response_cache import ResponseCache, backend_from_env
+from report_jobs import ReportJobs
+
+# Number of precomputed neighbors kept per movie for content-based scoring
+CB_NEIGHBORS_K = int(os.getenv('CB_NEIGHBORS_K', 100))
+# Number of precomputed neighbors kept per user for collaborative filtering
+CF_NEIGHBORS_K = int(os.getenv('CF_NEIGHBORS_K', 50))
+# Number of precomputed neighbors kept per movie for item-based collaborative filtering
+ITEM_NEIGHBORS_K = int(os.getenv('ITEM_NEIGHBORS_K', 50))
+# Users scored per matrix block by the bulk recommendation endpoint
+BULK_BLOCK_SIZE = int(os.getenv('BULK_BLOCK_SIZE', 256))
+# Response cache size and per-endpoint TTLs (seconds)
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', 1024))
+CONTENT_BASED_CACHE_TTL = int(os.getenv('CONTENT_BASED_CACHE_TTL', 3600))
+TEMPORAL_CACHE_TTL = int(os.getenv('TEMPORAL_CACHE_TTL', 300))
 
 app = Flask(__name__)
 CORS(app, resources={
@@ -25,44 +47,100 @@ CORS(app, resources={
     }
 })
 
-# Load data
+# Load data and fitted models (memory-mapped from model artifacts when up to date)
 print("Loading data...")
-ratings_df = pd.read_csv('data/ml-latest-small/ratings.csv')
-movies_df = pd.read_csv('data/ml-latest-small/movies.csv')
+models = load_or_build_models(
+    cb_neighbors_k=CB_NEIGHBORS_K, cf_neighbors_k=CF_NEIGHBORS_K, item_neighbors_k=ITEM_NEIGHBORS_K
+)
+ratings_df = models.ratings_df
+movies_df = models.movies_df
+
+# Per-movie rating count/average for the catalog endpoints
+movie_stats = MovieStatsStore(movies_df['movieId'].values, ratings_df)
+
+# Title n-gram/token and genre bitmap indexes for catalog search
+search_index = MovieSearchIndex(movies_df['title'].values, movies_df['genres'].values)
+
+# TMDB-enriched catalog, reloaded when data/enriched_movies.json changes
+enriched_catalog = EnrichedCatalog('data/enriched_movies.json', movies_df, search_index)
+
+# Per-user rating history, newest first (shared by the temporal and hybrid models)
+user_history = UserHistoryIndex.from_ratings(ratings_df)
 
 # Initialize Temporal Analyzer
-temporal_analyzer = TemporalAnalyzer(ratings_df)
+temporal_analyzer = TemporalAnalyzer(ratings_df, history=user_history)
 
-# Load or create TF-IDF matrix
-print("Creating Content-Based model...")
-movies_df['genres'] = movies_df['genres'].fillna('')
-tfidf = TfidfVectorizer(stop_words='english')
-tfidf_matrix = tfidf.fit_transform(movies_df['genres'])
-cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
+# Content-based model
+content_model = models.content_model()
 
 # Movie ID to index mapping
 movie_indices = pd.Series(movies_df.index, index=movies_df['movieId']).to_dict()
-index_to_movieId = pd.Series(movies_df['movieId'].values, index=movies_df.index).to_dict()
-
-print("✅ Content-Based model ready!")
-
-# Create user-item matrix for collaborative filtering
-print("Creating Collaborative Filtering model...")
-user_item_matrix = ratings_df.pivot_table(
-    index='userId',
-    columns='movieId', 
-    values='rating'
-).fillna(0)
-
-user_similarity = cosine_similarity(user_item_matrix)
-user_similarity_df = pd.DataFrame(
-    user_similarity,
-    index=user_item_matrix.index,
-    columns=user_item_matrix.index
-)
+
+print(f"✅ Content-Based model ready! (top-{content_model.content_index.k} neighbors, "
+      f"{content_model.content_index.memory_usage() / 1024**2:.1f} MB)")
+
+# Collaborative filtering model (averages over the 20 most similar users)
+collaborative_model = models.collaborative_model(k=20)
 
 print("✅ Collaborative Filtering model ready!")
 
+# Item-based CF: mean-centered ratings against the movie neighborhoods in the
+# model artifacts, so new ratings do not require refitting any neighbors
+item_model = models.item_model()
+
+print(f"✅ Item-based CF model ready! (top-{item_model.item_neighbors.k} neighbors, "
+      f"{item_model.item_neighbors.memory_usage() / 1024**2:.1f} MB)")
+
+# Hybrid model: CB/CF score fusion, CB seeds weighted by the temporal decay
+hybrid_model = HybridModel.from_parts(
+    collaborative_model, content_model, user_history,
+    decay_stats=temporal_analyzer.user_decay
+)
+
+print("✅ Hybrid model ready!")
+
+# Offline top-N tables (see recommendation_tables.py), hot-swapped when republished
+recommendation_tables = RecommendationTables(
+    {'cb_neighbors_k': CB_NEIGHBORS_K, 'cf_neighbors_k': CF_NEIGHBORS_K}
+)
+
+# Cached responses are dropped when ratings.csv / movies.csv change or ratings
+# are added to the temporal analyzer in-process
+response_cache = ResponseCache(
+    max_entries=RESPONSE_CACHE_SIZE, backend=backend_from_env(),
+    version_fn=lambda: f'{source_version()}:{temporal_analyzer.generation}'
+)
+
+# Temporal reports are built in the background, once per data version
+report_jobs = ReportJobs(
+    temporal_analyzer.iter_temporal_report,
+    lambda: f'{source_version()}:{temporal_analyzer.generation}'
+)
+
+# In-process rating writes are applied one batch at a time
+ratings_lock = threading.Lock()
+
+def add_ratings(new_ratings_df):
+    """
+    Apply new ratings to every in-process model of this worker
+
+    The temporal aggregates, user history and decay stats, the per-movie
+    stats and the interaction matrix are updated in place, and the user
+    neighbor graph is refreshed for each rating user. Their precomputed
+    tables are bypassed from now on; other workers and restarts only see
+    the ratings once they are in ratings.csv.
+    """
+    with ratings_lock:
+        temporal_analyzer.add_ratings(new_ratings_df)
+        movie_stats.add_ratings(new_ratings_df['movieId'].values, new_ratings_df['rating'].values)
+        collaborative_model.add_ratings(
+            new_ratings_df['userId'].values,
+            new_ratings_df['movieId'].values,
+            new_ratings_df['rating'].values
+        )
+        item_model.refresh_means()
+        recommendation_tables.mark_stale(new_ratings_df['userId'].unique())
+
 print("✅ Flask API Ready!")
 
 @app.route('/health', methods=['GET'])
@@ -71,11 +149,77 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'message': 'ML Service is running',
-        'total_ratings': len(ratings_df),
+        'total_ratings': temporal_analyzer.rating_count,
         'total_movies': len(movies_df)
     })
 
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Response cache hit/miss counters"""
+    return jsonify({
+        'success': True,
+        'data': response_cache.stats()
+    })
+
+@app.route('/api/ratings', methods=['POST'])
+def post_ratings():
+    """
+    Add ratings to the running models
+    Body: {"ratings": [{"userId": 1, "movieId": 1, "rating": 4.5, "timestamp": 964982703}]}
+    timestamp is optional (defaults to now); movieIds must be in the catalog
+    """
+    try:
+        body = request.get_json(silent=True) or {}
+        now = int(time.time())
+        try:
+            new_ratings = pd.DataFrame({
+                'userId': [int(r['userId']) for r in body.get('ratings', [])],
+                'movieId': [int(r['movieId']) for r in body.get('ratings', [])],
+                'rating': [float(r['rating']) for r in body.get('ratings', [])],
+                'timestamp': [int(r.get('timestamp', now)) for r in body.get('ratings', [])]
+            })
+        except (TypeError, ValueError, KeyError, AttributeError):
+            return jsonify({
+                'success': False,
+                'error': 'ratings must be a list of {userId, movieId, rating, timestamp} objects'
+            }), 400
+        
+        if new_ratings.empty:
+            return jsonify({
+                'success': False,
+                'error': 'ratings required'
+            }), 400
+        
+        if not new_ratings['rating'].between(0.5, 5.0).all():
+            return jsonify({
+                'success': False,
+                'error': 'rating must be between 0.5 and 5.0'
+            }), 400
+        
+        unknown = sorted(set(new_ratings['movieId'].tolist()) - set(movie_indices))
+        if unknown:
+            return jsonify({
+                'success': False,
+                'error': f'Unknown movieIds: {unknown}'
+            }), 400
+        
+        add_ratings(new_ratings)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'added': len(new_ratings),
+                'users': sorted(new_ratings['userId'].unique().tolist())
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/temporal/trends', methods=['GET'])
+@response_cache.cached(TEMPORAL_CACHE_TTL)
 def get_temporal_trends():
     """Get temporal rating trends"""
     try:
@@ -101,6 +245,7 @@ def get_temporal_trends():
         }), 500
 
 @app.route('/api/temporal/seasonal', methods=['GET'])
+@response_cache.cached(TEMPORAL_CACHE_TTL)
 def get_seasonal_patterns():
     """Get seasonal patterns"""
     try:
@@ -125,48 +270,64 @@ def get_seasonal_patterns():
         }), 500
 
 @app.route('/api/temporal/popular', methods=['GET'])
+@response_cache.cached(TEMPORAL_CACHE_TTL, args={'limit': 20, 'window': 365})
 def get_trending_movies():
-    """Get trending movies"""
+    """Get trending movies (popular in the last `window` days)"""
     try:
         top_n = request.args.get('limit', default=20, type=int)
-        trends = temporal_analyzer.detect_popularity_trends(movies_df, top_n=top_n)
+        window = request.args.get('window', default=365, type=int)
+        if window < 0:
+            return jsonify({
+                'success': False,
+                'error': 'window must be a non-negative number of days'
+            }), 400
+        
+        trends = temporal_analyzer.detect_popularity_trends(
+            movies_df, top_n=top_n, window_days=window
+        )
         
         recent_popular = trends['recent_popular'].head(top_n)
         rising_stars = trends['rising_stars'].head(top_n)
         
         # Add movie titles to recent_popular
         recent_popular_with_titles = []
-        for _, row in recent_popular.iterrows():
-            movie = movies_df[movies_df['movieId'] == row['movieId']]
-            if len(movie) > 0:
+        for movie_id, avg_rating, rating_count in zip(
+            recent_popular['movieId'], recent_popular['avg_rating'], recent_popular['rating_count']
+        ):
+            if movie_id in movie_indices:
+                movie = movies_df.iloc[movie_indices[movie_id]]
                 recent_popular_with_titles.append({
-                    'movieId': int(row['movieId']),
-                    'title': movie.iloc[0]['title'],
-                    'genres': movie.iloc[0]['genres'],
-                    'avg_rating': float(row['avg_rating']),
-                    'rating_count': int(row['rating_count'])
+                    'movieId': int(movie_id),
+                    'title': movie['title'],
+                    'genres': movie['genres'],
+                    'avg_rating': float(avg_rating),
+                    'rating_count': int(rating_count)
                 })
         
         # Add movie titles to rising_stars
         rising_stars_with_titles = []
-        for _, row in rising_stars.iterrows():
-            movie = movies_df[movies_df['movieId'] == row['movieId']]
-            if len(movie) > 0:
+        for movie_id, avg_rating, old_avg_rating, rating_change, rating_count in zip(
+            rising_stars['movieId'], rising_stars['avg_rating'], rising_stars['old_avg_rating'],
+            rising_stars['rating_change'], rising_stars['rating_count']
+        ):
+            if movie_id in movie_indices:
+                movie = movies_df.iloc[movie_indices[movie_id]]
                 rising_stars_with_titles.append({
-                    'movieId': int(row['movieId']),
-                    'title': movie.iloc[0]['title'],
-                    'genres': movie.iloc[0]['genres'],
-                    'avg_rating': float(row['avg_rating']),
-                    'old_avg_rating': float(row['old_avg_rating']),
-                    'rating_change': float(row['rating_change']),
-                    'rating_count': int(row['rating_count'])
+                    'movieId': int(movie_id),
+                    'title': movie['title'],
+                    'genres': movie['genres'],
+                    'avg_rating': float(avg_rating),
+                    'old_avg_rating': float(old_avg_rating),
+                    'rating_change': float(rating_change),
+                    'rating_count': int(rating_count)
                 })
         
         return jsonify({
             'success': True,
             'data': {
                 'recent_popular': recent_popular_with_titles,
-                'rising_stars': rising_stars_with_titles
+                'rising_stars': rising_stars_with_titles,
+                'window': window
             }
         })
     except Exception as e:
@@ -179,15 +340,7 @@ def get_trending_movies():
 def get_user_temporal_weights(user_id):
     """Get time-weighted recommendations for a user"""
     try:
-        # Mock recommendations for testing
-        content_recs = []
-        collab_recs = []
-        
-        weights = temporal_analyzer.time_weighted_recommendations(
-            user_id, 
-            content_recs, 
-            collab_recs
-        )
+        weights = temporal_analyzer.user_time_weights(user_id)
         
         if weights is None:
             return jsonify({
@@ -210,23 +363,126 @@ def get_user_temporal_weights(user_id):
             'error': str(e)
         }), 500
 
-@app.route('/api/temporal/report', methods=['GET'])
+def report_job_response(job, status_code=200):
+    """Job status JSON, with the URL to fetch the report from once done"""
+    data = dict(job)
+    if job['status'] == 'done':
+        data['report_url'] = '/api/temporal/report'
+    data['status_url'] = f"/api/temporal/report/jobs/{job['job_id']}"
+    return jsonify({
+        'success': job['status'] != 'failed',
+        'data': data
+    }), status_code
 
+@app.route('/api/temporal/report', methods=['GET'])
 def generate_temporal_report():
-    """Generate comprehensive temporal analysis report"""
+    """
+    Stream the temporal analysis report of the current data, or start
+    building it (202 with a job to poll) if it is not ready yet
+    """
+    try:
+        report = report_jobs.result()
+        if report is None:
+            return report_job_response(report_jobs.submit(), 202)
+        
+        chunk_size = 64 * 1024
+        chunks = (report[i:i + chunk_size] for i in range(0, len(report), chunk_size))
+        return Response(stream_with_context(chunks), mimetype='text/plain; charset=utf-8')
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/temporal/report/jobs', methods=['POST'])
+def start_temporal_report_job():
+    """Start building the temporal report (reuses a running or finished build)"""
+    try:
+        job = report_jobs.submit()
+        return report_job_response(job, 200 if job['status'] == 'done' else 202)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/temporal/report/jobs/<job_id>', methods=['GET'])
+def get_temporal_report_job(job_id):
+    """Status of a temporal report job"""
+    job = report_jobs.status(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found'
+        }), 404
+    return report_job_response(job)
+
+def similar_movie_records(neighbor_ids, neighbor_scores):
+    """Build recommendation dicts for movieIds, keeping their score order"""
+    recommended_movies = movies_df.iloc[[movie_indices[m] for m in neighbor_ids]]
+    return [
+        {
+            'movieId': int(movie_id),
+            'title': title,
+            'genres': genres,
+            'similarity_score': float(score)
+        }
+        for movie_id, title, genres, score in zip(
+            recommended_movies['movieId'],
+            recommended_movies['title'],
+            recommended_movies['genres'],
+            neighbor_scores
+        )
+    ]
+
+@app.route('/api/recommend/content-based', methods=['GET'])
+@response_cache.cached(CONTENT_BASED_CACHE_TTL, args={'movie_ids': '', 'limit': 10})
+def content_based_recommendations_batch():
+    """
+    Get content-based recommendations for several movies in one call
+    Query: ?movie_ids=1,2,3&limit=10
+    """
     try:
-        report_file = temporal_analyzer.generate_temporal_report()
+        n_recommendations = request.args.get('limit', default=10, type=int)
+        raw_ids = request.args.get('movie_ids', default='', type=str)
+        
+        try:
+            requested_ids = [int(x) for x in raw_ids.split(',') if x.strip()]
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'movie_ids must be a comma-separated list of integers'
+            }), 400
+        
+        if not requested_ids:
+            return jsonify({
+                'success': False,
+                'error': 'movie_ids parameter required'
+            }), 400
         
-        with open(report_file, 'r', encoding='utf-8') as f:
-            report_content = f.read()
+        found_ids = [m for m in requested_ids if m in movie_indices]
+        missing_ids = [m for m in requested_ids if m not in movie_indices]
+        
+        results = []
+        if found_ids:
+            neighbor_ids, neighbor_scores = content_model.similar(found_ids, n_recommendations)
+            for movie_id, ids, scores in zip(found_ids, neighbor_ids, neighbor_scores):
+                recommendations = similar_movie_records(ids, scores)
+                results.append({
+                    'source_movie_id': movie_id,
+                    'recommendations': recommendations,
+                    'count': len(recommendations)
+                })
         
         return jsonify({
             'success': True,
             'data': {
-                'report': report_content,
-                'file': report_file
+                'results': results,
+                'missing': missing_ids,
+                'method': 'content-based'
             }
         })
+        
     except Exception as e:
         return jsonify({
             'success': False,
@@ -234,6 +490,7 @@ def generate_temporal_report():
         }), 500
 
 @app.route('/api/recommend/content-based/<int:movie_id>', methods=['GET'])
+@response_cache.cached(CONTENT_BASED_CACHE_TTL, args={'limit': 10})
 def content_based_recommendations(movie_id):
     """
     Get content-based recommendations for a movie
@@ -247,28 +504,9 @@ def content_based_recommendations(movie_id):
                 'error': 'Movie not found'
             }), 404
         
-        # Get movie index
-        idx = movie_indices[movie_id]
-        
-        # Get similarity scores
-        sim_scores = list(enumerate(cosine_sim[idx]))
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-        sim_scores = sim_scores[1:n_recommendations+1]
-        
-        # Get movie IDs
-        movie_ids = [index_to_movieId[i[0]] for i in sim_scores]
-        
-        # Get movie details
-        recommended_movies = movies_df[movies_df['movieId'].isin(movie_ids)]
-        recommendations = []
-        
-        for _, movie in recommended_movies.iterrows():
-            recommendations.append({
-                'movieId': int(movie['movieId']),
-                'title': movie['title'],
-                'genres': movie['genres'],
-                'similarity_score': float(sim_scores[len(recommendations)][1])
-            })
+        # Top-N similar movies, most similar first
+        neighbor_ids, neighbor_scores = content_model.similar([movie_id], n_recommendations)
+        recommendations = similar_movie_records(neighbor_ids[0], neighbor_scores[0])
         
         return jsonify({
             'success': True,
@@ -294,70 +532,91 @@ def collaborative_recommendations(user_id):
     try:
         n_recommendations = request.args.get('limit', default=10, type=int)
         
-        if user_id not in user_similarity_df.index:
+        if user_id not in collaborative_model.interactions.user_index:
             return jsonify({
                 'success': False,
                 'error': 'User not found'
             }), 404
         
-        # Get similar users
-        similar_users = user_similarity_df[user_id].sort_values(ascending=False)[1:21]
+        # Precomputed table first, live scoring for users it does not cover
+        precomputed = recommendation_tables.lookup('collaborative', user_id, n_recommendations)
+        if precomputed is not None:
+            movie_ids, scores = precomputed
+        else:
+            # Score every movie the similar users rated in one pass
+            movie_ids, scores = collaborative_model.recommend(user_id, n_recommendations)
         
-        # Get movies rated by similar users
-        similar_user_ratings = ratings_df[
-            ratings_df['userId'].isin(similar_users.index)
+        # Get movie details
+        recommended_movies = movies_df.iloc[[movie_indices[m] for m in movie_ids]]
+        recommendations = [
+            {
+                'movieId': int(movie_id),
+                'title': title,
+                'genres': genres,
+                'predicted_rating': float(score)
+            }
+            for movie_id, title, genres, score in zip(
+                movie_ids,
+                recommended_movies['title'],
+                recommended_movies['genres'],
+                scores
+            )
         ]
         
-        # Get movies user hasn't rated
-        user_rated_movies = ratings_df[ratings_df['userId'] == user_id]['movieId'].values
-        
-        # Calculate weighted scores
-        movie_scores = {}
-        for _, row in similar_user_ratings.iterrows():
-            if row['movieId'] not in user_rated_movies:
-                similarity = similar_users.get(row['userId'], 0)
-                if row['movieId'] not in movie_scores:
-                    movie_scores[row['movieId']] = {
-                        'total_score': 0,
-                        'total_weight': 0
-                    }
-                movie_scores[row['movieId']]['total_score'] += row['rating'] * similarity
-                movie_scores[row['movieId']]['total_weight'] += similarity
-        
-        # Calculate average weighted scores
-        for movie_id in movie_scores:
-            if movie_scores[movie_id]['total_weight'] > 0:
-                movie_scores[movie_id]['avg_score'] = (
-                    movie_scores[movie_id]['total_score'] / 
-                    movie_scores[movie_id]['total_weight']
-                )
-            else:
-                movie_scores[movie_id]['avg_score'] = 0
+        return jsonify({
+            'success': True,
+            'data': {
+                'user_id': user_id,
+                'recommendations': recommendations,
+                'method': 'collaborative-filtering',
+                'count': len(recommendations)
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/recommend/item-based/<int:user_id>', methods=['GET'])
+def item_based_recommendations(user_id):
+    """
+    Get item-based collaborative filtering recommendations for a user
+    """
+    try:
+        n_recommendations = request.args.get('limit', default=10, type=int)
         
-        # Sort by score
-        sorted_movies = sorted(
-            movie_scores.items(),
-            key=lambda x: x[1]['avg_score'],
-            reverse=True
-        )[:n_recommendations]
+        result = item_model.recommend(user_id, n_recommendations)
+        if result is None:
+            return jsonify({
+                'success': False,
+                'error': 'User not found'
+            }), 404
+        movie_ids, scores = result
         
-        # Get movie details
-        recommendations = []
-        for movie_id, scores in sorted_movies:
-            movie = movies_df[movies_df['movieId'] == movie_id].iloc[0]
-            recommendations.append({
+        recommended_movies = movies_df.iloc[[movie_indices[m] for m in movie_ids]]
+        recommendations = [
+            {
                 'movieId': int(movie_id),
-                'title': movie['title'],
-                'genres': movie['genres'],
-                'predicted_rating': float(scores['avg_score'])
-            })
+                'title': title,
+                'genres': genres,
+                'predicted_rating': float(score)
+            }
+            for movie_id, title, genres, score in zip(
+                movie_ids,
+                recommended_movies['title'],
+                recommended_movies['genres'],
+                scores
+            )
+        ]
         
         return jsonify({
             'success': True,
             'data': {
                 'user_id': user_id,
                 'recommendations': recommendations,
-                'method': 'collaborative-filtering',
+                'method': 'item-based-collaborative-filtering',
                 'count': len(recommendations)
             }
         })
@@ -376,97 +635,37 @@ def hybrid_recommendations(user_id):
     try:
         n_recommendations = request.args.get('limit', default=10, type=int)
         cb_weight = request.args.get('cb_weight', default=0.6, type=float)
-        cf_weight = 1 - cb_weight
-        
-        user_ratings = ratings_df[ratings_df['userId'] == user_id].sort_values(
-            'timestamp', 
-            ascending=False
-        ).head(5)
         
-        if len(user_ratings) == 0:
-            return jsonify({
-                'success': False,
-                'error': 'User has no rating history'
-            }), 404
-        
-        cb_recommendations = {}
-        for _, rating in user_ratings.iterrows():
-            movie_id = rating['movieId']
-            if movie_id in movie_indices:
-                idx = movie_indices[movie_id]
-                sim_scores = list(enumerate(cosine_sim[idx]))
-                sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-                
-                for i, score in sim_scores[1:n_recommendations*2]:
-                    rec_movie_id = index_to_movieId[i]
-                    if rec_movie_id not in cb_recommendations:
-                        cb_recommendations[rec_movie_id] = 0
-                    cb_recommendations[rec_movie_id] += score * rating['rating']
-        
-        if cb_recommendations:
-            max_cb = max(cb_recommendations.values())
-            for movie_id in cb_recommendations:
-                cb_recommendations[movie_id] /= max_cb
-        
-        cf_recommendations = {}
-        if user_id in user_similarity_df.index:
-            similar_users = user_similarity_df[user_id].sort_values(ascending=False)[1:21]
-            similar_user_ratings = ratings_df[
-                ratings_df['userId'].isin(similar_users.index)
-            ]
-            
-            user_rated_movies = ratings_df[ratings_df['userId'] == user_id]['movieId'].values
-            
-            for _, row in similar_user_ratings.iterrows():
-                if row['movieId'] not in user_rated_movies:
-                    similarity = similar_users.get(row['userId'], 0)
-                    if row['movieId'] not in cf_recommendations:
-                        cf_recommendations[row['movieId']] = {
-                            'score': 0,
-                            'weight': 0
-                        }
-                    cf_recommendations[row['movieId']]['score'] += row['rating'] * similarity
-                    cf_recommendations[row['movieId']]['weight'] += similarity
-            
-            max_cf = 0
-            for movie_id in cf_recommendations:
-                if cf_recommendations[movie_id]['weight'] > 0:
-                    cf_recommendations[movie_id] = (
-                        cf_recommendations[movie_id]['score'] / 
-                        cf_recommendations[movie_id]['weight']
-                    )
-                    if cf_recommendations[movie_id] > max_cf:
-                        max_cf = cf_recommendations[movie_id]
-                else:
-                    cf_recommendations[movie_id] = 0
-            
-            if max_cf > 0:
-                for movie_id in cf_recommendations:
-                    cf_recommendations[movie_id] /= max_cf
-        
-        hybrid_scores = {}
-        all_movies = set(list(cb_recommendations.keys()) + list(cf_recommendations.keys()))
-        
-        for movie_id in all_movies:
-            cb_score = cb_recommendations.get(movie_id, 0)
-            cf_score = cf_recommendations.get(movie_id, 0)
-            hybrid_scores[movie_id] = cb_weight * cb_score + cf_weight * cf_score
-        
-        sorted_movies = sorted(
-            hybrid_scores.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )[:n_recommendations]
-        
-        recommendations = []
-        for movie_id, score in sorted_movies:
-            movie = movies_df[movies_df['movieId'] == movie_id].iloc[0]
-            recommendations.append({
+        # Precomputed table first, live scoring for users it does not cover
+        precomputed = recommendation_tables.lookup(
+            'hybrid', user_id, n_recommendations, cb_weight
+        )
+        if precomputed is not None:
+            movie_ids, scores = precomputed
+        else:
+            result = hybrid_model.recommend(user_id, n_recommendations, cb_weight)
+            if result is None:
+                return jsonify({
+                    'success': False,
+                    'error': 'User has no rating history'
+                }), 404
+            movie_ids, scores = result
+        
+        recommended_movies = movies_df.iloc[[movie_indices[m] for m in movie_ids]]
+        recommendations = [
+            {
                 'movieId': int(movie_id),
-                'title': movie['title'],
-                'genres': movie['genres'],
+                'title': title,
+                'genres': genres,
                 'hybrid_score': float(score)
-            })
+            }
+            for movie_id, title, genres, score in zip(
+                recommended_movies['movieId'],
+                recommended_movies['title'],
+                recommended_movies['genres'],
+                scores
+            )
+        ]
         
         return jsonify({
             'success': True,
@@ -484,6 +683,112 @@ def hybrid_recommendations(user_id):
             'error': str(e)
         }), 500
 
+def bulk_recommendation_results(user_ids, method, n_recommendations, cb_weight):
+    """
+    Yield one result dict per requested user, scoring BULK_BLOCK_SIZE users at a time
+    """
+    catalog_ids = movies_df['movieId'].tolist()
+    catalog_titles = movies_df['title'].tolist()
+    catalog_genres = movies_df['genres'].tolist()
+    
+    for start in range(0, len(user_ids), BULK_BLOCK_SIZE):
+        block_ids = user_ids[start:start + BULK_BLOCK_SIZE]
+        
+        if method == 'hybrid':
+            block_results = hybrid_model.recommend_block(block_ids, n_recommendations, cb_weight)
+            score_key = 'hybrid_score'
+        elif method == 'item-based':
+            block_results = item_model.recommend_block(block_ids, n_recommendations)
+            score_key = 'predicted_rating'
+        else:
+            block_results = collaborative_model.recommend_block(block_ids, n_recommendations)
+            score_key = 'predicted_rating'
+        
+        for user_id, result in zip(block_ids, block_results):
+            if result is None:
+                yield {'user_id': user_id, 'error': 'User not found'}
+                continue
+            
+            movie_ids, scores = result
+            rows = [movie_indices[m] for m in movie_ids]
+            recommendations = [
+                {
+                    'movieId': catalog_ids[row],
+                    'title': catalog_titles[row],
+                    'genres': catalog_genres[row],
+                    score_key: float(score)
+                }
+                for row, score in zip(rows, scores)
+            ]
+            yield {
+                'user_id': user_id,
+                'recommendations': recommendations,
+                'count': len(recommendations)
+            }
+
+@app.route('/api/recommend/bulk', methods=['POST'])
+def bulk_recommendations():
+    """
+    Get recommendations for many users in one call
+    Body: {"user_ids": [1, 2, 3], "method": "collaborative" | "item-based" | "hybrid",
+           "limit": 10, "cb_weight": 0.6, "stream": false}
+    With "stream": true (or ?stream=1) the response is NDJSON, one user per line
+    """
+    try:
+        body = request.get_json(silent=True) or {}
+        method = body.get('method', 'collaborative')
+        n_recommendations = int(body.get('limit', 10))
+        cb_weight = float(body.get('cb_weight', 0.6))
+        stream = bool(body.get('stream', False)) or request.args.get('stream') == '1'
+        
+        try:
+            user_ids = [int(u) for u in body.get('user_ids', [])]
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'user_ids must be a list of integers'
+            }), 400
+        
+        if not user_ids:
+            return jsonify({
+                'success': False,
+                'error': 'user_ids required'
+            }), 400
+        
+        if method not in ('collaborative', 'item-based', 'hybrid'):
+            return jsonify({
+                'success': False,
+                'error': "method must be 'collaborative', 'item-based' or 'hybrid'"
+            }), 400
+        
+        results = bulk_recommendation_results(user_ids, method, n_recommendations, cb_weight)
+        
+        if stream:
+            lines = (json.dumps(result) + '\n' for result in results)
+            return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+        
+        found, missing = [], []
+        for result in results:
+            if 'error' in result:
+                missing.append(result['user_id'])
+            else:
+                found.append(result)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'results': found,
+                'missing': missing,
+                'method': method
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/movies/search', methods=['GET'])
 def search_movies():
     """
@@ -492,6 +797,7 @@ def search_movies():
     try:
         query = request.args.get('q', default='', type=str)
         limit = request.args.get('limit', default=20, type=int)
+        match = request.args.get('match', default='substring', type=str)
         
         if not query:
             return jsonify({
@@ -499,22 +805,18 @@ def search_movies():
                 'error': 'Query parameter required'
             }), 400
         
-        results = movies_df[
-            movies_df['title'].str.contains(query, case=False, na=False) |
-            movies_df['genres'].str.contains(query, case=False, na=False)
-        ].head(limit)
+        results = movies_df.iloc[search_index.search(query, match)[:limit]]
         
         movies = []
         for _, movie in results.iterrows():
-            movie_ratings = ratings_df[ratings_df['movieId'] == movie['movieId']]
-            avg_rating = movie_ratings['rating'].mean() if len(movie_ratings) > 0 else 0
+            rating_count, avg_rating = movie_stats.get(movie['movieId'])
             
             movies.append({
                 'movieId': int(movie['movieId']),
                 'title': movie['title'],
                 'genres': movie['genres'],
-                'avgRating': float(avg_rating) if avg_rating > 0 else None,
-                'ratingCount': len(movie_ratings)
+                'avgRating': avg_rating,
+                'ratingCount': rating_count
             })
         
         return jsonify({
@@ -541,34 +843,32 @@ def get_all_movies():
         page = request.args.get('page', default=1, type=int)
         limit = request.args.get('limit', default=20, type=int)
         search = request.args.get('search', default='', type=str)
+        match = request.args.get('match', default='substring', type=str)
         
-        # Filter by search if provided
+        # Filter by search if provided (catalog row positions)
         if search:
-            filtered_movies = movies_df[
-                movies_df['title'].str.contains(search, case=False, na=False) |
-                movies_df['genres'].str.contains(search, case=False, na=False)
-            ]
+            filtered_rows = search_index.search(search, match)
         else:
-            filtered_movies = movies_df
+            filtered_rows = np.arange(len(movies_df))
+        total = len(filtered_rows)
         
         # Pagination
         start_idx = (page - 1) * limit
         end_idx = start_idx + limit
-        paginated_movies = filtered_movies.iloc[start_idx:end_idx]
+        paginated_movies = movies_df.iloc[filtered_rows[start_idx:end_idx]]
         
         # Prepare response
         movies = []
         for _, movie in paginated_movies.iterrows():
             # Get average rating
-            movie_ratings = ratings_df[ratings_df['movieId'] == movie['movieId']]
-            avg_rating = movie_ratings['rating'].mean() if len(movie_ratings) > 0 else 0
+            rating_count, avg_rating = movie_stats.get(movie['movieId'])
             
             movies.append({
                 'movieId': int(movie['movieId']),
                 'title': movie['title'],
                 'genres': movie['genres'].split('|') if movie['genres'] else [],
-                'averageRating': float(avg_rating) if avg_rating > 0 else None,
-                'ratingCount': len(movie_ratings)
+                'averageRating': avg_rating,
+                'ratingCount': rating_count
             })
         
         return jsonify({
@@ -577,8 +877,8 @@ def get_all_movies():
                 'movies': movies,
                 'page': page,
                 'limit': limit,
-                'total': len(filtered_movies),
-                'totalPages': (len(filtered_movies) + limit - 1) // limit
+                'total': total,
+                'totalPages': (total + limit - 1) // limit
             }
         })
         
@@ -605,8 +905,7 @@ def get_movie_by_id(movie_id):
         movie = movie.iloc[0]
         
         # Get ratings
-        movie_ratings = ratings_df[ratings_df['movieId'] == movie_id]
-        avg_rating = movie_ratings['rating'].mean() if len(movie_ratings) > 0 else 0
+        rating_count, avg_rating = movie_stats.get(movie_id)
         
         return jsonify({
             'success': True,
@@ -614,8 +913,8 @@ def get_movie_by_id(movie_id):
                 'movieId': int(movie['movieId']),
                 'title': movie['title'],
                 'genres': movie['genres'].split('|') if movie['genres'] else [],
-                'averageRating': float(avg_rating) if avg_rating > 0 else None,
-                'ratingCount': len(movie_ratings)
+                'averageRating': avg_rating,
+                'ratingCount': rating_count
             }
         })
         
@@ -631,93 +930,16 @@ def get_enriched_movies():
     Get MovieLens movies with TMDB metadata
     """
     try:
-        import json
-        
         # Pagination parametreleri
         page = int(request.args.get('page', 1))
         limit = int(request.args.get('limit', 20))
         search = request.args.get('search', '').lower()
-        
-        print(f"📽️ Enriched movies request - Page: {page}, Limit: {limit}, Search: '{search}'")
-        
-        # Load enriched movies
-        enriched_path = 'data/enriched_movies.json'
-        
-        if os.path.exists(enriched_path):
-            with open(enriched_path, 'r', encoding='utf-8') as f:
-                enriched_movies = json.load(f)
-            
-            print(f"✅ Loaded {len(enriched_movies)} enriched movies from file")
-            
-            # Filter by search
-            if search:
-                filtered = [
-                    m for m in enriched_movies 
-                    if search in m['title'].lower() or search in m['genres'].lower()
-                ]
-                print(f"🔍 Filtered to {len(filtered)} movies matching '{search}'")
-            else:
-                filtered = enriched_movies
-            
-            # Paginate
-            start = (page - 1) * limit
-            end = start + limit
-            paginated = filtered[start:end]
-            
-            print(f"📄 Returning {len(paginated)} movies (page {page})")
-            
-            return jsonify({
-                'success': True,
-                'data': {
-                    'movies': paginated,
-                    'total': len(filtered),
-                    'page': page,
-                    'totalPages': (len(filtered) + limit - 1) // limit
-                }
-            })
-        else:
-            print(f"⚠️ Enriched movies file not found at: {enriched_path}")
-            
-            # Fallback: Return basic MovieLens data with TMDB-compatible structure
-            movies_with_titles = []
-            for _, movie in movies_df.iterrows():
-                movies_with_titles.append({
-                    'movieId': int(movie['movieId']),
-                    'title': movie['title'],
-                    'genres': movie['genres'],
-                    'tmdbId': None,
-                    'posterPath': None,
-                    'backdropPath': None,
-                    'overview': '',
-                    'voteAverage': 0,
-                    'releaseDate': ''
-                })
-            
-            # Filter by search
-            if search:
-                filtered = [
-                    m for m in movies_with_titles
-                    if search in m['title'].lower() or search in m['genres'].lower()
-                ]
-            else:
-                filtered = movies_with_titles
-            
-            # Paginate
-            start = (page - 1) * limit
-            end = start + limit
-            paginated = filtered[start:end]
-            
-            return jsonify({
-                'success': True,
-                'data': {
-                    'movies': paginated,
-                    'total': len(filtered),
-                    'page': page,
-                    'totalPages': (len(filtered) + limit - 1) // limit,
-                    'note': 'Using basic MovieLens data. Run enrichment script for TMDB metadata.'
-                }
-            })
-    
+
+        return jsonify({
+            'success': True,
+            'data': enriched_catalog.page(page, limit, search)
+        })
+
     except Exception as e:
         print(f"❌ Enriched movies error: {str(e)}")
         import traceback
@@ -735,4 +957,13 @@ if __name__ == '__main__':
     print(f"🎬 Loaded {len(movies_df):,} movies")
     print("="*60 + "\n")
     
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    if os.getenv('FLASK_DEBUG') == '1':
+        # Single-process development server with auto-reload
+        app.run(host='0.0.0.0', port=5000, debug=True)
+    else:
+        # Multi-worker server; workers share the memory-mapped model artifacts
+        try:
+            os.execvp('gunicorn', ['gunicorn', '-c', 'gunicorn.conf.py', 'app:app'])
+        except OSError:
+            print("⚠️ gunicorn not available, falling back to the single-process server")
+            app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,120 @@
+# collaborative_scorer.py
+
+import numpy as np
+import scipy.sparse as sp
+from content_index import top_n
+
+
+class CollaborativeScorer:
+    def __init__(self, interactions):
+        """
+        Vectorized user-based collaborative filtering scorer
+
+        Parameters:
+        interactions: InteractionMatrix with the ratings to score from
+        """
+        self.interactions = interactions
+
+    def score(self, user_idx, neighbor_idx, neighbor_sims):
+        """
+        Predicted rating for every movie from a set of neighbor users
+
+        Weighted average of the neighbors' ratings, where each movie is
+        divided only by the similarity mass of the neighbors who rated it.
+
+        Parameters:
+        user_idx: Row of the target user
+        neighbor_idx: Rows of the neighbor users
+        neighbor_sims: Similarity of each neighbor to the target user
+
+        Returns:
+        Array with one score per movie column; -inf for movies no neighbor
+        rated and for movies the user has already rated
+        """
+        n_items = self.interactions.shape[1]
+        neighbor_sims = np.asarray(neighbor_sims, dtype=np.float32)
+
+        neighbor_ratings = self.interactions.ratings[neighbor_idx]
+        weighted_sum = neighbor_ratings.T @ neighbor_sims
+        similarity_mass = self.interactions.rated_rows(neighbor_idx).T @ neighbor_sims
+
+        scores = np.zeros(n_items, dtype=np.float32)
+        np.divide(weighted_sum, similarity_mass, out=scores, where=similarity_mass > 0)
+
+        # Only movies rated by at least one neighbor are candidates
+        candidates = np.bincount(neighbor_ratings.indices, minlength=n_items) > 0
+        candidates[self.interactions.user_items(user_idx)] = False
+        scores[~candidates] = -np.inf
+
+        return scores
+
+    def recommend(self, user_idx, neighbor_idx, neighbor_sims, n=10):
+        """
+        Top-n unrated movies for a user
+
+        Returns:
+        (movie column positions, predicted ratings), best first
+        """
+        scores = self.score(user_idx, neighbor_idx, neighbor_sims)
+        top = top_n(scores, n)
+        top = top[np.isfinite(scores[top])]
+        return top, scores[top]
+
+    def score_block(self, user_idx, neighbor_idx, neighbor_sims):
+        """
+        score() for a block of users with two sparse matrix products
+
+        The neighbor lists become a sparse (users x neighbors) weight
+        matrix W, so the weighted rating sums are W @ R and the
+        similarity masses W @ rated, restricted to the neighbors in the block.
+
+        Parameters:
+        user_idx: Rows of the target users
+        neighbor_idx: (users x K) rows of every user's neighbors
+        neighbor_sims: (users x K) similarity of each neighbor
+
+        Returns:
+        Dense float32 (users x movies) block, -inf where score() has -inf
+        """
+        user_idx = np.asarray(user_idx, dtype=np.int64)
+        n_block, k = neighbor_idx.shape
+        n_items = self.interactions.shape[1]
+
+        # Only the neighbors that occur in this block are read
+        block_neighbors, columns = np.unique(neighbor_idx, return_inverse=True)
+        indptr = np.arange(0, n_block * k + 1, k)
+        shape = (n_block, len(block_neighbors))
+        weights = sp.csr_matrix(
+            (np.asarray(neighbor_sims, dtype=np.float32).ravel(), columns.ravel(), indptr),
+            shape=shape
+        )
+        links = sp.csr_matrix((np.ones(n_block * k, dtype=np.float32), columns.ravel(), indptr),
+                              shape=shape)
+
+        neighbor_ratings = self.interactions.ratings[block_neighbors]
+        neighbor_rated = self.interactions.rated_rows(block_neighbors)
+
+        weighted_sum = (weights @ neighbor_ratings).toarray()
+        similarity_mass = (weights @ neighbor_rated).toarray()
+        candidates = (links @ neighbor_rated).toarray() > 0
+
+        scores = np.zeros((n_block, n_items), dtype=np.float32)
+        np.divide(weighted_sum, similarity_mass, out=scores, where=similarity_mass > 0)
+
+        own_rows, own_cols = self.interactions.rated_rows(user_idx).nonzero()
+        candidates[own_rows, own_cols] = False
+        scores[~candidates] = -np.inf
+
+        return scores
+
+    def recommend_block(self, user_idx, neighbor_idx, neighbor_sims, n=10):
+        """
+        recommend() for a block of users
+
+        Returns:
+        (movie columns, predicted ratings), both (users x n), best first;
+        rows with fewer than n candidates end in -inf scores
+        """
+        scores = self.score_block(user_idx, neighbor_idx, neighbor_sims)
+        top = top_n(scores, n)
+        return top, np.take_along_axis(scores, top, axis=1)
@@ -0,0 +1,156 @@
+# content_index.py
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def top_n(scores, n):
+    """
+    Indices of the n highest scores, highest first
+
+    Uses argpartition so only the selected n entries are sorted. Works on a
+    single row or row-wise on a 2D block; ties keep the lower index first.
+    """
+    n = max(0, min(n, scores.shape[-1]))
+    if n == 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+
+    top = np.argpartition(-scores, n - 1, axis=-1)[..., :n]
+    top_scores = np.take_along_axis(scores, top, axis=-1)
+
+    # argpartition picks an arbitrary subset of the scores tied with the
+    # n-th one; redo rows where some tied entries were left out
+    cutoff = top_scores.min(axis=-1, keepdims=True)
+    partial = (scores == cutoff).sum(axis=-1) > (top_scores == cutoff).sum(axis=-1)
+    if partial.any():
+        top, top_scores = np.atleast_2d(top).copy(), np.atleast_2d(top_scores).copy()
+        rows = np.atleast_2d(scores)
+        for r in np.flatnonzero(np.atleast_1d(partial)):
+            threshold = top_scores[r].min()
+            better = np.flatnonzero(rows[r] > threshold)
+            tied = np.flatnonzero(rows[r] == threshold)[:n - len(better)]
+            top[r] = np.concatenate([better, tied])
+            top_scores[r] = rows[r][top[r]]
+        top, top_scores = top.reshape(scores.shape[:-1] + (n,)), top_scores.reshape(scores.shape[:-1] + (n,))
+
+    order = np.lexsort((top, -top_scores), axis=-1)
+    return np.take_along_axis(top, order, axis=-1)
+
+
+class ContentNeighborIndex:
+    def __init__(self, features, neighbors, scores):
+        """
+        Top-K movie-movie neighbor index
+
+        Only the K most similar movies of every movie are kept, so memory
+        grows as O(N*K) instead of the O(N^2) of a dense cosine_sim matrix.
+        Use from_tfidf() to build one.
+
+        Parameters:
+        features: L2-normalized CSR (movies x features) matrix, rows in movies_df order
+        neighbors: int32 (movies x K) neighbor rows, most similar first
+        scores: float32 (movies x K) similarity of each neighbor
+        """
+        self.features = features
+        self.neighbors = neighbors
+        self.scores = scores
+        self.n_items = features.shape[0]
+        self.k = neighbors.shape[1]
+
+    @classmethod
+    def from_tfidf(cls, tfidf_matrix, k=100, block_size=1024):
+        """
+        Build the index from a TF-IDF matrix
+
+        Parameters:
+        tfidf_matrix: Sparse (movies x features) matrix, rows in movies_df order
+        k: Number of neighbors kept per movie
+        block_size: Rows scored at once while building (bounds peak memory)
+        """
+        from sklearn.preprocessing import normalize
+
+        features = normalize(tfidf_matrix.tocsr()).astype(np.float32)
+        n_items = features.shape[0]
+        k = max(1, min(k, n_items - 1))
+
+        neighbors = np.empty((n_items, k), dtype=np.int32)
+        scores = np.empty((n_items, k), dtype=np.float32)
+
+        for start in range(0, n_items, block_size):
+            end = min(start + block_size, n_items)
+            block = (features[start:end] @ features.T).toarray()
+
+            # A movie is never its own neighbor
+            block[np.arange(end - start), np.arange(start, end)] = -np.inf
+
+            top = top_n(block, k)
+            neighbors[start:end] = top
+            scores[start:end] = np.take_along_axis(block, top, axis=1)
+
+        return cls(features, neighbors, scores)
+
+    def to_arrays(self):
+        """Flat arrays for persisting the index (see from_arrays)"""
+        return {
+            'features_data': self.features.data,
+            'features_indices': self.features.indices,
+            'features_indptr': self.features.indptr,
+            'features_shape': np.array(self.features.shape, dtype=np.int64),
+            'neighbors': self.neighbors,
+            'scores': self.scores
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild the index from to_arrays() output, without copying"""
+        features = sp.csr_matrix(
+            (arrays['features_data'], arrays['features_indices'], arrays['features_indptr']),
+            shape=tuple(arrays['features_shape'])
+        )
+        return cls(features, arrays['neighbors'], arrays['scores'])
+
+    def exact_scores(self, idx):
+        """Exact similarity of one movie against the whole catalog"""
+        return (self.features @ self.features[idx].T).toarray().ravel()
+
+    def similar(self, idx, n):
+        """
+        Get the n most similar movies to the movie at row idx
+
+        Served from the precomputed neighbors when n <= k, otherwise
+        falls back to exact scoring against the whole catalog.
+
+        Returns:
+        (indices, scores) arrays, most similar first
+        """
+        if n <= self.k:
+            return self.neighbors[idx, :n], self.scores[idx, :n]
+
+        sims = self.exact_scores(idx)
+        sims[idx] = -np.inf
+        order = top_n(sims, min(n, self.n_items - 1))
+        return order, sims[order]
+
+    def similar_batch(self, indices, n):
+        """
+        Get the n most similar movies for several movies at once
+
+        Parameters:
+        indices: Array of movie rows
+        n: Neighbors per movie
+
+        Returns:
+        (indices, scores) arrays of shape (len(indices), n)
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if n <= self.k:
+            return self.neighbors[indices, :n], self.scores[indices, :n]
+
+        sims = (self.features[indices] @ self.features.T).toarray()
+        sims[np.arange(len(indices)), indices] = -np.inf
+        order = top_n(sims, min(n, self.n_items - 1))
+        return order, np.take_along_axis(sims, order, axis=1)
+
+    def memory_usage(self):
+        """Bytes held by the neighbor arrays"""
+        return self.neighbors.nbytes + self.scores.nbytes
@@ -0,0 +1,120 @@
+# enriched_catalog.py
+
+import json
+import os
+import threading
+
+import numpy as np
+
+from search_index import MovieSearchIndex
+
+# Fields of every enriched movie record, in response order
+FIELDS = (
+    'movieId', 'title', 'genres', 'tmdbId', 'posterPath', 'backdropPath',
+    'overview', 'voteAverage', 'releaseDate'
+)
+
+FALLBACK_NOTE = 'Using basic MovieLens data. Run enrichment script for TMDB metadata.'
+
+
+class EnrichedCatalog:
+    def __init__(self, path, movies_df, fallback_index=None):
+        """
+        In-memory catalog of MovieLens movies with TMDB metadata
+
+        The enrichment file is parsed once into one list per field, with a
+        search index over titles and genres. Every request only stats the
+        file; it is re-read when its mtime changes. Without the file, the
+        basic MovieLens catalog is served in the same shape.
+
+        Parameters:
+        path: Enrichment output (see tmdb_enrichment.py)
+        movies_df: MovieLens catalog used when the file does not exist
+        fallback_index: Optional MovieSearchIndex already built over movies_df
+        """
+        self.path = path
+        self.movies_df = movies_df
+        self.fallback_index = fallback_index
+        self._lock = threading.Lock()
+        self._mtime_ns = None
+        self._fallback = None
+        self._enriched = None
+
+    def _build_fallback(self):
+        """TMDB-shaped columns for the plain MovieLens catalog"""
+        n = len(self.movies_df)
+        columns = {
+            'movieId': self.movies_df['movieId'].astype(int).tolist(),
+            'title': self.movies_df['title'].tolist(),
+            'genres': self.movies_df['genres'].tolist(),
+            'tmdbId': [None] * n,
+            'posterPath': [None] * n,
+            'backdropPath': [None] * n,
+            'overview': [''] * n,
+            'voteAverage': [0] * n,
+            'releaseDate': [''] * n
+        }
+        index = self.fallback_index or MovieSearchIndex(columns['title'], columns['genres'])
+        return columns, index, np.arange(n, dtype=np.int32)
+
+    def _load_enriched(self):
+        """Parse the enrichment file into columns and index them"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        columns = {field: [record.get(field) for record in records] for field in FIELDS}
+        index = MovieSearchIndex(columns['title'], columns['genres'])
+        return columns, index, np.arange(len(records), dtype=np.int32)
+
+    def _current(self):
+        """(columns, index, all rows, is_fallback) for the file as it is now"""
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+
+        if mtime_ns is None:
+            if self._fallback is None:
+                with self._lock:
+                    if self._fallback is None:
+                        self._fallback = self._build_fallback()
+            return self._fallback + (True,)
+
+        if mtime_ns != self._mtime_ns:
+            with self._lock:
+                if mtime_ns != self._mtime_ns:
+                    self._enriched = self._load_enriched()
+                    self._mtime_ns = mtime_ns
+        return self._enriched + (False,)
+
+    def page(self, page=1, limit=20, search=''):
+        """
+        One page of the catalog, optionally filtered by a search term
+
+        Parameters:
+        page: 1-based page number
+        limit: Movies per page
+        search: Case-insensitive substring of the title or genres
+
+        Returns:
+        Dict with movies, total, page, totalPages (and a note when serving
+        the MovieLens fallback)
+        """
+        columns, index, all_rows, is_fallback = self._current()
+        rows = index.search(search) if search else all_rows
+
+        start = (page - 1) * limit
+        selected = rows[start:start + limit].tolist()
+        movies = [
+            {field: columns[field][row] for field in FIELDS}
+            for row in selected
+        ]
+
+        data = {
+            'movies': movies,
+            'total': len(rows),
+            'page': page,
+            'totalPages': (len(rows) + limit - 1) // limit
+        }
+        if is_fallback:
+            data['note'] = FALLBACK_NOTE
+        return data
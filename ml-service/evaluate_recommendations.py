@@ -1,282 +1,244 @@
 # evaluate_recommendations.py
+#
+# Offline evaluation of the content-based, collaborative and hybrid
+# predictors on an 80/20 split of the ratings:
+#   python evaluate_recommendations.py
+#
+# The predictions come from the recommender package's own models
+# (ContentBasedModel, UserBasedCFModel and HybridModel.predict()), so the
+# metrics measure the code that serves recommendations. run_evaluation()
+# can also be imported. It shards the test users over a process pool
+# (EVAL_WORKERS, default: all cores); the fitted models are written once
+# with save_model() and every worker memory-maps them with load_model()
+# instead of receiving a pickled copy, and the per-shard metric sums are
+# merged at the end.
+
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-import pandas as pd
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.feature_extraction.text import TfidfVectorizer
-from performance_metrics import PerformanceEvaluator
-import pickle
-
-print("Loading data...")
-ratings = pd.read_csv('data/ml-latest-small/ratings.csv')
-movies = pd.read_csv('data/ml-latest-small/movies.csv')
-
-print(f"Loaded {len(ratings):,} ratings and {len(movies):,} movies\n")
-
-# Split data: 80% train, 20% test
-from sklearn.model_selection import train_test_split
+import pandas as pd
 
-train_ratings, test_ratings = train_test_split(
-    ratings, 
-    test_size=0.2, 
-    random_state=42
+from performance_metrics import (
+    PerformanceEvaluator, merge_metric_totals, metrics_from_totals, print_metrics,
+    write_metrics_report
 )
-
-print(f"Train set: {len(train_ratings):,} ratings")
-print(f"Test set:  {len(test_ratings):,} ratings\n")
-
-# ============================================================
-# CONTENT-BASED FILTERING PREDICTIONS
-# ============================================================
-print("=" * 60)
-print("CONTENT-BASED FILTERING EVALUATION")
-print("=" * 60)
-
-# Create TF-IDF matrix
-tfidf = TfidfVectorizer(stop_words='english')
-movies['genres'] = movies['genres'].fillna('')
-tfidf_matrix = tfidf.fit_transform(movies['genres'])
-
-# Calculate cosine similarity
-cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
-
-# Create movie_id to index mapping
-movie_indices = pd.Series(movies.index, index=movies['movieId']).to_dict()
-
-def get_content_based_predictions(test_df, n_similar=20):
-    """Generate content-based predictions"""
-    predictions = []
-    
-    for idx, row in test_df.iterrows():
-        user_id = row['userId']
-        movie_id = row['movieId']
-        
-        # Get user's rating history
-        user_ratings = train_ratings[train_ratings['userId'] == user_id]
-        
-        if len(user_ratings) == 0:
-            continue
-        
-        # Get similar movies to the test movie
-        if movie_id not in movie_indices:
-            continue
-        
-        movie_idx = movie_indices[movie_id]
-        sim_scores = list(enumerate(cosine_sim[movie_idx]))
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
-        sim_scores = sim_scores[1:n_similar+1]
-        
-        # Get movies user has rated that are similar
-        similar_movie_ids = [movies.iloc[i[0]]['movieId'] for i in sim_scores]
-        user_similar_ratings = user_ratings[
-            user_ratings['movieId'].isin(similar_movie_ids)
-        ]
-        
-        if len(user_similar_ratings) > 0:
-            predicted_rating = user_similar_ratings['rating'].mean()
-        else:
-            predicted_rating = user_ratings['rating'].mean()
-        
-        predictions.append({
-            'userId': user_id,
-            'movieId': movie_id,
-            'predicted_rating': predicted_rating
-        })
-        
-        if len(predictions) % 1000 == 0:
-            print(f"Processed {len(predictions)} predictions...")
-    
-    return pd.DataFrame(predictions)
-
-print("\nGenerating Content-Based predictions...")
-cb_predictions = get_content_based_predictions(test_ratings)
-
-print(f"Generated {len(cb_predictions):,} predictions")
-
-# Evaluate Content-Based
-cb_evaluator = PerformanceEvaluator(cb_predictions, test_ratings, k=10)
-cb_metrics = cb_evaluator.calculate_all_metrics(
-    total_movies=len(movies),
-    popularity_dict=None
+from recommender import (
+    DATA_DIR, ContentBasedModel, HybridModel, UserBasedCFModel, load_model, load_split,
+    save_model
 )
 
-# Save report
-cb_evaluator.generate_metrics_report(
-    cb_metrics, 
-    'content_based_metrics.txt'
-)
+MODEL_NAMES = ('Content-Based', 'Collaborative', 'Hybrid')
+REPORT_FILES = {
+    'Content-Based': 'content_based_metrics.txt',
+    'Collaborative': 'collaborative_metrics.txt',
+    'Hybrid': 'hybrid_metrics.txt'
+}
+
+
+def evaluate_predictions(test_df, inputs, k=10, ks=(5, 10, 20), cb_weight=0.6):
+    """
+    Predict test_df with every model and sum up its metrics
+
+    Parameters:
+    test_df: Test ratings of a set of users (all of each user's rows)
+    inputs: load_shared_inputs() output
+
+    Returns:
+    {model name: PerformanceEvaluator.metric_totals()}
+    """
+    user_ids = test_df['userId'].values
+    movie_ids = test_df['movieId'].values
+    cb_model = inputs['content_model']
+    cf_model = inputs['collaborative_model']
+
+    cb_predicted = cb_model.predict(user_ids, movie_ids)
+    cf_predicted = cf_model.predict(user_ids, movie_ids)
+    predicted = {
+        'Content-Based': cb_predicted,
+        'Collaborative': cf_predicted,
+        'Hybrid': HybridModel(cf_model, cb_model, cb_weight).blend(cf_predicted, cb_predicted)
+    }
+    return {
+        name: PerformanceEvaluator(
+            pd.DataFrame({'userId': user_ids, 'movieId': movie_ids,
+                          'predicted_rating': model_predicted}),
+            test_df, k=k
+        ).metric_totals(ks)
+        for name, model_predicted in predicted.items()
+    }
 
-# ============================================================
-# COLLABORATIVE FILTERING PREDICTIONS
-# ============================================================
-print("\n" + "=" * 60)
-print("COLLABORATIVE FILTERING EVALUATION")
-print("=" * 60)
-
-# Create user-item matrix
-user_item_matrix = train_ratings.pivot_table(
-    index='userId',
-    columns='movieId',
-    values='rating'
-).fillna(0)
-
-# Calculate user similarity
-user_similarity = cosine_similarity(user_item_matrix)
-user_similarity_df = pd.DataFrame(
-    user_similarity,
-    index=user_item_matrix.index,
-    columns=user_item_matrix.index
-)
-
-def get_collaborative_predictions(test_df, n_neighbors=20):
-    """Generate collaborative filtering predictions"""
-    predictions = []
-    
-    for idx, row in test_df.iterrows():
-        user_id = row['userId']
-        movie_id = row['movieId']
-        
-        if user_id not in user_similarity_df.index:
-            continue
-        
-        # Get similar users
-        similar_users = user_similarity_df[user_id].sort_values(
-            ascending=False
-        )[1:n_neighbors+1]
-        
-        # Get ratings from similar users for this movie
-        similar_user_ratings = train_ratings[
-            (train_ratings['userId'].isin(similar_users.index)) &
-            (train_ratings['movieId'] == movie_id)
-        ]
-        
-        if len(similar_user_ratings) > 0:
-            # Weighted average based on similarity
-            weights = similar_user_ratings['userId'].map(similar_users)
-            predicted_rating = np.average(
-                similar_user_ratings['rating'],
-                weights=weights
-            )
-        else:
-            # Fallback to user's average
-            user_ratings = train_ratings[train_ratings['userId'] == user_id]
-            predicted_rating = user_ratings['rating'].mean() if len(user_ratings) > 0 else 3.0
-        
-        predictions.append({
-            'userId': user_id,
-            'movieId': movie_id,
-            'predicted_rating': predicted_rating
-        })
-        
-        if len(predictions) % 1000 == 0:
-            print(f"Processed {len(predictions)} predictions...")
-    
-    return pd.DataFrame(predictions)
-
-print("\nGenerating Collaborative Filtering predictions...")
-cf_predictions = get_collaborative_predictions(test_ratings)
-
-print(f"Generated {len(cf_predictions):,} predictions")
-
-# Evaluate Collaborative Filtering
-cf_evaluator = PerformanceEvaluator(cf_predictions, test_ratings, k=10)
-cf_metrics = cf_evaluator.calculate_all_metrics(
-    total_movies=len(movies),
-    popularity_dict=None
-)
-
-# Save report
-cf_evaluator.generate_metrics_report(
-    cf_metrics,
-    'collaborative_metrics.txt'
-)
 
 # ============================================================
-# HYBRID SYSTEM PREDICTIONS
+# SHARED INPUTS AND WORKERS
 # ============================================================
-print("\n" + "=" * 60)
-print("HYBRID SYSTEM EVALUATION")
-print("=" * 60)
-
-# Merge predictions (weighted combination)
-cb_weight = 0.6
-cf_weight = 0.4
-
-hybrid_predictions = pd.merge(
-    cb_predictions,
-    cf_predictions,
-    on=['userId', 'movieId'],
-    how='inner',
-    suffixes=('_cb', '_cf')
-)
-
-hybrid_predictions['predicted_rating'] = (
-    cb_weight * hybrid_predictions['predicted_rating_cb'] +
-    cf_weight * hybrid_predictions['predicted_rating_cf']
-)
 
-hybrid_predictions = hybrid_predictions[['userId', 'movieId', 'predicted_rating']]
+def save_shared_inputs(shared_dir, content_model, collaborative_model, test_df):
+    """Write the fitted models (see save_model()) and the test ratings as .npy files"""
+    save_model(content_model, os.path.join(shared_dir, 'content'))
+    save_model(collaborative_model, os.path.join(shared_dir, 'collaborative'))
+    for column in ('userId', 'movieId', 'rating'):
+        np.save(os.path.join(shared_dir, f'test_{column}.npy'),
+                np.ascontiguousarray(test_df[column].values))
+
+
+def load_shared_inputs(shared_dir):
+    """Memory-map the save_shared_inputs() files"""
+    return {
+        'content_model': load_model(os.path.join(shared_dir, 'content')),
+        'collaborative_model': load_model(os.path.join(shared_dir, 'collaborative')),
+        'test': pd.DataFrame({
+            column: np.load(os.path.join(shared_dir, f'test_{column}.npy'), mmap_mode='r')
+            for column in ('userId', 'movieId', 'rating')
+        }, copy=False)
+    }
+
+
+# Inputs of this worker process, memory-mapped by _init_worker()
+_worker_inputs = None
+
+
+def _init_worker(shared_dir):
+    global _worker_inputs
+    _worker_inputs = load_shared_inputs(shared_dir)
+
+
+def _evaluate_shard(task):
+    """Metric totals of the test rows start:end (whole users, test sorted by user)"""
+    start, end, k, ks, cb_weight = task
+    test_df = _worker_inputs['test'].iloc[start:end]
+    return evaluate_predictions(test_df, _worker_inputs, k, ks, cb_weight)
+
+
+def shard_bounds(user_ids, n_shards):
+    """
+    Split rows sorted by user into about n_shards ranges of similar size,
+    never splitting a user
+
+    Returns:
+    List of (start, end) row ranges
+    """
+    n_rows = len(user_ids)
+    if n_rows == 0:
+        return []
+
+    # Cut at the first user starting at or after each evenly spaced target
+    user_starts = np.r_[np.flatnonzero(np.r_[True, user_ids[1:] != user_ids[:-1]]), n_rows]
+    targets = np.linspace(0, n_rows, n_shards + 1)[1:-1]
+    cuts = user_starts[np.searchsorted(user_starts, targets)]
+    bounds = np.unique(np.r_[0, cuts, n_rows])
+    return [(int(start), int(end)) for start, end in zip(bounds[:-1], bounds[1:])]
+
+
+def run_evaluation(data_dir=DATA_DIR, n_workers=None, k=10, ks=(5, 10, 20), cb_weight=0.6,
+                   n_similar=20, n_neighbors=20, shards_per_worker=4, shared_dir=None):
+    """
+    Evaluate the content-based, collaborative and hybrid predictors
+
+    The models are fitted once on the training split; test users are then
+    split into n_workers * shards_per_worker shards that are predicted in
+    parallel (n_workers=1 runs everything in-process).
+
+    Parameters:
+    data_dir: Directory with ratings.csv and movies.csv
+    n_workers: Worker processes (default: EVAL_WORKERS or all cores)
+    k: Cutoff of the headline Precision / Recall / F1
+    ks: All ranking cutoffs to compute
+    cb_weight: Content-based weight of the hybrid blend
+    n_similar: Rated movies every content-based prediction averages over
+    n_neighbors: Neighbors every collaborative prediction averages over
+    shared_dir: Where the shared model files are written (default: /dev/shm
+                if available, else the temp directory)
+
+    Returns:
+    {model name: metrics dict (see metrics_from_totals())}
+    """
+    if n_workers is None:
+        n_workers = int(os.getenv('EVAL_WORKERS', 0)) or os.cpu_count() or 1
+    ks = sorted({k, *ks})
+    if shared_dir is None and os.path.isdir('/dev/shm'):
+        shared_dir = '/dev/shm'
+
+    print("Loading data...")
+    movies, train_ratings, test_ratings = load_split(data_dir)
+    print(f"Train set: {len(train_ratings):,} ratings")
+    print(f"Test set:  {len(test_ratings):,} ratings\n")
+
+    start_time = time.time()
+    print("⚙️ Fitting models on the training ratings...")
+    content_model = ContentBasedModel(k=n_similar).fit(movies, train_ratings)
+    collaborative_model = UserBasedCFModel(n_neighbors=max(50, n_neighbors), k=n_neighbors)
+    collaborative_model.fit(train_ratings)
+
+    # Test rows grouped by user, so every shard holds whole users
+    test_ratings = test_ratings.sort_values('userId', kind='stable')
+
+    with tempfile.TemporaryDirectory(prefix='evaluation-', dir=shared_dir) as directory:
+        # save_model() computes every user's neighbors once, before sharding
+        save_shared_inputs(directory, content_model, collaborative_model, test_ratings)
+
+        tasks = [
+            (start, end, k, ks, cb_weight)
+            for start, end in shard_bounds(test_ratings['userId'].values,
+                                           n_workers * shards_per_worker)
+        ]
 
-print(f"Generated {len(hybrid_predictions):,} hybrid predictions")
+        print(f"⚙️ Evaluating {len(tasks)} user shards with {n_workers} worker(s)...")
+        if n_workers == 1:
+            _init_worker(directory)
+            shard_totals = list(map(_evaluate_shard, tasks))
+        else:
+            with ProcessPoolExecutor(n_workers, initializer=_init_worker,
+                                     initargs=(directory,)) as pool:
+                shard_totals = list(pool.map(_evaluate_shard, tasks))
+
+    print(f"✅ Evaluated in {time.time() - start_time:.2f}s\n")
+
+    results = {}
+    for name in MODEL_NAMES:
+        totals = merge_metric_totals([shard[name] for shard in shard_totals])
+        results[name] = metrics_from_totals(totals, k, total_movies=len(movies))
+        results[name]['Predictions'] = totals['count']
+    return results
+
+
+if __name__ == "__main__":
+    k = 10
+    ks = (5, 10, 20)
+    results = run_evaluation(k=k, ks=ks)
+
+    for name in MODEL_NAMES:
+        print("\n" + "=" * 60)
+        print(f"{name.upper()} EVALUATION")
+        print("=" * 60)
+        print(f"Generated {results[name]['Predictions']:,} predictions")
+        print_metrics(results[name], k, sorted({k, *ks}))
+        write_metrics_report(results[name], k, REPORT_FILES[name])
+
+    # ============================================================
+    # COMPARISON TABLE
+    # ============================================================
+    print("\n" + "=" * 60)
+    print("PERFORMANCE COMPARISON")
+    print("=" * 60)
+
+    comparison_metrics = ['RMSE', 'MAE', f'Precision@{k}', f'Recall@{k}', 'F1-Score',
+                          f'NDCG@{k}', f'MAP@{k}', f'HitRate@{k}', 'Coverage', 'Diversity']
+    comparison = pd.DataFrame({'Metric': comparison_metrics})
+    for name in MODEL_NAMES:
+        comparison[name] = [
+            results[name][metric] for metric in comparison_metrics
+        ]
 
-# Evaluate Hybrid
-hybrid_evaluator = PerformanceEvaluator(hybrid_predictions, test_ratings, k=10)
-hybrid_metrics = hybrid_evaluator.calculate_all_metrics(
-    total_movies=len(movies),
-    popularity_dict=None
-)
+    print("\n")
+    print(comparison.to_string(index=False))
 
-# Save report
-hybrid_evaluator.generate_metrics_report(
-    hybrid_metrics,
-    'hybrid_metrics.txt'
-)
+    # Save comparison
+    comparison.to_csv('metrics_comparison.csv', index=False)
+    print("\n✅ Comparison saved to: metrics_comparison.csv")
 
-# ============================================================
-# COMPARISON TABLE
-# ============================================================
-print("\n" + "=" * 60)
-print("PERFORMANCE COMPARISON")
-print("=" * 60)
-
-comparison = pd.DataFrame({
-    'Metric': ['RMSE', 'MAE', 'Precision@10', 'Recall@10', 'F1-Score', 'Coverage', 'Diversity'],
-    'Content-Based': [
-        cb_metrics['RMSE'],
-        cb_metrics['MAE'],
-        cb_metrics['Precision@10'],
-        cb_metrics['Recall@10'],
-        cb_metrics['F1-Score'],
-        cb_metrics['Coverage'],
-        cb_metrics['Diversity']
-    ],
-    'Collaborative': [
-        cf_metrics['RMSE'],
-        cf_metrics['MAE'],
-        cf_metrics['Precision@10'],
-        cf_metrics['Recall@10'],
-        cf_metrics['F1-Score'],
-        cf_metrics['Coverage'],
-        cf_metrics['Diversity']
-    ],
-    'Hybrid': [
-        hybrid_metrics['RMSE'],
-        hybrid_metrics['MAE'],
-        hybrid_metrics['Precision@10'],
-        hybrid_metrics['Recall@10'],
-        hybrid_metrics['F1-Score'],
-        hybrid_metrics['Coverage'],
-        hybrid_metrics['Diversity']
-    ]
-})
-
-print("\n")
-print(comparison.to_string(index=False))
-
-# Save comparison
-comparison.to_csv('metrics_comparison.csv', index=False)
-print("\n✅ Comparison saved to: metrics_comparison.csv")
-
-print("\n" + "=" * 60)
-print("✅ EVALUATION COMPLETE!")
-print("=" * 60)
\ No newline at end of file
+    print("\n" + "=" * 60)
+    print("✅ EVALUATION COMPLETE!")
+    print("=" * 60)
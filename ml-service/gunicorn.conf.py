@@ -0,0 +1,30 @@
+# gunicorn.conf.py
+#
+# Multi-worker launch for the ML service:
+#   gunicorn -c gunicorn.conf.py app:app
+#
+# Model artifacts are built (or validated) once in the master process.
+# Every worker then memory-maps the same read-only .npy files, so the
+# heavy arrays live once in the page cache no matter how many workers run.
+
+import multiprocessing
+import os
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+bind = os.getenv('ML_SERVICE_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', min(4, multiprocessing.cpu_count())))
+timeout = int(os.getenv('ML_SERVICE_TIMEOUT', 120))
+
+# Workers import app.py themselves and map the artifact files; the master
+# holds no model state that would have to be copied on write.
+preload_app = False
+
+
+def on_starting(server):
+    """Build model artifacts once before any worker starts"""
+    from model_artifacts import load_or_build_models
+    load_or_build_models(
+        cb_neighbors_k=int(os.getenv('CB_NEIGHBORS_K', 100)),
+        cf_neighbors_k=int(os.getenv('CF_NEIGHBORS_K', 50)),
+        item_neighbors_k=int(os.getenv('ITEM_NEIGHBORS_K', 50))
+    )
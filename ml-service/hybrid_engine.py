@@ -0,0 +1,257 @@
+# hybrid_engine.py
+
+import numpy as np
+import pandas as pd
+
+from content_index import top_n
+
+
+class HybridEngine:
+    def __init__(self, content_index, cf_scorer, user_neighbors, history, catalog_movie_ids,
+                 recent_ratings=5, cf_neighbors=20, decay_stats=None):
+        """
+        Content-based + collaborative score fusion over the whole catalog
+
+        Both score vectors are built as arrays over catalog rows: the CB
+        part from one slice of the content neighbor index, the CF part from
+        one sparse matrix-vector product. Each is scaled by its maximum and
+        the two are blended with cb_weight. With decay_stats, every recent
+        rating's CB contribution is also scaled by its time-decay weight.
+
+        Parameters:
+        content_index: ContentNeighborIndex, rows in catalog order
+        cf_scorer: CollaborativeScorer over the interaction matrix
+        user_neighbors: UserNeighborGraph, rows in interaction matrix order
+        history: UserHistoryIndex of all ratings
+        catalog_movie_ids: movieId of every catalog row
+        recent_ratings: Number of most recent ratings the CB part starts from
+        cf_neighbors: Number of similar users the CF part averages over
+        decay_stats: Optional DecayedUserStats weighting recent ratings by age
+        """
+        self.content_index = content_index
+        self.cf_scorer = cf_scorer
+        self.user_neighbors = user_neighbors
+        self.history = history
+        self.recent_ratings = recent_ratings
+        self.cf_neighbors = cf_neighbors
+        self.decay_stats = decay_stats
+
+        self._catalog = pd.Index(catalog_movie_ids)
+        self.n_items = len(self._catalog)
+
+        # Catalog row of every interaction column (-1 where the movie is not
+        # in the catalog). History entries are looked up when read, since
+        # the history grows in place.
+        self._cf_rows = self._catalog.get_indexer(cf_scorer.interactions.movie_ids)
+
+    def _seed_weights(self, user_ids, entries):
+        """
+        Rating (times time-decay weight, with decay_stats) of history entries
+
+        Parameters:
+        user_ids: userId owning every entry
+        entries: Positions in the history arrays
+        """
+        weights = self.history.ratings[entries].astype(np.float64)
+        if self.decay_stats is None:
+            return weights
+
+        positions = self.decay_stats.user_index
+        anchors = self.decay_stats.last_timestamps[[positions[int(u)] for u in user_ids]]
+        return weights * self.decay_stats.time_weights(anchors, self.history.timestamps[entries])
+
+    def content_scores(self, user_id, n):
+        """
+        Rating-weighted similarity to the user's most recent movies
+
+        Every recent movie contributes its 2n-1 nearest neighbors.
+
+        Returns:
+        (scores scaled to a maximum of 1, candidate mask), over catalog rows
+        """
+        scores = np.zeros(self.n_items)
+        candidates = np.zeros(self.n_items, dtype=bool)
+
+        span = self.history.span(user_id)
+        if span is None:
+            return scores, candidates
+        start = span[0]
+        end = min(span[1], start + self.recent_ratings)
+
+        rows = self._catalog.get_indexer(self.history.movie_ids[start:end])
+        known = rows >= 0
+        if not known.any():
+            return scores, candidates
+
+        neighbor_rows, neighbor_scores = self.content_index.similar_batch(
+            rows[known], max(1, n * 2 - 1)
+        )
+        entries = np.arange(start, end)[known]
+        seed_weights = self._seed_weights(np.full(len(entries), user_id), entries)
+        weights = neighbor_scores * seed_weights[:, None]
+
+        scores = np.bincount(neighbor_rows.ravel(), weights.ravel(), minlength=self.n_items)
+        candidates[neighbor_rows.ravel()] = True
+
+        max_score = scores[candidates].max()
+        if max_score > 0:
+            scores /= max_score
+        return scores, candidates
+
+    def collaborative_scores(self, user_id):
+        """
+        Neighbor-weighted predicted ratings of the movies the user has not rated
+
+        Returns:
+        (scores scaled to a maximum of 1, candidate mask), over catalog rows
+        """
+        scores = np.zeros(self.n_items)
+        candidates = np.zeros(self.n_items, dtype=bool)
+
+        user_idx = self.cf_scorer.interactions.user_index.get(user_id)
+        if user_idx is None:
+            return scores, candidates
+
+        neighbor_idx, neighbor_sims = self.user_neighbors.neighbors_of(
+            user_idx, self.cf_neighbors
+        )
+        predicted = self.cf_scorer.score(user_idx, neighbor_idx, neighbor_sims)
+
+        valid = np.isfinite(predicted) & (self._cf_rows >= 0)
+        rows = self._cf_rows[valid]
+        scores[rows] = predicted[valid]
+        candidates[rows] = True
+
+        max_score = scores.max()
+        if max_score > 0:
+            scores /= max_score
+        return scores, candidates
+
+    def recommend(self, user_id, n=10, cb_weight=0.6):
+        """
+        Top-n hybrid recommendations for a user
+
+        Parameters:
+        user_id: userId to recommend for
+        n: Number of recommendations
+        cb_weight: Weight of the content-based score (CF gets 1 - cb_weight)
+
+        Returns:
+        (catalog rows, hybrid scores), best first, or None when the user
+        has no rating history
+        """
+        if self.history.span(user_id) is None:
+            return None
+
+        cb_scores, cb_candidates = self.content_scores(user_id, n)
+        cf_scores, cf_candidates = self.collaborative_scores(user_id)
+
+        candidates = cb_candidates | cf_candidates
+        fused = np.full(self.n_items, -np.inf)
+        fused[candidates] = (
+            cb_weight * cb_scores[candidates] + (1 - cb_weight) * cf_scores[candidates]
+        )
+
+        top = top_n(fused, n)
+        top = top[np.isfinite(fused[top])]
+        return top, fused[top]
+
+    def content_scores_block(self, user_ids, n):
+        """
+        content_scores() for a block of users
+
+        The recent ratings of all users are gathered as one set of index
+        rows, and every (user, neighbor) weight lands in its cell with a
+        single bincount.
+
+        Returns:
+        (scores, candidate mask), both (users x catalog rows)
+        """
+        n_block = len(user_ids)
+        _, starts, ends = self.history.spans(user_ids)
+        ends = np.minimum(ends, starts + self.recent_ratings)
+
+        # Flat history positions of every user's recent ratings
+        lengths = ends - starts
+        owners = np.repeat(np.arange(n_block), lengths)
+        entries = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        entries += np.repeat(starts, lengths)
+
+        rows = self._catalog.get_indexer(self.history.movie_ids[entries])
+        known = rows >= 0
+        owners, entries, rows = owners[known], entries[known], rows[known]
+
+        size = n_block * self.n_items
+        if len(rows) == 0:
+            return np.zeros((n_block, self.n_items)), np.zeros((n_block, self.n_items), dtype=bool)
+
+        neighbor_rows, neighbor_scores = self.content_index.similar_batch(rows, max(1, n * 2 - 1))
+        seed_weights = self._seed_weights(np.asarray(user_ids)[owners], entries)
+        weights = neighbor_scores * seed_weights[:, None]
+        cells = (owners[:, None] * self.n_items + neighbor_rows).ravel()
+
+        scores = np.bincount(cells, weights.ravel(), minlength=size).reshape(n_block, -1)
+        candidates = np.bincount(cells, minlength=size).reshape(n_block, -1) > 0
+
+        max_scores = np.where(candidates, scores, -np.inf).max(axis=1)
+        scale = np.where(max_scores > 0, max_scores, 1)
+        return scores / scale[:, None], candidates
+
+    def collaborative_scores_block(self, user_ids):
+        """
+        collaborative_scores() for a block of users, scored with one
+        CollaborativeScorer.score_block() call
+
+        Returns:
+        (scores, candidate mask), both (users x catalog rows)
+        """
+        n_block = len(user_ids)
+        scores = np.zeros((n_block, self.n_items))
+        candidates = np.zeros((n_block, self.n_items), dtype=bool)
+
+        user_index = self.cf_scorer.interactions.user_index
+        block_rows = [i for i, u in enumerate(user_ids) if int(u) in user_index]
+        if not block_rows:
+            return scores, candidates
+        user_idx = np.array([user_index[int(user_ids[i])] for i in block_rows], dtype=np.int64)
+
+        neighbor_idx, neighbor_sims = self.user_neighbors.neighbors_of(user_idx, self.cf_neighbors)
+        predicted = self.cf_scorer.score_block(user_idx, neighbor_idx, neighbor_sims)
+
+        in_catalog = self._cf_rows >= 0
+        predicted = predicted[:, in_catalog]
+        finite = np.isfinite(predicted)
+        cells = np.ix_(block_rows, self._cf_rows[in_catalog])
+        scores[cells] = np.where(finite, predicted, 0)
+        candidates[cells] = finite
+
+        max_scores = scores.max(axis=1)
+        scale = np.where(max_scores > 0, max_scores, 1)
+        return scores / scale[:, None], candidates
+
+    def recommend_block(self, user_ids, n=10, cb_weight=0.6):
+        """
+        recommend() for a block of users
+
+        Returns:
+        One (catalog rows, hybrid scores) pair per user, or None for users
+        without rating history
+        """
+        cb_scores, cb_candidates = self.content_scores_block(user_ids, n)
+        cf_scores, cf_candidates = self.collaborative_scores_block(user_ids)
+
+        candidates = cb_candidates | cf_candidates
+        fused = np.where(
+            candidates, cb_weight * cb_scores + (1 - cb_weight) * cf_scores, -np.inf
+        )
+        top = top_n(fused, n)
+        top_scores = np.take_along_axis(fused, top, axis=1)
+
+        results = []
+        for user_id, rows, row_scores in zip(user_ids, top, top_scores):
+            if self.history.span(int(user_id)) is None:
+                results.append(None)
+                continue
+            finite = np.isfinite(row_scores)
+            results.append((rows[finite], row_scores[finite]))
+        return results
@@ -0,0 +1,127 @@
+# interaction_matrix.py
+
+import numpy as np
+import scipy.sparse as sp
+
+
+class InteractionMatrix:
+    def __init__(self, user_ids, movie_ids, ratings):
+        """
+        Sparse user-item rating matrix with dense id <-> index maps
+
+        Parameters:
+        user_ids: Array of userIds, one per matrix row (sorted when built
+                  from ratings; users added later are appended)
+        movie_ids: Sorted array of movieIds, one per matrix column
+        ratings: CSR matrix (users x movies), 0 = not rated
+        """
+        self.user_ids = np.asarray(user_ids)
+        self.movie_ids = np.asarray(movie_ids)
+        self.ratings = ratings.tocsr()
+
+        self.user_index = {int(u): i for i, u in enumerate(self.user_ids)}
+        self.movie_index = {int(m): i for i, m in enumerate(self.movie_ids)}
+
+    @classmethod
+    def from_ratings(cls, ratings_df):
+        """
+        Build from a ratings DataFrame with columns ['userId', 'movieId', 'rating']
+
+        Goes straight from the id columns to CSR (no dense pivot), so memory
+        is O(ratings): ml-25m is ~25M nonzeros, about 200 MB.
+        """
+        user_ids, user_codes = np.unique(ratings_df['userId'].values, return_inverse=True)
+        movie_ids, movie_codes = np.unique(ratings_df['movieId'].values, return_inverse=True)
+
+        ratings = sp.csr_matrix(
+            (ratings_df['rating'].values.astype(np.float32), (user_codes, movie_codes)),
+            shape=(len(user_ids), len(movie_ids))
+        )
+        return cls(user_ids, movie_ids, ratings)
+
+    def to_arrays(self):
+        """Flat arrays for persisting the matrix (see from_arrays)"""
+        return {
+            'user_ids': self.user_ids,
+            'movie_ids': self.movie_ids,
+            'ratings_data': self.ratings.data,
+            'ratings_indices': self.ratings.indices,
+            'ratings_indptr': self.ratings.indptr
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild the matrix from to_arrays() output, without copying"""
+        ratings = sp.csr_matrix(
+            (arrays['ratings_data'], arrays['ratings_indices'], arrays['ratings_indptr']),
+            shape=(len(arrays['user_ids']), len(arrays['movie_ids']))
+        )
+        return cls(arrays['user_ids'], arrays['movie_ids'], ratings)
+
+    def add_ratings(self, user_ids, movie_ids, ratings):
+        """
+        Set ratings in place, adding rows for new users
+
+        A (user, movie) pair that is already rated takes the new rating.
+        Columns stay fixed, since movie neighborhoods are built on them:
+        ratings of movies without a column are skipped until the matrix is
+        rebuilt from all ratings.
+
+        Parameters:
+        user_ids, movie_ids, ratings: Aligned arrays
+
+        Returns:
+        Sorted rows of the users whose ratings were set
+        """
+        cols = np.array([self.movie_index.get(int(m), -1) for m in movie_ids], dtype=np.int64)
+        known = cols >= 0
+        user_ids = np.asarray(user_ids)[known]
+        cols = cols[known]
+        ratings = np.asarray(ratings, dtype=np.float32)[known]
+
+        new_users = [u for u in dict.fromkeys(user_ids.tolist()) if int(u) not in self.user_index]
+        for user_id in new_users:
+            self.user_index[int(user_id)] = len(self.user_index)
+        self.user_ids = np.concatenate([
+            self.user_ids, np.array(new_users, dtype=self.user_ids.dtype)
+        ])
+        rows = self.user_positions(user_ids)
+
+        # Existing cells first, so the last value given for a cell wins
+        existing = self.ratings.tocoo()
+        all_rows = np.concatenate([existing.row, rows])
+        all_cols = np.concatenate([existing.col, cols])
+        all_data = np.concatenate([existing.data, ratings])
+        cells = all_rows * self.ratings.shape[1] + all_cols
+        _, last = np.unique(cells[::-1], return_index=True)
+        keep = len(cells) - 1 - last
+
+        self.ratings = sp.csr_matrix(
+            (all_data[keep], (all_rows[keep], all_cols[keep])),
+            shape=(len(self.user_ids), self.ratings.shape[1])
+        )
+        return np.unique(rows)
+
+    @property
+    def shape(self):
+        return self.ratings.shape
+
+    def user_positions(self, user_ids):
+        """Row positions of the given userIds"""
+        return np.array([self.user_index[int(u)] for u in user_ids], dtype=np.int64)
+
+    def rated_rows(self, user_idx):
+        """
+        Rows of the given users with 1.0 for every rated cell
+
+        Built per call from the row slice, so no full-size indicator
+        matrix has to be kept next to the (possibly memory-mapped) ratings.
+        """
+        rows = self.ratings[user_idx]
+        rows.data = np.ones(len(rows.data), dtype=rows.dtype)
+        return rows
+
+    def user_items(self, user_idx):
+        """Column positions of the movies rated by the user at row user_idx"""
+        start, end = self.ratings.indptr[user_idx], self.ratings.indptr[user_idx + 1]
+        return self.ratings.indices[start:end]
@@ -0,0 +1,125 @@
+# item_neighbors.py
+
+import numpy as np
+import scipy.sparse as sp
+
+from content_index import top_n
+
+
+def user_means(ratings):
+    """Mean rating of every row of a CSR (users x movies) matrix; 0 for empty rows"""
+    counts = np.diff(ratings.indptr)
+    sums = np.asarray(ratings.sum(axis=1), dtype=np.float64).ravel()
+    means = np.zeros(len(counts), dtype=np.float32)
+    np.divide(sums, counts, out=means, where=counts > 0, casting='unsafe')
+    return means
+
+
+def center_rows(ratings, means):
+    """
+    Ratings minus their user's mean, on the rated cells only
+
+    Shares indices/indptr with ratings; only the data array is new.
+    """
+    data = ratings.data - np.repeat(means, np.diff(ratings.indptr))
+    return sp.csr_matrix((data.astype(np.float32), ratings.indices, ratings.indptr),
+                         shape=ratings.shape)
+
+
+class ItemNeighborGraph:
+    def __init__(self, similarities):
+        """
+        Top-K adjusted-cosine neighbors of every movie
+
+        Similarities are cosines between the movies' columns of the
+        user-mean-centered rating matrix. Only the K most similar movies of
+        every movie are kept, and only with a positive similarity, as a
+        sparse (movies x movies) matrix. Use from_interactions() to build one.
+
+        Parameters:
+        similarities: CSR (movies x movies) matrix; row i holds the
+                      neighbors of movie i, columns in interactions order
+        """
+        self.similarities = similarities.tocsr()
+        self.n_items = self.similarities.shape[0]
+        self.k = int(np.diff(self.similarities.indptr).max(initial=0))
+        self._transposed = None
+
+    @classmethod
+    def from_interactions(cls, interactions, k=50, block_size=1024):
+        """
+        Build the graph in blocks of movies
+
+        Only one (block_size x movies) similarity block exists at a time, so
+        peak memory stays bounded regardless of the catalog size.
+
+        Parameters:
+        interactions: InteractionMatrix to compute movie similarity from
+        k: Number of neighbors kept per movie
+        block_size: Movies scored at once
+        """
+        ratings = interactions.ratings
+        n_items = ratings.shape[1]
+        k = max(1, min(k, n_items - 1))
+
+        centered = center_rows(ratings, user_means(ratings)).T.tocsr()
+        squared = centered.multiply(centered).sum(axis=1)
+        norms = np.sqrt(np.asarray(squared, dtype=np.float32).ravel())
+        safe_norms = np.where(norms > 0, norms, 1).astype(np.float32)
+        normalized = sp.diags(1 / safe_norms) @ centered
+        normalized_t = normalized.T.tocsr()
+
+        rows, cols, sims = [], [], []
+        for start in range(0, n_items, block_size):
+            end = min(start + block_size, n_items)
+            block = (normalized[start:end] @ normalized_t).toarray()
+
+            # A movie is never its own neighbor
+            block[np.arange(end - start), np.arange(start, end)] = -np.inf
+
+            top = top_n(block, k)
+            top_sims = np.take_along_axis(block, top, axis=1)
+            keep = top_sims > 0
+            rows.append(np.nonzero(keep)[0] + start)
+            cols.append(top[keep])
+            sims.append(top_sims[keep])
+
+        similarities = sp.csr_matrix(
+            (np.concatenate(sims), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n_items, n_items), dtype=np.float32
+        )
+        return cls(similarities)
+
+    def to_arrays(self):
+        """Flat arrays for persisting the graph (see from_arrays)"""
+        return {
+            'similarities_data': self.similarities.data,
+            'similarities_indices': self.similarities.indices,
+            'similarities_indptr': self.similarities.indptr
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild the graph from to_arrays() output, without copying"""
+        n_items = len(arrays['similarities_indptr']) - 1
+        similarities = sp.csr_matrix(
+            (arrays['similarities_data'], arrays['similarities_indices'],
+             arrays['similarities_indptr']),
+            shape=(n_items, n_items)
+        )
+        return cls(similarities)
+
+    @property
+    def transposed(self):
+        """
+        CSR (movies x movies) matrix whose column i holds movie i's
+        neighbors, so (users x movies) @ transposed scores every movie
+        """
+        if self._transposed is None:
+            self._transposed = self.similarities.T.tocsr()
+        return self._transposed
+
+    def memory_usage(self):
+        """Bytes held by the graph arrays"""
+        return (self.similarities.data.nbytes + self.similarities.indices.nbytes
+                + self.similarities.indptr.nbytes)
@@ -0,0 +1,387 @@
+# model_artifacts.py
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from content_index import ContentNeighborIndex
+from interaction_matrix import InteractionMatrix
+from item_neighbors import ItemNeighborGraph
+from recommender import ContentBasedModel, ItemBasedCFModel, UserBasedCFModel
+from recommender.data import DATA_DIR, load_movielens
+from user_neighbors import UserNeighborGraph
+
+# Bump whenever the on-disk layout or the way the models are built changes
+ARTIFACT_VERSION = 8
+
+ARTIFACT_DIR = os.getenv('MODEL_ARTIFACT_DIR', 'artifacts')
+SOURCE_FILES = ('ratings.csv', 'movies.csv')
+RATING_COLUMNS = ('userId', 'movieId', 'rating', 'timestamp')
+
+# Pointer file naming the version directory currently being served
+CURRENT_FILE = 'CURRENT'
+# Catalog text columns and the TF-IDF vocabulary, stored as JSON next to the arrays
+OBJECTS_FILE = 'objects.json'
+
+
+class ModelArtifacts:
+    def __init__(self, movies_df, ratings_df, tfidf_vocabulary, tfidf_idf, content_index,
+                 interactions, user_neighbors, item_neighbors):
+        """
+        Fitted structures the ML service serves from
+
+        The TF-IDF vectorizer is kept as its vocabulary and idf weights;
+        the tfidf property rebuilds it on first use, so loading artifacts
+        never imports sklearn.
+
+        Parameters:
+        movies_df: Movie catalog (genres NaN filled with '')
+        ratings_df: All ratings
+        tfidf_vocabulary: {term: feature column} of the fitted vectorizer
+        tfidf_idf: Inverse document frequency of every feature column
+        content_index: ContentNeighborIndex over the catalog
+        interactions: InteractionMatrix of all ratings
+        user_neighbors: UserNeighborGraph, rows in interactions order
+        item_neighbors: ItemNeighborGraph, rows in interactions column order
+        """
+        self.movies_df = movies_df
+        self.ratings_df = ratings_df
+        self.tfidf_vocabulary = tfidf_vocabulary
+        self.tfidf_idf = tfidf_idf
+        self._tfidf = None
+        self.content_index = content_index
+        self.interactions = interactions
+        self.user_neighbors = user_neighbors
+        self.item_neighbors = item_neighbors
+
+    @property
+    def tfidf(self):
+        """TfidfVectorizer over movie genres, equivalent to the fitted one"""
+        if self._tfidf is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+
+            tfidf = TfidfVectorizer(stop_words='english', vocabulary=self.tfidf_vocabulary)
+            tfidf.idf_ = np.asarray(self.tfidf_idf)
+            self._tfidf = tfidf
+        return self._tfidf
+
+    def collaborative_model(self, k=20):
+        """UserBasedCFModel over the fitted interactions and user graph"""
+        return UserBasedCFModel.from_parts(self.interactions, self.user_neighbors, k=k)
+
+    def item_model(self, shrinkage=0.5):
+        """ItemBasedCFModel over the fitted interactions and movie neighborhoods"""
+        return ItemBasedCFModel.from_parts(self.interactions, self.item_neighbors, shrinkage)
+
+    def content_model(self):
+        """
+        ContentBasedModel over the fitted neighbor index, for similar()
+        lookups (it holds no ratings to predict from)
+        """
+        return ContentBasedModel.from_parts(self.movies_df['movieId'].values, self.content_index)
+
+    def to_arrays(self):
+        """All numeric state as a flat {name: array} dict"""
+        arrays = {}
+        for name, value in self.content_index.to_arrays().items():
+            arrays['content_' + name] = value
+        for name, value in self.interactions.to_arrays().items():
+            arrays['interactions_' + name] = value
+        for name, value in self.user_neighbors.to_arrays().items():
+            arrays['user_neighbors_' + name] = value
+        for name, value in self.item_neighbors.to_arrays().items():
+            arrays['item_neighbors_' + name] = value
+        for column in RATING_COLUMNS:
+            arrays['ratings_' + column] = self.ratings_df[column].values
+        arrays['movies_movieId'] = self.movies_df['movieId'].values
+        arrays['tfidf_idf'] = self.tfidf_idf
+        return arrays
+
+    def to_objects(self):
+        """The non-numeric state (catalog text columns, TF-IDF vocabulary) as JSON-able lists"""
+        return {
+            'movies_title': self.movies_df['title'].tolist(),
+            'movies_genres': self.movies_df['genres'].tolist(),
+            'tfidf_vocabulary': {
+                term: int(column) for term, column in self.tfidf_vocabulary.items()
+            }
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, objects):
+        """Rebuild from to_arrays() and to_objects() output, without copying the arrays"""
+        def group(prefix):
+            return {
+                name[len(prefix):]: value
+                for name, value in arrays.items() if name.startswith(prefix)
+            }
+
+        ratings_df = pd.DataFrame(
+            {column: arrays['ratings_' + column] for column in RATING_COLUMNS},
+            copy=False
+        )
+        movies_df = pd.DataFrame({
+            'movieId': arrays['movies_movieId'],
+            'title': objects['movies_title'],
+            'genres': objects['movies_genres']
+        })
+        return cls(
+            movies_df,
+            ratings_df,
+            objects['tfidf_vocabulary'],
+            arrays['tfidf_idf'],
+            ContentNeighborIndex.from_arrays(group('content_')),
+            InteractionMatrix.from_arrays(group('interactions_')),
+            UserNeighborGraph.from_arrays(group('user_neighbors_')),
+            ItemNeighborGraph.from_arrays(group('item_neighbors_'))
+        )
+
+
+def build_models(data_dir=DATA_DIR, cb_neighbors_k=100, cf_neighbors_k=50,
+                 item_neighbors_k=50):
+    """
+    Read the MovieLens CSVs and fit every model from scratch
+    """
+    movies_df, ratings_df = load_movielens(data_dir)
+    content_model = ContentBasedModel(n_neighbors=cb_neighbors_k).fit(movies_df, ratings_df)
+    cf_model = UserBasedCFModel(n_neighbors=cf_neighbors_k).fit(ratings_df)
+    item_neighbors = ItemNeighborGraph.from_interactions(cf_model.interactions, k=item_neighbors_k)
+
+    return ModelArtifacts(
+        movies_df, ratings_df, content_model.tfidf.vocabulary_, content_model.tfidf.idf_,
+        content_model.content_index,
+        cf_model.interactions, cf_model.user_neighbors, item_neighbors
+    )
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(data_dir=DATA_DIR):
+    """Size, mtime and checksum of every source CSV"""
+    fingerprint = {}
+    for name in SOURCE_FILES:
+        path = os.path.join(data_dir, name)
+        stat = os.stat(path)
+        fingerprint[name] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': _sha256(path)
+        }
+    return fingerprint
+
+
+def source_version(data_dir=DATA_DIR):
+    """
+    Cheap version string of the source CSVs (size and mtime only), for
+    invalidating caches when the data changes
+    """
+    parts = []
+    for name in SOURCE_FILES:
+        try:
+            stat = os.stat(os.path.join(data_dir, name))
+            parts.append(f'{name}:{stat.st_size}:{stat.st_mtime_ns}')
+        except OSError:
+            parts.append(f'{name}:missing')
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()[:12]
+
+
+def sources_unchanged(saved, data_dir=DATA_DIR):
+    """
+    Check the source CSVs against a saved fingerprint
+
+    Size and mtime are compared first; the checksum is only recomputed
+    when the mtime moved, so touching a file does not invalidate artifacts.
+    """
+    for name in SOURCE_FILES:
+        path = os.path.join(data_dir, name)
+        if name not in saved or not os.path.exists(path):
+            return False
+
+        stat = os.stat(path)
+        if stat.st_size != saved[name]['size']:
+            return False
+        if stat.st_mtime_ns != saved[name]['mtime_ns'] and _sha256(path) != saved[name]['sha256']:
+            return False
+    return True
+
+
+def save_artifacts(models, params, artifact_dir=ARTIFACT_DIR, data_dir=DATA_DIR, keep=2):
+    """
+    Write models to a new version directory and make it current
+
+    The version is written under a temporary name, renamed into place and
+    only then published through the CURRENT pointer, so readers never see
+    a half-written version.
+
+    Parameters:
+    models: ModelArtifacts to persist
+    params: Build parameters the artifacts depend on (e.g. cb_neighbors_k)
+    keep: Number of most recent versions kept on disk
+
+    Returns:
+    Path of the new version directory
+    """
+    version, tmp_dir = new_version(artifact_dir)
+
+    arrays = models.to_arrays()
+    for name, value in arrays.items():
+        np.save(os.path.join(tmp_dir, name + '.npy'), np.ascontiguousarray(value))
+
+    with open(os.path.join(tmp_dir, OBJECTS_FILE), 'w', encoding='utf-8') as f:
+        json.dump(models.to_objects(), f)
+
+    manifest = {
+        'format_version': ARTIFACT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'params': params,
+        'sources': source_fingerprint(data_dir),
+        'arrays': sorted(arrays)
+    }
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    return publish_version(artifact_dir, version, tmp_dir, keep)
+
+
+def new_version(artifact_dir):
+    """
+    Name and temporary directory for a new version under artifact_dir
+
+    Returns:
+    (version, tmp_dir); fill tmp_dir, then call publish_version()
+    """
+    os.makedirs(artifact_dir, exist_ok=True)
+    version = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    tmp_dir = os.path.join(artifact_dir, '.tmp-' + version)
+    os.makedirs(tmp_dir)
+    return version, tmp_dir
+
+
+def publish_version(artifact_dir, version, tmp_dir, keep=2):
+    """
+    Rename a fully written version into place and point CURRENT at it
+
+    Returns:
+    Path of the published version directory
+    """
+    version_dir = os.path.join(artifact_dir, version)
+    os.rename(tmp_dir, version_dir)
+
+    pointer_tmp = os.path.join(artifact_dir, f'.{CURRENT_FILE}.{os.getpid()}')
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(artifact_dir, CURRENT_FILE))
+
+    _prune_versions(artifact_dir, keep)
+    return version_dir
+
+
+def _prune_versions(artifact_dir, keep):
+    """Remove all but the newest `keep` version directories"""
+    versions = sorted(
+        name for name in os.listdir(artifact_dir)
+        if not name.startswith('.') and os.path.isdir(os.path.join(artifact_dir, name))
+    )
+    for name in versions[:-keep]:
+        shutil.rmtree(os.path.join(artifact_dir, name), ignore_errors=True)
+
+
+def current_version_dir(artifact_dir=ARTIFACT_DIR):
+    """Directory of the current artifact version, or None"""
+    pointer = os.path.join(artifact_dir, CURRENT_FILE)
+    if not os.path.exists(pointer):
+        return None
+    with open(pointer, 'r', encoding='utf-8') as f:
+        version = f.read().strip()
+    version_dir = os.path.join(artifact_dir, version)
+    return version_dir if os.path.isdir(version_dir) else None
+
+
+def load_artifacts(params, artifact_dir=ARTIFACT_DIR, data_dir=DATA_DIR, mmap_mode='r'):
+    """
+    Load the current artifacts if they are still valid
+
+    Arrays are memory-mapped, so loading costs little more than reading
+    the manifest. Returns None when there are no artifacts, the format
+    version or build parameters differ, or the source CSVs changed.
+    """
+    version_dir = current_version_dir(artifact_dir)
+    if version_dir is None:
+        return None
+
+    with open(os.path.join(version_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != ARTIFACT_VERSION:
+        print("⚠️ Model artifacts have an old format version")
+        return None
+    if manifest.get('params') != params:
+        print("⚠️ Model artifacts were built with different parameters")
+        return None
+    if not sources_unchanged(manifest.get('sources', {}), data_dir):
+        print("⚠️ Source data changed since model artifacts were built")
+        return None
+
+    arrays = {
+        name: np.load(os.path.join(version_dir, name + '.npy'), mmap_mode=mmap_mode)
+        for name in manifest['arrays']
+    }
+    with open(os.path.join(version_dir, OBJECTS_FILE), 'r', encoding='utf-8') as f:
+        objects = json.load(f)
+
+    return ModelArtifacts.from_arrays(arrays, objects)
+
+
+def load_or_build_models(cb_neighbors_k=100, cf_neighbors_k=50, item_neighbors_k=50,
+                         artifact_dir=ARTIFACT_DIR, data_dir=DATA_DIR):
+    """
+    Warm start from saved artifacts, or build and save them
+    """
+    params = {
+        'cb_neighbors_k': cb_neighbors_k,
+        'cf_neighbors_k': cf_neighbors_k,
+        'item_neighbors_k': item_neighbors_k
+    }
+
+    start = time.time()
+    models = load_artifacts(params, artifact_dir, data_dir)
+    if models is not None:
+        print(f"✅ Loaded model artifacts in {time.time() - start:.2f}s")
+        return models
+
+    print("Building models from source data...")
+    models = build_models(data_dir, cb_neighbors_k=cb_neighbors_k, cf_neighbors_k=cf_neighbors_k,
+                          item_neighbors_k=item_neighbors_k)
+    version_dir = save_artifacts(models, params, artifact_dir, data_dir)
+    print(f"✅ Built models in {time.time() - start:.2f}s, saved to: {version_dir}")
+    return load_artifacts(params, artifact_dir, data_dir) or models
+
+
+if __name__ == "__main__":
+    cb_neighbors_k = int(os.getenv('CB_NEIGHBORS_K', 100))
+    cf_neighbors_k = int(os.getenv('CF_NEIGHBORS_K', 50))
+    item_neighbors_k = int(os.getenv('ITEM_NEIGHBORS_K', 50))
+    params = {
+        'cb_neighbors_k': cb_neighbors_k,
+        'cf_neighbors_k': cf_neighbors_k,
+        'item_neighbors_k': item_neighbors_k
+    }
+
+    print("🏗️ Building model artifacts...")
+    start = time.time()
+    models = build_models(cb_neighbors_k=cb_neighbors_k, cf_neighbors_k=cf_neighbors_k,
+                          item_neighbors_k=item_neighbors_k)
+    version_dir = save_artifacts(models, params)
+    print(f"✅ Artifacts written to: {version_dir} ({time.time() - start:.2f}s)")
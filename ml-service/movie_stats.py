@@ -0,0 +1,95 @@
+# movie_stats.py
+
+import numpy as np
+import pandas as pd
+
+# Half-star rating scale used by MovieLens (0.5 ... 5.0)
+RATING_VALUES = np.arange(1, 11) / 2
+
+
+class MovieStatsStore:
+    def __init__(self, movie_ids, ratings_df=None, histogram=True):
+        """
+        Per-movie rating aggregates held in arrays keyed by a dense movie index
+
+        Parameters:
+        movie_ids: movieIds of the catalog, position = dense index
+        ratings_df: Optional DataFrame with columns ['movieId', 'rating'] to load
+        histogram: Also keep a per-movie histogram over the half-star scale
+        """
+        self.movie_index = pd.Index(movie_ids)
+
+        n = len(self.movie_index)
+        self.counts = np.zeros(n, dtype=np.int64)
+        self.sums = np.zeros(n, dtype=np.float64)
+        self.histograms = np.zeros((n, len(RATING_VALUES)), dtype=np.int32) if histogram else None
+
+        if ratings_df is not None:
+            self.add_ratings(ratings_df['movieId'].values, ratings_df['rating'].values)
+
+    def _ensure_indices(self, movie_ids):
+        """Dense indices for movieIds, growing the arrays for unseen movies"""
+        indices = self.movie_index.get_indexer(movie_ids)
+        missing = indices < 0
+        if missing.any():
+            new_ids = pd.unique(movie_ids[missing])
+            self.movie_index = self.movie_index.append(pd.Index(new_ids))
+            grow = len(new_ids)
+            self.counts = np.concatenate([self.counts, np.zeros(grow, dtype=self.counts.dtype)])
+            self.sums = np.concatenate([self.sums, np.zeros(grow, dtype=self.sums.dtype)])
+            if self.histograms is not None:
+                self.histograms = np.vstack([
+                    self.histograms,
+                    np.zeros((grow, self.histograms.shape[1]), dtype=self.histograms.dtype)
+                ])
+            indices = self.movie_index.get_indexer(movie_ids)
+        return indices
+
+    def add_ratings(self, movie_ids, ratings):
+        """
+        Add a batch of ratings
+
+        Parameters:
+        movie_ids: Array of movieIds
+        ratings: Array of ratings, same length
+        """
+        ratings = np.asarray(ratings, dtype=np.float64)
+        indices = self._ensure_indices(np.asarray(movie_ids))
+        n = len(self.counts)
+
+        self.counts += np.bincount(indices, minlength=n)
+        self.sums += np.bincount(indices, weights=ratings, minlength=n)
+
+        if self.histograms is not None:
+            bins = np.clip(np.rint(ratings * 2).astype(np.int64) - 1, 0, len(RATING_VALUES) - 1)
+            np.add.at(self.histograms, (indices, bins), 1)
+
+    def _position(self, movie_id):
+        """Dense index of a movieId, or None if unknown"""
+        try:
+            return self.movie_index.get_loc(movie_id)
+        except KeyError:
+            return None
+
+    def add_rating(self, movie_id, rating):
+        """Add a single new rating"""
+        self.add_ratings([movie_id], [rating])
+
+    def get(self, movie_id):
+        """
+        Rating count and average for a movie
+
+        Returns:
+        (count, average) with average None when the movie has no ratings
+        """
+        idx = self._position(movie_id)
+        if idx is None or self.counts[idx] == 0:
+            return 0, None
+        return int(self.counts[idx]), float(self.sums[idx] / self.counts[idx])
+
+    def histogram(self, movie_id):
+        """Rating histogram as {rating: count}, or None if not tracked"""
+        idx = self._position(movie_id)
+        if self.histograms is None or idx is None:
+            return None
+        return {float(r): int(c) for r, c in zip(RATING_VALUES, self.histograms[idx])}
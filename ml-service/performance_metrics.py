@@ -29,6 +29,10 @@ class PerformanceEvaluator:
             how='inner'
         )
         
+        # Sorted ranking arrays and ranking_metrics() results, built on demand
+        self._ranking = None
+        self._ranking_cache = {}
+        
     def calculate_rmse(self):
         """Root Mean Squared Error"""
         if len(self.merged) == 0:
@@ -51,31 +55,111 @@ class PerformanceEvaluator:
         )
         return mae
     
-    def calculate_precision_at_k(self, threshold=3.5):
+    def _ranked(self):
         """
-        Precision@K: What proportion of recommended items are relevant?
+        merged sorted once by (userId, predicted_rating desc), as arrays
+        
+        Ties keep their order in merged. Computed on first use and reused
+        by every ranking metric.
+        
+        Returns:
+        (user codes, 0-based rank within the user, true ratings, user count)
+        """
+        if self._ranking is None:
+            codes, users = pd.factorize(self.merged['userId'])
+            predicted = self.merged['predicted_rating'].values
+            order = np.lexsort((-predicted, codes))
+            codes = codes[order]
+            
+            sizes = np.bincount(codes, minlength=len(users))
+            starts = np.cumsum(sizes) - sizes
+            ranks = np.arange(len(codes)) - starts[codes]
+            
+            self._ranking = (codes, ranks, self.merged['rating'].values[order], len(users))
+        return self._ranking
+    
+    def ranking_totals(self, ks=None, threshold=3.5):
+        """
+        Per-user ranking metrics at several K in one pass, summed over users
+        
+        Sums (rather than means) of disjoint user sets can be added up, so
+        shards evaluated separately merge into the exact overall metrics
+        (see ranking_from_totals()).
         
         Parameters:
+        ks: Cutoffs to evaluate (default: [self.k])
         threshold: Rating threshold to consider as "relevant"
+        
+        Returns:
+        {'users': n, 'relevant_users': n, 'ks': {k: {'precision', 'recall',
+         'ndcg', 'map', 'hits'}}}; recall, ndcg and map summed over users
+         with at least one relevant item
         """
-        precision_scores = []
+        ks = [self.k] if ks is None else list(ks)
+        codes, ranks, ratings, n_users = self._ranked()
+        relevant = ratings >= threshold
+        total_relevant = np.bincount(codes, weights=relevant, minlength=n_users)
+        has_relevant = total_relevant > 0
         
-        for user in self.merged['userId'].unique():
-            user_data = self.merged[self.merged['userId'] == user]
-            
-            # Sort by predicted rating (descending)
-            user_data = user_data.sort_values('predicted_rating', ascending=False)
-            
-            # Top K predictions
-            top_k = user_data.head(self.k)
-            
-            # How many are actually relevant (rating >= threshold)?
-            relevant = len(top_k[top_k['rating'] >= threshold])
+        # Relevant items at or above each position, within the user
+        cumulative = np.cumsum(relevant)
+        before_user = np.concatenate([[0], cumulative])[np.searchsorted(codes, np.arange(n_users))]
+        hits_so_far = cumulative - before_user[codes]
+        
+        max_k = max(ks) if ks else 0
+        discounts = 1 / np.log2(np.arange(max_k) + 2)
+        ideal_dcg = np.concatenate([[0], np.cumsum(discounts)])
+        
+        totals = {'users': n_users, 'relevant_users': int(has_relevant.sum()), 'ks': {}}
+        for k in ks:
+            in_top = (ranks < k) & relevant
+            hits = np.bincount(codes[in_top], minlength=n_users)
+            dcg = np.bincount(codes[in_top], weights=discounts[ranks[in_top]], minlength=n_users)
+            precision_sum = np.bincount(
+                codes[in_top], weights=hits_so_far[in_top] / (ranks[in_top] + 1), minlength=n_users
+            )
             
-            precision = relevant / self.k if self.k > 0 else 0
-            precision_scores.append(precision)
+            relevant_total = total_relevant[has_relevant]
+            ideal = ideal_dcg[np.minimum(relevant_total, k).astype(np.int64)]
+            totals['ks'][k] = {
+                'precision': (hits / k).sum() if k > 0 else 0,
+                'recall': (hits[has_relevant] / relevant_total).sum(),
+                'ndcg': (dcg[has_relevant] / ideal).sum(),
+                'map': (precision_sum[has_relevant] / np.minimum(relevant_total, k)).sum(),
+                'hits': int((hits > 0).sum())
+            }
+        return totals
+    
+    def ranking_metrics(self, ks=None, threshold=3.5):
+        """
+        Precision, Recall, F1, NDCG, MAP and Hit Rate at several K in one pass
+        
+        Items rated >= threshold are relevant. Precision and Hit Rate are
+        averaged over all users, Recall, NDCG and MAP over users with at
+        least one relevant item; F1 combines the averaged Precision and
+        Recall.
         
-        return np.mean(precision_scores) if precision_scores else 0
+        Parameters:
+        ks: Cutoffs to evaluate (default: [self.k])
+        threshold: Rating threshold to consider as "relevant"
+        
+        Returns:
+        {k: {'precision', 'recall', 'f1', 'ndcg', 'map', 'hit_rate'}}
+        """
+        ks = [self.k] if ks is None else list(ks)
+        key = (tuple(ks), threshold)
+        if key not in self._ranking_cache:
+            self._ranking_cache[key] = ranking_from_totals(self.ranking_totals(ks, threshold))
+        return self._ranking_cache[key]
+    
+    def calculate_precision_at_k(self, threshold=3.5):
+        """
+        Precision@K: What proportion of recommended items are relevant?
+        
+        Parameters:
+        threshold: Rating threshold to consider as "relevant"
+        """
+        return self.ranking_metrics(threshold=threshold)[self.k]['precision']
     
     def calculate_recall_at_k(self, threshold=3.5):
         """
@@ -84,43 +168,13 @@ class PerformanceEvaluator:
         Parameters:
         threshold: Rating threshold to consider as "relevant"
         """
-        recall_scores = []
-        
-        for user in self.merged['userId'].unique():
-            user_data = self.merged[self.merged['userId'] == user]
-            
-            # Total relevant items for this user
-            total_relevant = len(user_data[user_data['rating'] >= threshold])
-            
-            if total_relevant == 0:
-                continue
-            
-            # Sort by predicted rating (descending)
-            user_data = user_data.sort_values('predicted_rating', ascending=False)
-            
-            # Top K predictions
-            top_k = user_data.head(self.k)
-            
-            # How many relevant items are in top K?
-            relevant_in_top_k = len(top_k[top_k['rating'] >= threshold])
-            
-            recall = relevant_in_top_k / total_relevant
-            recall_scores.append(recall)
-        
-        return np.mean(recall_scores) if recall_scores else 0
+        return self.ranking_metrics(threshold=threshold)[self.k]['recall']
     
     def calculate_f1_score(self, threshold=3.5):
         """
         F1 Score: Harmonic mean of Precision and Recall
         """
-        precision = self.calculate_precision_at_k(threshold)
-        recall = self.calculate_recall_at_k(threshold)
-        
-        if precision + recall == 0:
-            return 0
-        
-        f1 = 2 * (precision * recall) / (precision + recall)
-        return f1
+        return self.ranking_metrics(threshold=threshold)[self.k]['f1']
     
     def calculate_coverage(self, total_movies):
         """
@@ -138,22 +192,11 @@ class PerformanceEvaluator:
         Diversity: How diverse are the recommendations?
         Measured as average pairwise distance between recommended items
         """
-        # Group by user
-        diversity_scores = []
-        
-        for user in self.predictions['userId'].unique():
-            user_recs = self.predictions[
-                self.predictions['userId'] == user
-            ]['movieId'].values
-            
-            if len(user_recs) < 2:
-                continue
-            
-            # Calculate pairwise uniqueness
-            unique_ratio = len(set(user_recs)) / len(user_recs)
-            diversity_scores.append(unique_ratio)
+        # Share of distinct movies per user, for users with 2+ recommendations
+        per_user = self.predictions.groupby('userId')['movieId'].agg(['nunique', 'size'])
+        per_user = per_user[per_user['size'] >= 2]
         
-        return np.mean(diversity_scores) if diversity_scores else 0
+        return (per_user['nunique'] / per_user['size']).mean() if len(per_user) else 0
     
     def calculate_novelty(self, popularity_dict):
         """
@@ -162,99 +205,235 @@ class PerformanceEvaluator:
         Parameters:
         popularity_dict: Dictionary of {movieId: popularity_score}
         """
-        novelty_scores = []
+        # Lower popularity = higher novelty
+        popularity = self.predictions['movieId'].map(popularity_dict).dropna()
         
-        for _, row in self.predictions.iterrows():
-            movie_id = row['movieId']
-            if movie_id in popularity_dict:
-                # Lower popularity = higher novelty
-                novelty = 1 - popularity_dict[movie_id]
-                novelty_scores.append(novelty)
-        
-        return np.mean(novelty_scores) if novelty_scores else 0
+        return (1 - popularity).mean() if len(popularity) else 0
     
-    def calculate_all_metrics(self, total_movies=None, popularity_dict=None):
-        """
-        Calculate all performance metrics
+    def metric_totals(self, ks=None, threshold=3.5, popularity_dict=None):
         """
-        print("=" * 60)
-        print("PERFORMANCE METRICS EVALUATION")
-        print("=" * 60)
-        
-        metrics = {}
-        
-        # Accuracy Metrics
-        print("\n📊 ACCURACY METRICS:")
-        metrics['RMSE'] = self.calculate_rmse()
-        metrics['MAE'] = self.calculate_mae()
-        print(f"  RMSE: {metrics['RMSE']:.4f}")
-        print(f"  MAE:  {metrics['MAE']:.4f}")
-        
-        # Ranking Metrics
-        print(f"\n🎯 RANKING METRICS (K={self.k}):")
-        metrics[f'Precision@{self.k}'] = self.calculate_precision_at_k()
-        metrics[f'Recall@{self.k}'] = self.calculate_recall_at_k()
-        metrics['F1-Score'] = self.calculate_f1_score()
-        print(f"  Precision@{self.k}: {metrics[f'Precision@{self.k}']:.4f}")
-        print(f"  Recall@{self.k}:    {metrics[f'Recall@{self.k}']:.4f}")
-        print(f"  F1-Score:     {metrics['F1-Score']:.4f}")
+        Additive sums behind every metric, for evaluating disjoint user
+        shards separately (see merge_metric_totals() / metrics_from_totals())
         
-        # Beyond-Accuracy Metrics
-        print("\n🌟 BEYOND-ACCURACY METRICS:")
-        
-        if total_movies:
-            metrics['Coverage'] = self.calculate_coverage(total_movies)
-            print(f"  Coverage:  {metrics['Coverage']:.2f}%")
+        Parameters:
+        ks: Ranking cutoffs (default: [self.k])
+        threshold: Rating threshold to consider as "relevant"
+        popularity_dict: Optional {movieId: popularity_score}, for Novelty
+        """
+        errors = self.merged['predicted_rating'].values - self.merged['rating'].values
         
-        metrics['Diversity'] = self.calculate_diversity()
-        print(f"  Diversity: {metrics['Diversity']:.4f}")
+        per_user = self.predictions.groupby('userId')['movieId'].agg(['nunique', 'size'])
+        per_user = per_user[per_user['size'] >= 2]
         
+        totals = {
+            'count': len(errors),
+            'squared_error': float((errors ** 2).sum()),
+            'absolute_error': float(np.abs(errors).sum()),
+            'ranking': self.ranking_totals(ks, threshold),
+            'movies': np.unique(self.predictions['movieId'].values),
+            'diversity': float((per_user['nunique'] / per_user['size']).sum()),
+            'diversity_users': len(per_user)
+        }
         if popularity_dict:
-            metrics['Novelty'] = self.calculate_novelty(popularity_dict)
-            print(f"  Novelty:   {metrics['Novelty']:.4f}")
-        
-        print("\n" + "=" * 60)
+            popularity = self.predictions['movieId'].map(popularity_dict).dropna()
+            totals['novelty'] = float((1 - popularity).sum())
+            totals['novelty_count'] = len(popularity)
+        return totals
+    
+    def calculate_all_metrics(self, total_movies=None, popularity_dict=None, ks=None):
+        """
+        Calculate all performance metrics
         
+        Parameters:
+        total_movies: Catalog size, for Coverage
+        popularity_dict: {movieId: popularity_score}, for Novelty
+        ks: Extra cutoffs for the ranking metrics, besides self.k
+        """
+        ks = sorted({self.k, *(ks or [])})
+        totals = self.metric_totals(ks, popularity_dict=popularity_dict)
+        metrics = metrics_from_totals(totals, self.k, total_movies)
+        print_metrics(metrics, self.k, ks)
         return metrics
     
     def generate_metrics_report(self, metrics, output_file='performance_metrics_report.txt'):
         """
         Generate comprehensive metrics report
         """
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("PERFORMANCE METRICS REPORT\n")
-            f.write("Movie Recommendation System\n")
-            f.write("=" * 80 + "\n\n")
-            
-            f.write("1. ACCURACY METRICS\n")
-            f.write("-" * 80 + "\n")
-            f.write(f"RMSE (Root Mean Squared Error): {metrics.get('RMSE', 'N/A')}\n")
-            f.write(f"MAE (Mean Absolute Error):      {metrics.get('MAE', 'N/A')}\n\n")
-            
-            f.write("2. RANKING METRICS\n")
-            f.write("-" * 80 + "\n")
-            k = self.k
-            f.write(f"Precision@{k}: {metrics.get(f'Precision@{k}', 'N/A')}\n")
-            f.write(f"Recall@{k}:    {metrics.get(f'Recall@{k}', 'N/A')}\n")
-            f.write(f"F1-Score:      {metrics.get('F1-Score', 'N/A')}\n\n")
-            
-            f.write("3. BEYOND-ACCURACY METRICS\n")
-            f.write("-" * 80 + "\n")
-            f.write(f"Coverage:  {metrics.get('Coverage', 'N/A')}\n")
-            f.write(f"Diversity: {metrics.get('Diversity', 'N/A')}\n")
-            f.write(f"Novelty:   {metrics.get('Novelty', 'N/A')}\n\n")
-            
-            f.write("4. INTERPRETATION\n")
-            f.write("-" * 80 + "\n")
-            f.write("• Lower RMSE/MAE = Better prediction accuracy\n")
-            f.write("• Higher Precision/Recall/F1 = Better ranking quality\n")
-            f.write("• Higher Coverage = More movies recommended\n")
-            f.write("• Higher Diversity = Less repetitive recommendations\n")
-            f.write("• Higher Novelty = More long-tail recommendations\n")
+        return write_metrics_report(metrics, self.k, output_file)
+
+
+def ranking_from_totals(totals):
+    """Turn PerformanceEvaluator.ranking_totals() sums into averaged metrics"""
+    users, relevant_users = totals['users'], totals['relevant_users']
+    results = {}
+    for k, sums in totals['ks'].items():
+        precision = sums['precision'] / users if users else 0
+        recall = sums['recall'] / relevant_users if relevant_users else 0
+        results[k] = {
+            'precision': precision,
+            'recall': recall,
+            'f1': 2 * precision * recall / (precision + recall) if precision + recall else 0,
+            'ndcg': sums['ndcg'] / relevant_users if relevant_users else 0,
+            'map': sums['map'] / relevant_users if relevant_users else 0,
+            'hit_rate': sums['hits'] / users if users else 0
+        }
+    return results
+
+
+def merge_metric_totals(totals_list):
+    """
+    Add up metric_totals() of disjoint user shards
+    
+    Each user's predictions must all be in the same shard.
+    """
+    merged = None
+    for totals in totals_list:
+        if merged is None:
+            merged = {
+                **totals,
+                'ranking': {**totals['ranking'], 'ks': {
+                    k: dict(sums) for k, sums in totals['ranking']['ks'].items()
+                }}
+            }
+            continue
         
-        print(f"\n✅ Report saved to: {output_file}")
-        return output_file
+        for name in ('count', 'squared_error', 'absolute_error', 'diversity',
+                     'diversity_users', 'novelty', 'novelty_count'):
+            if name in merged:
+                merged[name] += totals[name]
+        merged['movies'] = np.union1d(merged['movies'], totals['movies'])
+        merged['ranking']['users'] += totals['ranking']['users']
+        merged['ranking']['relevant_users'] += totals['ranking']['relevant_users']
+        for k, sums in totals['ranking']['ks'].items():
+            for name, value in sums.items():
+                merged['ranking']['ks'][k][name] += value
+    return merged
+
+
+def metrics_from_totals(totals, k, total_movies=None):
+    """
+    Metrics dict (same keys as calculate_all_metrics()) from metric_totals()
+    
+    Parameters:
+    totals: metric_totals() output, or merge_metric_totals() of several
+    k: Cutoff reported as Precision@k / Recall@k / F1-Score
+    total_movies: Catalog size, for Coverage
+    """
+    count = totals['count']
+    metrics = {
+        'RMSE': sqrt(totals['squared_error'] / count) if count else None,
+        'MAE': totals['absolute_error'] / count if count else None
+    }
+    
+    ranking = ranking_from_totals(totals['ranking'])
+    metrics[f'Precision@{k}'] = ranking[k]['precision']
+    metrics[f'Recall@{k}'] = ranking[k]['recall']
+    metrics['F1-Score'] = ranking[k]['f1']
+    for cutoff in sorted(ranking):
+        metrics[f'Precision@{cutoff}'] = ranking[cutoff]['precision']
+        metrics[f'Recall@{cutoff}'] = ranking[cutoff]['recall']
+        metrics[f'NDCG@{cutoff}'] = ranking[cutoff]['ndcg']
+        metrics[f'MAP@{cutoff}'] = ranking[cutoff]['map']
+        metrics[f'HitRate@{cutoff}'] = ranking[cutoff]['hit_rate']
+    
+    if total_movies:
+        metrics['Coverage'] = (len(totals['movies']) / total_movies) * 100
+    
+    users = totals['diversity_users']
+    metrics['Diversity'] = totals['diversity'] / users if users else 0
+    
+    if 'novelty' in totals:
+        novelty_count = totals['novelty_count']
+        metrics['Novelty'] = totals['novelty'] / novelty_count if novelty_count else 0
+    
+    return metrics
+
+
+def print_metrics(metrics, k, ks=None):
+    """
+    Print a metrics dict
+    
+    Parameters:
+    metrics: calculate_all_metrics() / metrics_from_totals() output
+    k: Cutoff of the headline Precision / Recall / F1
+    ks: All ranking cutoffs to print NDCG / MAP / Hit Rate for
+    """
+    print("=" * 60)
+    print("PERFORMANCE METRICS EVALUATION")
+    print("=" * 60)
+    
+    # Accuracy Metrics
+    print("\n📊 ACCURACY METRICS:")
+    print(f"  RMSE: {metrics['RMSE']:.4f}")
+    print(f"  MAE:  {metrics['MAE']:.4f}")
+    
+    # Ranking Metrics
+    print(f"\n🎯 RANKING METRICS (K={k}):")
+    print(f"  Precision@{k}: {metrics[f'Precision@{k}']:.4f}")
+    print(f"  Recall@{k}:    {metrics[f'Recall@{k}']:.4f}")
+    print(f"  F1-Score:     {metrics['F1-Score']:.4f}")
+    for cutoff in ks or [k]:
+        print(f"  @{cutoff:<3} Precision {metrics[f'Precision@{cutoff}']:.4f}  "
+              f"Recall {metrics[f'Recall@{cutoff}']:.4f}  "
+              f"NDCG {metrics[f'NDCG@{cutoff}']:.4f}  MAP {metrics[f'MAP@{cutoff}']:.4f}  "
+              f"Hit Rate {metrics[f'HitRate@{cutoff}']:.4f}")
+    
+    # Beyond-Accuracy Metrics
+    print("\n🌟 BEYOND-ACCURACY METRICS:")
+    if 'Coverage' in metrics:
+        print(f"  Coverage:  {metrics['Coverage']:.2f}%")
+    print(f"  Diversity: {metrics['Diversity']:.4f}")
+    if 'Novelty' in metrics:
+        print(f"  Novelty:   {metrics['Novelty']:.4f}")
+    
+    print("\n" + "=" * 60)
+
+
+def write_metrics_report(metrics, k, output_file='performance_metrics_report.txt'):
+    """
+    Generate comprehensive metrics report
+    
+    Parameters:
+    metrics: Metrics dict
+    k: Cutoff of the reported ranking metrics
+    output_file: Path of the report
+    """
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write("=" * 80 + "\n")
+        f.write("PERFORMANCE METRICS REPORT\n")
+        f.write("Movie Recommendation System\n")
+        f.write("=" * 80 + "\n\n")
+
+        f.write("1. ACCURACY METRICS\n")
+        f.write("-" * 80 + "\n")
+        f.write(f"RMSE (Root Mean Squared Error): {metrics.get('RMSE', 'N/A')}\n")
+        f.write(f"MAE (Mean Absolute Error):      {metrics.get('MAE', 'N/A')}\n\n")
+
+        f.write("2. RANKING METRICS\n")
+        f.write("-" * 80 + "\n")
+        f.write(f"Precision@{k}: {metrics.get(f'Precision@{k}', 'N/A')}\n")
+        f.write(f"Recall@{k}:    {metrics.get(f'Recall@{k}', 'N/A')}\n")
+        f.write(f"F1-Score:      {metrics.get('F1-Score', 'N/A')}\n")
+        f.write(f"NDCG@{k}:      {metrics.get(f'NDCG@{k}', 'N/A')}\n")
+        f.write(f"MAP@{k}:       {metrics.get(f'MAP@{k}', 'N/A')}\n")
+        f.write(f"HitRate@{k}:   {metrics.get(f'HitRate@{k}', 'N/A')}\n\n")
+
+        f.write("3. BEYOND-ACCURACY METRICS\n")
+        f.write("-" * 80 + "\n")
+        f.write(f"Coverage:  {metrics.get('Coverage', 'N/A')}\n")
+        f.write(f"Diversity: {metrics.get('Diversity', 'N/A')}\n")
+        f.write(f"Novelty:   {metrics.get('Novelty', 'N/A')}\n\n")
+
+        f.write("4. INTERPRETATION\n")
+        f.write("-" * 80 + "\n")
+        f.write("• Lower RMSE/MAE = Better prediction accuracy\n")
+        f.write("• Higher Precision/Recall/F1/NDCG/MAP/Hit Rate = Better ranking quality\n")
+        f.write("• Higher Coverage = More movies recommended\n")
+        f.write("• Higher Diversity = Less repetitive recommendations\n")
+        f.write("• Higher Novelty = More long-tail recommendations\n")
+
+    print(f"\n✅ Report saved to: {output_file}")
+    return output_file
 
 
 def test_performance_metrics():
@@ -0,0 +1,246 @@
+# recommendation_tables.py
+#
+# Offline job: precompute top-N collaborative and hybrid recommendations
+# for every user and publish them as a memory-mapped table version:
+#   python recommendation_tables.py
+#
+# The Flask service serves from the current version and picks up a newly
+# published one without a restart.
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from model_artifacts import (
+    current_version_dir, load_or_build_models, new_version, publish_version,
+    source_fingerprint, sources_unchanged, CURRENT_FILE, DATA_DIR
+)
+from recommender import HybridModel
+from user_history import DecayedUserStats, UserHistoryIndex
+
+# Bump whenever the table layout or the way the tables are built changes
+TABLE_VERSION = 3
+
+TABLE_DIR = os.getenv('RECOMMENDATION_TABLE_DIR', 'recommendation_tables')
+TABLE_KINDS = ('collaborative', 'hybrid')
+
+
+def build_tables(models, n=50, hybrid_n=10, cb_weight=0.6, cf_neighbors=20, block_size=256):
+    """
+    Top-n collaborative and top-hybrid_n hybrid lists for every user
+
+    Users are scored block_size at a time with the same block scorers as
+    the bulk endpoint, so the tables hold exactly what the live endpoints
+    would return. Collaborative lists answer any limit up to n; hybrid
+    lists depend on the limit (its CB part takes 2n-1 neighbors per
+    movie), so they only answer limit == hybrid_n.
+
+    Returns:
+    {'<kind>_movie_ids': int32 movieIds (users x width), -1 padded,
+     '<kind>_scores': float32 scores (users x width), NaN padded,
+     'user_ids': userId of every row}
+    """
+    cf_model = models.collaborative_model(k=cf_neighbors)
+    history = UserHistoryIndex.from_ratings(models.ratings_df)
+    hybrid_model = HybridModel.from_parts(
+        cf_model, models.content_model(), history,
+        decay_stats=DecayedUserStats.from_history(history)
+    )
+
+    user_ids = np.asarray(models.interactions.user_ids)
+    n_users = len(user_ids)
+    tables = {'user_ids': user_ids}
+    for kind, width in zip(TABLE_KINDS, (n, hybrid_n)):
+        tables[kind + '_movie_ids'] = np.full((n_users, width), -1, dtype=np.int32)
+        tables[kind + '_scores'] = np.full((n_users, width), np.nan, dtype=np.float32)
+
+    for start in range(0, n_users, block_size):
+        end = min(start + block_size, n_users)
+        block_ids = user_ids[start:end]
+
+        for kind, results in (
+            ('collaborative', cf_model.recommend_block(block_ids, n)),
+            ('hybrid', hybrid_model.recommend_block(block_ids, hybrid_n, cb_weight))
+        ):
+            for row, result in enumerate(results):
+                if result is None:
+                    continue
+                movie_ids, scores = result
+                tables[kind + '_movie_ids'][start + row, :len(movie_ids)] = movie_ids
+                tables[kind + '_scores'][start + row, :len(movie_ids)] = scores
+
+    return tables
+
+
+def save_tables(tables, params, table_dir=TABLE_DIR, data_dir=DATA_DIR, keep=2):
+    """
+    Write tables to a new version directory and make it current
+
+    Parameters:
+    tables: build_tables() output
+    params: Settings the tables depend on (model and table parameters)
+
+    Returns:
+    Path of the new version directory
+    """
+    version, tmp_dir = new_version(table_dir)
+
+    for name, value in tables.items():
+        np.save(os.path.join(tmp_dir, name + '.npy'), np.ascontiguousarray(value))
+
+    manifest = {
+        'format_version': TABLE_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'params': params,
+        'sources': source_fingerprint(data_dir),
+        'arrays': sorted(tables)
+    }
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    return publish_version(table_dir, version, tmp_dir, keep)
+
+
+class RecommendationTables:
+    def __init__(self, model_params, table_dir=TABLE_DIR, data_dir=DATA_DIR,
+                 check_interval=1.0):
+        """
+        Serves precomputed recommendation lists from the current table version
+
+        The CURRENT pointer is checked at most every check_interval seconds;
+        when it moves, the new version is memory-mapped and swapped in with
+        a single reference assignment, so in-flight lookups keep the old
+        arrays. Versions built for other model parameters or older source
+        data are ignored.
+
+        Parameters:
+        model_params: Model build parameters the service runs with
+                      (e.g. {'cb_neighbors_k': 100, 'cf_neighbors_k': 50})
+        table_dir: Directory the batch job publishes versions to
+        check_interval: Seconds between checks for a new version
+        """
+        self.model_params = model_params
+        self.table_dir = table_dir
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._pointer_mtime = None
+        self._next_check = 0
+        self._current = None
+        # Users rated in-process since the tables were built; served live
+        self._stale_users = set()
+
+    def _load(self):
+        """Memory-map the current version, or None if there is no valid one"""
+        version_dir = current_version_dir(self.table_dir)
+        if version_dir is None:
+            return None
+
+        with open(os.path.join(version_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        if manifest.get('format_version') != TABLE_VERSION:
+            return None
+        if manifest['params'].get('model') != self.model_params:
+            return None
+        if not sources_unchanged(manifest.get('sources', {}), self.data_dir):
+            return None
+
+        arrays = {
+            name: np.load(os.path.join(version_dir, name + '.npy'), mmap_mode='r')
+            for name in manifest['arrays']
+        }
+        user_rows = {int(u): i for i, u in enumerate(arrays['user_ids'])}
+        print(f"✅ Serving recommendation tables from: {version_dir}")
+        return {'arrays': arrays, 'params': manifest['params'], 'user_rows': user_rows}
+
+    def current(self):
+        """The table version being served (reloaded when CURRENT moves)"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return self._current
+
+        with self._lock:
+            if now >= self._next_check:
+                try:
+                    mtime = os.stat(os.path.join(self.table_dir, CURRENT_FILE)).st_mtime_ns
+                except OSError:
+                    mtime = None
+                if mtime != self._pointer_mtime:
+                    self._current = self._load() if mtime is not None else None
+                    self._pointer_mtime = mtime
+                self._next_check = now + self.check_interval
+        return self._current
+
+    def mark_stale(self, user_ids):
+        """Serve these users live from now on (their ratings changed in-process)"""
+        self._stale_users.update(int(u) for u in user_ids)
+
+    def lookup(self, kind, user_id, n, cb_weight=None):
+        """
+        Precomputed top-n list of a user
+
+        Parameters:
+        kind: 'collaborative' or 'hybrid'
+        user_id: userId to look up
+        n: Number of recommendations wanted
+        cb_weight: Content-based weight of a hybrid request
+
+        Returns:
+        (movieIds, scores), best first, or None when the table cannot
+        answer (no table, cold or stale user, a limit the table was not
+        built for or a hybrid request with a different cb_weight)
+        """
+        # Non-positive limits are left to the live scorers (an empty list)
+        if n <= 0 or user_id in self._stale_users:
+            return None
+
+        table = self.current()
+        if table is None:
+            return None
+
+        params = table['params']
+        if kind == 'hybrid':
+            if n != params['hybrid_n'] or cb_weight != params['cb_weight']:
+                return None
+        elif n > params['n']:
+            return None
+
+        row = table['user_rows'].get(user_id)
+        if row is None:
+            return None
+
+        movie_ids = table['arrays'][kind + '_movie_ids'][row, :n]
+        scores = table['arrays'][kind + '_scores'][row, :n]
+        filled = movie_ids >= 0
+        return movie_ids[filled], scores[filled]
+
+
+if __name__ == "__main__":
+    cb_neighbors_k = int(os.getenv('CB_NEIGHBORS_K', 100))
+    cf_neighbors_k = int(os.getenv('CF_NEIGHBORS_K', 50))
+    item_neighbors_k = int(os.getenv('ITEM_NEIGHBORS_K', 50))
+    table_n = int(os.getenv('RECOMMENDATION_TABLE_N', 50))
+    hybrid_n = int(os.getenv('RECOMMENDATION_TABLE_HYBRID_N', 10))
+    cb_weight = float(os.getenv('RECOMMENDATION_TABLE_CB_WEIGHT', 0.6))
+
+    models = load_or_build_models(cb_neighbors_k=cb_neighbors_k, cf_neighbors_k=cf_neighbors_k,
+                                  item_neighbors_k=item_neighbors_k)
+
+    print("🏗️ Precomputing recommendation tables...")
+    start = time.time()
+    tables = build_tables(models, n=table_n, hybrid_n=hybrid_n, cb_weight=cb_weight)
+    params = {
+        'model': {'cb_neighbors_k': cb_neighbors_k, 'cf_neighbors_k': cf_neighbors_k},
+        'n': table_n,
+        'hybrid_n': hybrid_n,
+        'cb_weight': cb_weight
+    }
+    version_dir = save_tables(tables, params)
+    print(f"✅ Tables for {len(tables['user_ids']):,} users written to: "
+          f"{version_dir} ({time.time() - start:.2f}s)")
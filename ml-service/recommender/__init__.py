@@ -0,0 +1,27 @@
+# recommender/__init__.py
+#
+# Recommendation models with explicit fit / predict / recommend methods,
+# shared by the Flask service, the offline jobs and the scripts.
+# Importing the package only defines classes; nothing is loaded or fitted
+# until fit() (or load_model()) is called.
+
+from recommender.collaborative import UserBasedCFModel
+from recommender.content import ContentBasedModel
+from recommender.data import DATA_DIR, load_movielens, load_split, split_ratings
+from recommender.hybrid import HybridComponents, HybridModel
+from recommender.item_based import ItemBasedCFModel
+from recommender.persistence import load_model, save_model
+
+__all__ = [
+    'UserBasedCFModel',
+    'ItemBasedCFModel',
+    'ContentBasedModel',
+    'HybridModel',
+    'HybridComponents',
+    'DATA_DIR',
+    'load_movielens',
+    'load_split',
+    'split_ratings',
+    'load_model',
+    'save_model'
+]
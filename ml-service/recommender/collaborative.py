@@ -0,0 +1,202 @@
+# recommender/collaborative.py
+
+import numpy as np
+
+from collaborative_scorer import CollaborativeScorer
+from interaction_matrix import InteractionMatrix
+from user_neighbors import UserNeighborGraph
+
+
+class UserBasedCFModel:
+    def __init__(self, n_neighbors=50, k=10):
+        """
+        User-based collaborative filtering on raw ratings
+
+        A rating is predicted as the similarity-weighted average of the
+        ratings of the user's k most similar users who rated the movie.
+        fit() builds the sparse interaction matrix and the top-n_neighbors
+        user graph once; use from_parts() to wrap already fitted ones.
+
+        Parameters:
+        n_neighbors: Neighbors kept per user when fitting
+        k: Neighbors every prediction / recommendation averages over
+        """
+        self.n_neighbors = n_neighbors
+        self.k = k
+        self.interactions = None
+        self.user_neighbors = None
+
+    @classmethod
+    def from_parts(cls, interactions, user_neighbors, k=10):
+        """Model over an existing InteractionMatrix and UserNeighborGraph"""
+        model = cls(n_neighbors=user_neighbors.k, k=k)
+        model._set_state(interactions, user_neighbors)
+        return model
+
+    def _set_state(self, interactions, user_neighbors):
+        self.interactions = interactions
+        self.user_neighbors = user_neighbors
+        self.scorer = CollaborativeScorer(interactions)
+        self._set_means()
+
+    def _set_means(self):
+        ratings = self.interactions.ratings
+        # Mean over all cells (unrated = 0), the fallback of predictions
+        self.matrix_mean = ratings.sum() / (ratings.shape[0] * ratings.shape[1])
+        self._column_sums = np.asarray(ratings.sum(axis=0)).ravel()
+
+    def fit(self, ratings_df):
+        """
+        Fit on a ratings DataFrame with columns ['userId', 'movieId', 'rating']
+
+        Returns:
+        self
+        """
+        interactions = InteractionMatrix.from_ratings(ratings_df)
+        user_neighbors = UserNeighborGraph.from_interactions(interactions, k=self.n_neighbors)
+        self._set_state(interactions, user_neighbors)
+        return self
+
+    def add_ratings(self, user_ids, movie_ids, ratings):
+        """
+        Add ratings in place and refresh the neighbors of the users who
+        gave them (see InteractionMatrix.add_ratings for what is kept)
+
+        Parameters:
+        user_ids, movie_ids, ratings: Aligned arrays
+
+        Returns:
+        Rows of the users whose ratings changed
+        """
+        rows = self.interactions.add_ratings(user_ids, movie_ids, ratings)
+        self._set_means()
+        for row in rows:
+            self.user_neighbors.refresh_user(self.interactions.ratings, row)
+        return rows
+
+    def get_params(self):
+        return {'n_neighbors': self.n_neighbors, 'k': self.k}
+
+    def to_arrays(self):
+        """All fitted state as a flat {name: array} dict (see from_arrays)"""
+        arrays = {}
+        for name, value in self.interactions.to_arrays().items():
+            arrays['interactions_' + name] = value
+        for name, value in self.user_neighbors.to_arrays().items():
+            arrays['user_neighbors_' + name] = value
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, n_neighbors=50, k=10):
+        """Rebuild from to_arrays() output, without copying the arrays"""
+        def group(prefix):
+            return {
+                name[len(prefix):]: value
+                for name, value in arrays.items() if name.startswith(prefix)
+            }
+
+        model = cls(n_neighbors=n_neighbors, k=k)
+        model._set_state(
+            InteractionMatrix.from_arrays(group('interactions_')),
+            UserNeighborGraph.from_arrays(group('user_neighbors_'))
+        )
+        return model
+
+    def neighbor_ratings(self, user_ids, movie_ids, k=None):
+        """
+        The k most similar users' ratings of each (user, movie) pair
+
+        Returns:
+        (ratings, similarities, fallback): float32 (pairs x k) neighbor
+        ratings (0 = not rated) and similarities, most similar first, and
+        the prediction of pairs no neighbor can be used for (the matrix
+        mean, or the movie's column mean for unknown users)
+        """
+        k = min(self.k if k is None else k, self.user_neighbors.k)
+        user_index = self.interactions.user_index
+        movie_index = self.interactions.movie_index
+        ratings = self.interactions.ratings
+
+        user_rows = np.array([user_index.get(int(u), -1) for u in user_ids], dtype=np.int64)
+        movie_cols = np.array([movie_index.get(int(m), -1) for m in movie_ids], dtype=np.int64)
+        known = (user_rows >= 0) & (movie_cols >= 0)
+
+        neighbor_ratings = np.zeros((len(user_rows), k), dtype=np.float32)
+        neighbor_sims = np.zeros((len(user_rows), k), dtype=np.float32)
+        neighbors, sims = self.user_neighbors.neighbors_of(user_rows[known], k)
+        neighbor_sims[known] = sims
+        neighbor_ratings[known] = np.asarray(
+            ratings[neighbors.ravel(), np.repeat(movie_cols[known], k)]
+        ).reshape(-1, k)
+
+        fallback = np.full(len(user_rows), self.matrix_mean, dtype=np.float64)
+        new_user = (user_rows < 0) & (movie_cols >= 0)
+        fallback[new_user] = self._column_sums[movie_cols[new_user]] / ratings.shape[0]
+        return neighbor_ratings, neighbor_sims, fallback
+
+    def predict(self, user_ids, movie_ids, k=None):
+        """
+        Predicted rating of every (user, movie) pair
+
+        Parameters:
+        user_ids: Array of userIds
+        movie_ids: Array of movieIds, aligned with user_ids
+        k: Neighbors to average over (default: the model's k)
+
+        Returns:
+        float64 array of predictions
+        """
+        ratings, sims, predictions = self.neighbor_ratings(user_ids, movie_ids, k)
+        if ratings.shape[1] == 0:
+            return predictions
+
+        rated = ratings > 0
+        # Running sums keep the neighbor-by-neighbor summation order
+        weighted = np.cumsum(ratings * sims, axis=1)[:, -1]
+        similarity = np.cumsum(np.where(rated, sims, 0), axis=1)[:, -1]
+        usable = rated.any(axis=1) & (similarity > 0)
+        predictions[usable] = weighted[usable] / similarity[usable]
+        return predictions
+
+    def recommend(self, user_id, n=10):
+        """
+        Top-n unrated movies of a user by predicted rating
+
+        Returns:
+        (movieIds, predicted ratings), best first, or None for unknown users
+        """
+        user_idx = self.interactions.user_index.get(int(user_id))
+        if user_idx is None:
+            return None
+
+        neighbor_idx, neighbor_sims = self.user_neighbors.neighbors_of(user_idx, self.k)
+        movie_cols, scores = self.scorer.recommend(user_idx, neighbor_idx, neighbor_sims, n=n)
+        return self.interactions.movie_ids[movie_cols], scores
+
+    def recommend_block(self, user_ids, n=10):
+        """
+        recommend() for many users, scored with one sparse block product
+
+        Returns:
+        One (movieIds, predicted ratings) pair per user, or None for
+        unknown users
+        """
+        user_index = self.interactions.user_index
+        known = [u for u in user_ids if int(u) in user_index]
+        results = [None] * len(user_ids)
+        if not known:
+            return results
+
+        user_idx = self.interactions.user_positions(known)
+        neighbor_idx, neighbor_sims = self.user_neighbors.neighbors_of(user_idx, self.k)
+        movie_cols, scores = self.scorer.recommend_block(
+            user_idx, neighbor_idx, neighbor_sims, n=n
+        )
+
+        found = iter(zip(movie_cols, scores))
+        for i, user_id in enumerate(user_ids):
+            if int(user_id) in user_index:
+                cols, user_scores = next(found)
+                finite = np.isfinite(user_scores)
+                results[i] = (self.interactions.movie_ids[cols[finite]], user_scores[finite])
+        return results
@@ -0,0 +1,273 @@
+# recommender/content.py
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from content_index import ContentNeighborIndex, top_n
+from user_history import SECONDS_PER_YEAR
+
+RATING_COLUMNS = ('userId', 'movieId', 'rating', 'timestamp')
+
+
+class ContentBasedModel:
+    def __init__(self, n_neighbors=100, k=20):
+        """
+        Content-based filtering on TF-IDF genre vectors
+
+        A rating is predicted as the similarity-weighted average of the
+        user's ratings of the k rated movies most similar to the target
+        movie. fit() builds the TF-IDF features, the top-n_neighbors movie
+        index and the per-user rating lists once; use from_parts() to wrap
+        an already fitted ContentNeighborIndex.
+
+        Parameters:
+        n_neighbors: Neighbors kept per movie in the similar-movies index
+        k: Rated movies every prediction averages over
+        """
+        self.n_neighbors = n_neighbors
+        self.k = k
+        self.tfidf = None
+        self.content_index = None
+        self.movie_ids = None
+
+    @classmethod
+    def from_parts(cls, movie_ids, content_index, ratings_df=None, k=20, features=None):
+        """
+        Model over an existing ContentNeighborIndex
+
+        Parameters:
+        movie_ids: movieId of every index row
+        content_index: Fitted ContentNeighborIndex
+        ratings_df: Ratings to predict from (predict/recommend need them;
+                    similar() does not)
+        k: Rated movies every prediction averages over
+        features: L2-normalized feature rows used for predictions
+                  (default: the index's float32 features)
+        """
+        model = cls(n_neighbors=content_index.k, k=k)
+        model._set_state(movie_ids, content_index, features)
+        if ratings_df is not None:
+            model._set_ratings(
+                *(ratings_df[column].values for column in RATING_COLUMNS)
+            )
+        return model
+
+    def _set_state(self, movie_ids, content_index, features=None):
+        self.movie_ids = np.asarray(movie_ids)
+        self.content_index = content_index
+        self.features = content_index.features if features is None else features
+        self.catalog = pd.Index(self.movie_ids)
+
+    def _set_ratings(self, user_ids, movie_ids, ratings, timestamps, mean_rating=None):
+        """
+        Group the ratings by user, keeping their given order within a user
+        (the order ties in similarity are broken in)
+        """
+        order = np.argsort(user_ids, kind='stable')
+        self.user_ids, starts = np.unique(user_ids[order], return_index=True)
+        self.offsets = np.append(starts, len(order)).astype(np.int64)
+        self.rating_movie_ids = np.asarray(movie_ids)[order]
+        self.ratings = np.asarray(ratings, dtype=np.float64)[order]
+        self.timestamps = np.asarray(timestamps)[order]
+        self.mean_rating = (float(np.mean(ratings)) if mean_rating is None
+                            else float(mean_rating))
+
+        # Catalog row of every rating, -1 for movies outside the catalog
+        self._rating_rows = self.catalog.get_indexer(self.rating_movie_ids)
+
+    def fit(self, movies_df, ratings_df):
+        """
+        Fit on the movie catalog (movieId, genres) and the ratings
+        (userId, movieId, rating, timestamp)
+
+        Returns:
+        self
+        """
+        # sklearn is only imported when fitting, keeping the package import light
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.preprocessing import normalize
+
+        self.tfidf = TfidfVectorizer(stop_words='english')
+        tfidf_matrix = self.tfidf.fit_transform(movies_df['genres'].fillna(''))
+        content_index = ContentNeighborIndex.from_tfidf(tfidf_matrix, k=self.n_neighbors)
+
+        # Predictions use full-precision features, as cosine_similarity does
+        self._set_state(movies_df['movieId'].values, content_index, normalize(tfidf_matrix))
+        self._set_ratings(
+            *(ratings_df[column].values for column in RATING_COLUMNS),
+            mean_rating=ratings_df['rating'].mean()
+        )
+        return self
+
+    def get_params(self):
+        return {'n_neighbors': self.n_neighbors, 'k': self.k}
+
+    def to_arrays(self):
+        """All fitted state as a flat {name: array} dict (see from_arrays)"""
+        arrays = {'movie_ids': self.movie_ids}
+        for name, value in self.content_index.to_arrays().items():
+            arrays['content_' + name] = value
+        arrays.update({
+            'prediction_features_data': self.features.data,
+            'prediction_features_indices': self.features.indices,
+            'prediction_features_indptr': self.features.indptr,
+            'ratings_userId': np.repeat(self.user_ids, np.diff(self.offsets)),
+            'ratings_movieId': self.rating_movie_ids,
+            'ratings_rating': self.ratings,
+            'ratings_timestamp': self.timestamps,
+            'ratings_mean': np.array([self.mean_rating])
+        })
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, n_neighbors=100, k=20):
+        """Rebuild from to_arrays() output, without copying the large arrays"""
+        content_index = ContentNeighborIndex.from_arrays({
+            name[len('content_'):]: value
+            for name, value in arrays.items() if name.startswith('content_')
+        })
+        features = sp.csr_matrix(
+            (arrays['prediction_features_data'], arrays['prediction_features_indices'],
+             arrays['prediction_features_indptr']),
+            shape=content_index.features.shape
+        )
+
+        model = cls(n_neighbors=n_neighbors, k=k)
+        model._set_state(arrays['movie_ids'], content_index, features)
+        model._set_ratings(
+            arrays['ratings_userId'], arrays['ratings_movieId'], arrays['ratings_rating'],
+            arrays['ratings_timestamp'], mean_rating=arrays['ratings_mean'][0]
+        )
+        return model
+
+    def ratings_frame(self):
+        """The ratings the model predicts from, grouped by user"""
+        return pd.DataFrame({
+            'userId': np.repeat(self.user_ids, np.diff(self.offsets)),
+            'movieId': self.rating_movie_ids,
+            'rating': self.ratings,
+            'timestamp': self.timestamps
+        })
+
+    def _user_span(self, user_id):
+        """(start, end) of a user's ratings, or None"""
+        position = np.searchsorted(self.user_ids, user_id)
+        if position == len(self.user_ids) or self.user_ids[position] != user_id:
+            return None
+        return int(self.offsets[position]), int(self.offsets[position + 1])
+
+    def rated_neighbors(self, user_ids, movie_ids, k=None):
+        """
+        For every (user, movie) pair, the k movies the user rated that are
+        most similar to the movie (ties keep the rating order)
+
+        Returns:
+        (ratings, similarities, ages, fallback): (pairs x k) ratings,
+        similarities (0 = padding) and seconds between each rating and the
+        user's latest one, most similar first, plus the prediction of pairs
+        whose similarities sum to 0 (the user's mean rating, or the overall
+        mean for users without ratings)
+        """
+        k = max(1, self.k if k is None else k)
+        user_ids = np.asarray(user_ids)
+        target_rows = self.catalog.get_indexer(np.asarray(movie_ids))
+        n_pairs = len(user_ids)
+
+        neighbor_ratings = np.zeros((n_pairs, k))
+        neighbor_sims = np.zeros((n_pairs, k))
+        ages = np.zeros((n_pairs, k))
+        fallback = np.full(n_pairs, self.mean_rating)
+
+        order = np.argsort(user_ids, kind='stable')
+        pair_users, starts = np.unique(user_ids[order], return_index=True)
+        for user_id, positions in zip(pair_users, np.split(order, starts[1:])):
+            span = self._user_span(user_id)
+            if span is None:
+                continue
+            start, end = span
+            fallback[positions] = self.ratings[start:end].mean()
+
+            # Movies outside the catalog are skipped
+            rows = self._rating_rows[start:end]
+            rated = rows >= 0
+            targets = positions[target_rows[positions] >= 0]
+            if not rated.any() or len(targets) == 0:
+                continue
+
+            block = (self.features[target_rows[targets]] @ self.features[rows[rated]].T).toarray()
+            top = top_n(block, k)
+            width = top.shape[1]
+            neighbor_sims[targets, :width] = np.take_along_axis(block, top, axis=1)
+            neighbor_ratings[targets, :width] = self.ratings[start:end][rated][top]
+            timestamps = self.timestamps[start:end]
+            ages[targets, :width] = timestamps.max() - timestamps[rated][top]
+
+        return neighbor_ratings, neighbor_sims, ages, fallback
+
+    def predict(self, user_ids, movie_ids, k=None, decay_factor=0.0):
+        """
+        Predicted rating of every (user, movie) pair
+
+        Parameters:
+        user_ids: Array of userIds
+        movie_ids: Array of movieIds, aligned with user_ids
+        k: Rated movies to average over (default: the model's k)
+        decay_factor: Per-year exponential decay of a rating's weight with
+                      its age relative to the user's latest rating (0 = none)
+
+        Returns:
+        float64 array of predictions
+        """
+        ratings, sims, ages, predictions = self.rated_neighbors(user_ids, movie_ids, k)
+        weights = sims * np.exp(-decay_factor * ages / SECONDS_PER_YEAR)
+
+        # Running sums keep the movie-by-movie summation order
+        weighted = np.cumsum(weights * ratings, axis=1)[:, -1]
+        similarity = np.cumsum(weights, axis=1)[:, -1]
+        usable = similarity > 0
+        predictions[usable] = weighted[usable] / similarity[usable]
+        return predictions
+
+    def recommend(self, user_id, n=10, block_size=1024):
+        """
+        Top-n catalog movies the user has not rated, by predicted rating
+
+        The catalog is scored block_size movies at a time.
+
+        Returns:
+        (movieIds, predicted ratings), best first, or None for users
+        without ratings
+        """
+        span = self._user_span(user_id)
+        if span is None:
+            return None
+        rated_rows = self._rating_rows[span[0]:span[1]]
+        candidates = np.setdiff1d(np.arange(len(self.movie_ids)), rated_rows)
+
+        scores = np.empty(len(candidates))
+        for start in range(0, len(candidates), block_size):
+            block = candidates[start:start + block_size]
+            scores[start:start + len(block)] = self.predict(
+                np.full(len(block), user_id), self.movie_ids[block]
+            )
+
+        top = top_n(scores, n)
+        return self.movie_ids[candidates[top]], scores[top]
+
+    def similar(self, movie_ids, n=10):
+        """
+        The n most similar movies of each given movie
+
+        Parameters:
+        movie_ids: Array of movieIds (all must be in the catalog)
+        n: Neighbors per movie
+
+        Returns:
+        (movieIds, similarities), both (len(movie_ids) x n), most similar first
+        """
+        rows = self.catalog.get_indexer(np.asarray(movie_ids))
+        if (rows < 0).any():
+            raise KeyError(f"Unknown movieIds: {np.asarray(movie_ids)[rows < 0].tolist()}")
+        neighbor_rows, scores = self.content_index.similar_batch(rows, n)
+        return self.movie_ids[neighbor_rows], scores
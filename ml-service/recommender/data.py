@@ -0,0 +1,44 @@
+# recommender/data.py
+
+import os
+
+import pandas as pd
+
+DATA_DIR = 'data/ml-latest-small'
+
+
+def load_movielens(data_dir=DATA_DIR):
+    """
+    Read the MovieLens CSVs
+
+    Returns:
+    (movies, ratings) DataFrames; missing genres are filled with ''
+    """
+    movies = pd.read_csv(os.path.join(data_dir, 'movies.csv'))
+    ratings = pd.read_csv(os.path.join(data_dir, 'ratings.csv'))
+    movies['genres'] = movies['genres'].fillna('')
+    return movies, ratings
+
+
+def split_ratings(ratings, test_size=0.2, random_state=42):
+    """
+    Random train/test split of the ratings
+
+    Returns:
+    (train_ratings, test_ratings)
+    """
+    from sklearn.model_selection import train_test_split
+
+    return train_test_split(ratings, test_size=test_size, random_state=random_state)
+
+
+def load_split(data_dir=DATA_DIR, test_size=0.2, random_state=42):
+    """
+    Load the ratings and split them 80/20
+
+    Returns:
+    (movies, train_ratings, test_ratings)
+    """
+    movies, ratings = load_movielens(data_dir)
+    train_ratings, test_ratings = split_ratings(ratings, test_size, random_state)
+    return movies, train_ratings, test_ratings
@@ -0,0 +1,259 @@
+# recommender/hybrid.py
+
+import numpy as np
+
+from hybrid_engine import HybridEngine
+from recommender.collaborative import UserBasedCFModel
+from recommender.content import ContentBasedModel
+from user_history import SECONDS_PER_YEAR, DecayedUserStats, UserHistoryIndex
+
+
+class HybridModel:
+    def __init__(self, cf_model=None, cb_model=None, cb_weight=0.6, recent_ratings=5,
+                 decay_factor=0.1):
+        """
+        Blend of a UserBasedCFModel and a ContentBasedModel
+
+        predict() blends the two predicted ratings; recommend() fuses the
+        max-scaled CF scores with content scores seeded by the user's most
+        recent ratings (see HybridEngine), each seed weighted by its
+        time decay. fit() fits both component models (default ones if
+        none are given); use from_parts() to combine fitted ones.
+
+        Parameters:
+        cf_model: UserBasedCFModel
+        cb_model: ContentBasedModel
+        cb_weight: Weight of the content-based part (CF gets 1 - cb_weight)
+        recent_ratings: Number of most recent ratings recommend() starts from
+        decay_factor: Per-year decay of the recent ratings' weights (0 = none)
+        """
+        self.cf_model = cf_model
+        self.cb_model = cb_model
+        self.cb_weight = cb_weight
+        self.recent_ratings = recent_ratings
+        self.decay_factor = decay_factor
+        self.engine = None
+
+    @classmethod
+    def from_parts(cls, cf_model, cb_model, history, decay_stats=None, cb_weight=0.6,
+                   recent_ratings=5):
+        """
+        Model over fitted component models
+
+        Parameters:
+        history: UserHistoryIndex the recent ratings are read from
+        decay_stats: Optional DecayedUserStats, e.g. one kept up to date
+                     by a TemporalAnalyzer
+        """
+        decay_factor = decay_stats.decay_factor if decay_stats is not None else 0.0
+        model = cls(cf_model, cb_model, cb_weight, recent_ratings, decay_factor)
+        model._set_state(history, decay_stats)
+        return model
+
+    def _set_state(self, history, decay_stats):
+        self.history = history
+        self.decay_stats = decay_stats
+        self.engine = HybridEngine(
+            self.cb_model.content_index, self.cf_model.scorer, self.cf_model.user_neighbors,
+            history, self.cb_model.movie_ids, recent_ratings=self.recent_ratings,
+            cf_neighbors=self.cf_model.k, decay_stats=decay_stats
+        )
+
+    def _set_history(self, ratings_df):
+        history = UserHistoryIndex.from_ratings(ratings_df)
+        decay_stats = None
+        if self.decay_factor:
+            decay_stats = DecayedUserStats.from_history(history, self.decay_factor)
+        self._set_state(history, decay_stats)
+
+    def fit(self, movies_df, ratings_df):
+        """
+        Fit both component models and the rating history
+
+        Returns:
+        self
+        """
+        self.cf_model = (self.cf_model or UserBasedCFModel()).fit(ratings_df)
+        self.cb_model = (self.cb_model or ContentBasedModel()).fit(movies_df, ratings_df)
+        self._set_history(ratings_df)
+        return self
+
+    def get_params(self):
+        return {
+            'cb_weight': self.cb_weight,
+            'recent_ratings': self.recent_ratings,
+            'decay_factor': self.decay_factor,
+            'cf_params': self.cf_model.get_params(),
+            'cb_params': self.cb_model.get_params()
+        }
+
+    def to_arrays(self):
+        """Both component models' state, prefixed with cf_ / cb_"""
+        arrays = {}
+        for prefix, model in (('cf_', self.cf_model), ('cb_', self.cb_model)):
+            for name, value in model.to_arrays().items():
+                arrays[prefix + name] = value
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, cf_params=None, cb_params=None, cb_weight=0.6,
+                    recent_ratings=5, decay_factor=0.1):
+        """
+        Rebuild from to_arrays() output; the rating history is rebuilt
+        from the content model's ratings
+        """
+        def group(prefix):
+            return {
+                name[len(prefix):]: value
+                for name, value in arrays.items() if name.startswith(prefix)
+            }
+
+        model = cls(
+            UserBasedCFModel.from_arrays(group('cf_'), **(cf_params or {})),
+            ContentBasedModel.from_arrays(group('cb_'), **(cb_params or {})),
+            cb_weight, recent_ratings, decay_factor
+        )
+        model._set_history(model.cb_model.ratings_frame())
+        return model
+
+    def predict(self, user_ids, movie_ids, cb_weight=None):
+        """
+        Blend of the component models' predicted ratings
+
+        Returns:
+        float64 array of predictions
+        """
+        return self.blend(
+            self.cf_model.predict(user_ids, movie_ids),
+            self.cb_model.predict(user_ids, movie_ids),
+            cb_weight
+        )
+
+    def blend(self, cf_predictions, cb_predictions, cb_weight=None):
+        """Blend already computed component predictions the way predict() does"""
+        cb_weight = self.cb_weight if cb_weight is None else cb_weight
+        return (1 - cb_weight) * np.asarray(cf_predictions) + cb_weight * np.asarray(cb_predictions)
+
+    def recommend(self, user_id, n=10, cb_weight=None):
+        """
+        Top-n hybrid recommendations for a user
+
+        Returns:
+        (movieIds, hybrid scores), best first, or None when the user has
+        no rating history
+        """
+        cb_weight = self.cb_weight if cb_weight is None else cb_weight
+        result = self.engine.recommend(int(user_id), n, cb_weight)
+        if result is None:
+            return None
+        rows, scores = result
+        return self.cb_model.movie_ids[rows], scores
+
+    def recommend_block(self, user_ids, n=10, cb_weight=None):
+        """
+        recommend() for many users, scored as one block
+
+        Returns:
+        One (movieIds, hybrid scores) pair per user, or None for users
+        without rating history
+        """
+        cb_weight = self.cb_weight if cb_weight is None else cb_weight
+        return [
+            None if result is None else (self.cb_model.movie_ids[result[0]], result[1])
+            for result in self.engine.recommend_block(user_ids, n, cb_weight)
+        ]
+
+
+class HybridComponents:
+    def __init__(self, actuals, cf_ratings, cf_sims, cf_fallback,
+                 cb_ratings, cb_sims, cb_ages, cb_fallback):
+        """
+        Inputs of the CF and content-based predictions of a set of test
+        rows, computed once and kept as arrays
+
+        Every row holds its K most similar neighbors (users for CF, movies
+        the user rated for content-based), most similar first, so the
+        prediction for any smaller K comes from prefix sums of the same
+        row, and a hybrid is just a weighted sum of two arrays. Use
+        from_models() to build one.
+
+        Parameters:
+        actuals: Actual rating of every test row
+        cf_ratings: float32 (rows x K) neighbors' ratings of the movie, 0 = not rated
+        cf_sims: float32 (rows x K) similarity of each neighbor
+        cf_fallback: CF prediction of rows without a usable neighbor
+        cb_ratings: (rows x K) ratings of the user's most similar rated movies
+        cb_sims: (rows x K) similarity of each of those movies, 0 = padding
+        cb_ages: (rows x K) seconds between each of those ratings and the user's latest one
+        cb_fallback: Content-based prediction of rows whose similarities sum to 0
+        """
+        self.actuals = np.asarray(actuals, dtype=np.float64)
+        self.cf_fallback = cf_fallback
+        self.cb_ratings = cb_ratings
+        self.cb_sims = cb_sims
+        self.cb_ages = cb_ages
+        self.cb_fallback = cb_fallback
+        self.cf_k = cf_ratings.shape[1]
+        self.cb_k = cb_ratings.shape[1]
+
+        # Column j holds the sums over the j + 1 most similar neighbors
+        rated = cf_ratings > 0
+        self._cf_weighted = np.cumsum(cf_ratings * cf_sims, axis=1)
+        self._cf_similarity = np.cumsum(np.where(rated, cf_sims, 0), axis=1)
+        self._cf_rated = np.cumsum(rated, axis=1)
+        self._cb_sums = {}
+
+    @classmethod
+    def from_models(cls, cf_model, cb_model, test_df, cf_k=50, cb_k=50):
+        """
+        Build for the rows of test_df (userId, movieId, rating)
+
+        Parameters:
+        cf_model: Fitted UserBasedCFModel
+        cb_model: Fitted ContentBasedModel
+        cf_k: Largest CF neighborhood that will be asked for
+        cb_k: Largest content-based neighborhood that will be asked for
+        """
+        user_ids = test_df['userId'].values
+        movie_ids = test_df['movieId'].values
+        cf_ratings, cf_sims, cf_fallback = cf_model.neighbor_ratings(user_ids, movie_ids, cf_k)
+        cb_ratings, cb_sims, cb_ages, cb_fallback = cb_model.rated_neighbors(
+            user_ids, movie_ids, cb_k
+        )
+        return cls(test_df['rating'].values, cf_ratings, cf_sims, cf_fallback,
+                   cb_ratings, cb_sims, cb_ages, cb_fallback)
+
+    def collaborative(self, k=10):
+        """CF prediction of every row from its k most similar users"""
+        column = min(k, self.cf_k) - 1
+        weighted = self._cf_weighted[:, column]
+        similarity = self._cf_similarity[:, column]
+        usable = (self._cf_rated[:, column] > 0) & (similarity > 0)
+
+        predictions = self.cf_fallback.copy()
+        predictions[usable] = weighted[usable] / similarity[usable]
+        return predictions
+
+    def content_based(self, k=20, decay_factor=0.0):
+        """
+        Content-based prediction of every row from the k most similar
+        movies the user rated
+
+        Parameters:
+        k: Number of similar rated movies used
+        decay_factor: Per-year exponential decay of a rating's weight with
+                      its age relative to the user's latest rating (0 = none)
+        """
+        sums = self._cb_sums.get(decay_factor)
+        if sums is None:
+            weights = self.cb_sims * np.exp(-decay_factor * self.cb_ages / SECONDS_PER_YEAR)
+            sums = (np.cumsum(weights * self.cb_ratings, axis=1), np.cumsum(weights, axis=1))
+            self._cb_sums[decay_factor] = sums
+
+        column = min(k, self.cb_k) - 1
+        weighted, similarity = sums[0][:, column], sums[1][:, column]
+        usable = similarity > 0
+
+        predictions = self.cb_fallback.copy()
+        predictions[usable] = weighted[usable] / similarity[usable]
+        return predictions
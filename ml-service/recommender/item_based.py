@@ -0,0 +1,216 @@
+# recommender/item_based.py
+
+import numpy as np
+
+from content_index import top_n
+from interaction_matrix import InteractionMatrix
+from item_neighbors import ItemNeighborGraph, center_rows, user_means
+
+
+class ItemBasedCFModel:
+    def __init__(self, n_neighbors=50, shrinkage=0.5):
+        """
+        Item-based collaborative filtering on mean-centered ratings
+
+        A rating is predicted as the user's mean rating plus the
+        similarity-weighted average of the user's deviations from it on
+        the movie's precomputed neighbors that the user rated:
+
+            r(u, i) = mean(u) + sum_j s(i, j) (r(u, j) - mean(u)) / (sum_j s(i, j) + shrinkage)
+
+        The shrinkage pulls movies backed by little neighbor similarity
+        towards the user's mean, so one weakly similar rated movie cannot
+        put a movie at the top of the list.
+
+        Scoring is a sparse product of the user's centered rating row with
+        the neighbor matrix, so only the user's own row is read at request
+        time. Movie neighborhoods change slowly, so they are fitted with the
+        other model artifacts instead of on every new rating; use
+        from_parts() to wrap already fitted ones.
+
+        Parameters:
+        n_neighbors: Neighbors kept per movie when fitting
+        shrinkage: Similarity mass added to every prediction's denominator
+        """
+        self.n_neighbors = n_neighbors
+        self.shrinkage = shrinkage
+        self.interactions = None
+        self.item_neighbors = None
+
+    @classmethod
+    def from_parts(cls, interactions, item_neighbors, shrinkage=0.5):
+        """Model over an existing InteractionMatrix and ItemNeighborGraph"""
+        model = cls(n_neighbors=item_neighbors.k, shrinkage=shrinkage)
+        model._set_state(interactions, item_neighbors)
+        return model
+
+    def _set_state(self, interactions, item_neighbors):
+        self.interactions = interactions
+        self.item_neighbors = item_neighbors
+        self.refresh_means()
+
+    def refresh_means(self):
+        """Recompute the rating means after the (shared) InteractionMatrix changed"""
+        ratings = self.interactions.ratings
+        self.user_means = user_means(ratings)
+        # Mean of all ratings, the prediction for unknown users
+        self.global_mean = float(ratings.data.mean()) if ratings.nnz else 0.0
+        self.rating_range = (
+            (float(ratings.data.min()), float(ratings.data.max())) if ratings.nnz else (0.0, 0.0)
+        )
+
+    def fit(self, ratings_df):
+        """
+        Fit on a ratings DataFrame with columns ['userId', 'movieId', 'rating']
+
+        Returns:
+        self
+        """
+        interactions = InteractionMatrix.from_ratings(ratings_df)
+        item_neighbors = ItemNeighborGraph.from_interactions(interactions, k=self.n_neighbors)
+        self._set_state(interactions, item_neighbors)
+        return self
+
+    def get_params(self):
+        return {'n_neighbors': self.n_neighbors, 'shrinkage': self.shrinkage}
+
+    def to_arrays(self):
+        """All fitted state as a flat {name: array} dict (see from_arrays)"""
+        arrays = {}
+        for name, value in self.interactions.to_arrays().items():
+            arrays['interactions_' + name] = value
+        for name, value in self.item_neighbors.to_arrays().items():
+            arrays['item_neighbors_' + name] = value
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, n_neighbors=50, shrinkage=0.5):
+        """Rebuild from to_arrays() output, without copying the arrays"""
+        def group(prefix):
+            return {
+                name[len(prefix):]: value
+                for name, value in arrays.items() if name.startswith(prefix)
+            }
+
+        model = cls(n_neighbors=n_neighbors, shrinkage=shrinkage)
+        model._set_state(
+            InteractionMatrix.from_arrays(group('interactions_')),
+            ItemNeighborGraph.from_arrays(group('item_neighbors_'))
+        )
+        return model
+
+    def centered_rows(self, user_idx):
+        """
+        Rating rows of the given users minus each user's mean
+
+        Built per call from the row slice, so no centered copy of the
+        (possibly memory-mapped) ratings has to be kept.
+        """
+        return center_rows(self.interactions.ratings[user_idx], self.user_means[user_idx])
+
+    def predict(self, user_ids, movie_ids):
+        """
+        Predicted rating of every (user, movie) pair
+
+        Pairs where the user rated none of the movie's neighbors get the
+        user's mean rating; unknown users get the mean of all ratings.
+
+        Parameters:
+        user_ids: Array of userIds
+        movie_ids: Array of movieIds, aligned with user_ids
+
+        Returns:
+        float64 array of predictions
+        """
+        user_index = self.interactions.user_index
+        movie_index = self.interactions.movie_index
+        user_rows = np.array([user_index.get(int(u), -1) for u in user_ids], dtype=np.int64)
+        movie_cols = np.array([movie_index.get(int(m), -1) for m in movie_ids], dtype=np.int64)
+
+        predictions = np.full(len(user_rows), self.global_mean, dtype=np.float64)
+        known_user = user_rows >= 0
+        predictions[known_user] = self.user_means[user_rows[known_user]]
+
+        known = known_user & (movie_cols >= 0)
+        if not known.any():
+            return predictions
+
+        neighbor_sims = self.item_neighbors.similarities[movie_cols[known]]
+        weighted = np.asarray(
+            neighbor_sims.multiply(self.centered_rows(user_rows[known])).sum(axis=1)
+        ).ravel()
+        similarity = np.asarray(
+            neighbor_sims.multiply(self.interactions.rated_rows(user_rows[known])).sum(axis=1)
+        ).ravel()
+
+        usable = similarity > 0
+        rows = np.flatnonzero(known)[usable]
+        predictions[rows] += weighted[usable] / (similarity[usable] + self.shrinkage)
+        return np.clip(predictions, *self.rating_range)
+
+    def score_block(self, user_idx):
+        """
+        Predicted rating of every movie for a block of users, with two
+        sparse matrix products against the neighbor matrix
+
+        Parameters:
+        user_idx: Rows of the target users
+
+        Returns:
+        Dense float32 (users x movies) block; -inf for movies the user
+        rated and for movies with no rated neighbor
+        """
+        user_idx = np.asarray(user_idx, dtype=np.int64)
+        neighbors_t = self.item_neighbors.transposed
+        rated = self.interactions.rated_rows(user_idx)
+
+        weighted = (self.centered_rows(user_idx) @ neighbors_t).toarray()
+        similarity = (rated @ neighbors_t).toarray()
+
+        scores = np.full(weighted.shape, -np.inf, dtype=np.float32)
+        candidates = similarity > 0
+        own_rows, own_cols = rated.nonzero()
+        candidates[own_rows, own_cols] = False
+
+        deviations = np.zeros_like(weighted)
+        np.divide(weighted, similarity + self.shrinkage, out=deviations, where=candidates)
+        scores[candidates] = np.clip(
+            (self.user_means[user_idx][:, None] + deviations)[candidates], *self.rating_range
+        )
+        return scores
+
+    def recommend(self, user_id, n=10):
+        """
+        Top-n unrated movies of a user by predicted rating
+
+        Returns:
+        (movieIds, predicted ratings), best first, or None for unknown users
+        """
+        results = self.recommend_block([user_id], n)
+        return results[0]
+
+    def recommend_block(self, user_ids, n=10):
+        """
+        recommend() for many users, scored as one block
+
+        Returns:
+        One (movieIds, predicted ratings) pair per user, or None for
+        unknown users
+        """
+        user_index = self.interactions.user_index
+        known = [u for u in user_ids if int(u) in user_index]
+        results = [None] * len(user_ids)
+        if not known:
+            return results
+
+        scores = self.score_block(self.interactions.user_positions(known))
+        top = top_n(scores, n)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+
+        found = iter(zip(top, top_scores))
+        for i, user_id in enumerate(user_ids):
+            if int(user_id) in user_index:
+                cols, user_scores = next(found)
+                finite = np.isfinite(user_scores)
+                results[i] = (self.interactions.movie_ids[cols[finite]], user_scores[finite])
+        return results
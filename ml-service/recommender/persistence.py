@@ -0,0 +1,57 @@
+# recommender/persistence.py
+
+import json
+import os
+
+import numpy as np
+
+from recommender.collaborative import UserBasedCFModel
+from recommender.content import ContentBasedModel
+from recommender.hybrid import HybridModel
+from recommender.item_based import ItemBasedCFModel
+
+MODEL_CLASSES = {
+    cls.__name__: cls
+    for cls in (UserBasedCFModel, ItemBasedCFModel, ContentBasedModel, HybridModel)
+}
+MANIFEST_FILE = 'model.json'
+
+
+def save_model(model, model_dir):
+    """
+    Write a fitted model as one .npy file per array plus a manifest with
+    its class and parameters
+
+    Parameters:
+    model: UserBasedCFModel, ItemBasedCFModel, ContentBasedModel or HybridModel
+    model_dir: Directory to write to (created if missing)
+    """
+    os.makedirs(model_dir, exist_ok=True)
+    arrays = model.to_arrays()
+    for name, value in arrays.items():
+        np.save(os.path.join(model_dir, name + '.npy'), np.ascontiguousarray(value))
+
+    manifest = {
+        'model': type(model).__name__,
+        'params': model.get_params(),
+        'arrays': sorted(arrays)
+    }
+    with open(os.path.join(model_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_model(model_dir, mmap_mode='r'):
+    """
+    Load a model written by save_model()
+
+    Arrays are memory-mapped by default, so loading costs little more
+    than rebuilding the id maps.
+    """
+    with open(os.path.join(model_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    arrays = {
+        name: np.load(os.path.join(model_dir, name + '.npy'), mmap_mode=mmap_mode)
+        for name in manifest['arrays']
+    }
+    return MODEL_CLASSES[manifest['model']].from_arrays(arrays, **manifest['params'])
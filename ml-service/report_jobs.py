@@ -0,0 +1,100 @@
+# report_jobs.py
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class ReportJobs:
+    def __init__(self, build_fn, version_fn, max_jobs=100, max_results=2):
+        """
+        Runs report builds in background threads and keeps the finished
+        reports in memory, keyed by data version
+
+        A submit() for a version that is already built returns a finished
+        job at once; one that is already being built returns the running
+        job, so concurrent requests never build the same report twice.
+
+        Parameters:
+        build_fn: Callable returning an iterable of report text chunks
+        version_fn: Callable returning the version of the underlying data
+        max_jobs: Job records kept for status queries
+        max_results: Finished reports kept (the newest versions)
+        """
+        self.build_fn = build_fn
+        self.version_fn = version_fn
+        self.max_jobs = max_jobs
+        self.max_results = max_results
+
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._running = {}
+        self._results = OrderedDict()
+
+    def _record(self, version, status):
+        job = {
+            'job_id': uuid.uuid4().hex,
+            'version': version,
+            'status': status,
+            'created': time.time(),
+            'finished': time.time() if status == 'done' else None,
+            'error': None
+        }
+        self._jobs[job['job_id']] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def submit(self):
+        """
+        Start building the report of the current data version
+
+        Returns:
+        Job dict (job_id, version, status: 'running' | 'done' | 'failed', ...)
+        """
+        version = self.version_fn()
+        with self._lock:
+            if version in self._results:
+                return dict(self._record(version, 'done'))
+            running = self._running.get(version)
+            if running is not None:
+                return dict(running)
+
+            job = self._record(version, 'running')
+            self._running[version] = job
+
+        threading.Thread(target=self._run, args=(job,), daemon=True).start()
+        return dict(job)
+
+    def _run(self, job):
+        try:
+            report = ''.join(self.build_fn())
+        except Exception as e:
+            with self._lock:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+                job['finished'] = time.time()
+                self._running.pop(job['version'], None)
+            return
+
+        with self._lock:
+            self._results[job['version']] = report
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+            job['status'] = 'done'
+            job['finished'] = time.time()
+            self._running.pop(job['version'], None)
+
+    def status(self, job_id):
+        """Job dict of job_id, or None for unknown (or expired) jobs"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def result(self, version=None):
+        """Finished report text of a version (default: current), or None"""
+        if version is None:
+            version = self.version_fn()
+        with self._lock:
+            return self._results.get(version)
@@ -0,0 +1,219 @@
+# response_cache.py
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, request
+
+
+class LocalCacheBackend:
+    def __init__(self):
+        """
+        In-process stand-in for a shared cache (same interface as
+        RedisCacheBackend), for tests and single-machine development
+        """
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+
+
+class RedisCacheBackend:
+    def __init__(self, url):
+        """
+        Shared cache in Redis, so all workers and machines reuse each
+        other's responses
+
+        Parameters:
+        url: Redis URL, e.g. redis://localhost:6379/0
+        """
+        import redis  # optional dependency, only needed for this backend
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl):
+        self._client.set(key, value, ex=max(1, int(ttl)))
+
+
+def backend_from_env():
+    """
+    Shared backend selected by RESPONSE_CACHE_BACKEND: unset for none,
+    'local' for LocalCacheBackend, or a redis:// URL
+    """
+    setting = os.getenv('RESPONSE_CACHE_BACKEND', '')
+    if not setting:
+        return None
+    if setting == 'local':
+        return LocalCacheBackend()
+    if setting.startswith(('redis://', 'rediss://')):
+        try:
+            return RedisCacheBackend(setting)
+        except ImportError:
+            print("⚠️ redis package not installed, shared response cache disabled")
+            return None
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {setting}")
+
+
+class ResponseCache:
+    def __init__(self, max_entries=1024, backend=None, version_fn=None, check_interval=5.0):
+        """
+        Bounded TTL + LRU cache for JSON endpoint responses
+
+        Entries are keyed on the endpoint, its URL arguments and its
+        normalized query args, and prefixed with the current data version:
+        when version_fn reports a new version (checked at most every
+        check_interval seconds), local entries are dropped and shared
+        entries of the old version are no longer read.
+
+        Parameters:
+        max_entries: Local entries kept before the least recently used is evicted
+        backend: Optional shared cache (LocalCacheBackend / RedisCacheBackend)
+        version_fn: Callable returning the version of the underlying data
+        check_interval: Seconds between version_fn calls
+        """
+        self.max_entries = max_entries
+        self.backend = backend
+        self.version_fn = version_fn
+        self.check_interval = check_interval
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = version_fn() if version_fn else ''
+        self._next_check = time.monotonic() + check_interval
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.endpoint_stats = {}
+
+    def _check_version(self):
+        """Drop everything if the underlying data changed"""
+        if self.version_fn is None:
+            return
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        version = self.version_fn()
+        if version != self._version:
+            with self._lock:
+                self._version = version
+                self._entries.clear()
+
+    def _key(self, endpoint, args):
+        query = '&'.join(f'{name}={value}' for name, value in sorted(args.items()))
+        key = f'{self._version}:{endpoint}?{query}'
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _count(self, endpoint, outcome):
+        stats = self.endpoint_stats.setdefault(endpoint, {'hits': 0, 'misses': 0})
+        stats[outcome] += 1
+
+    def get(self, key):
+        """Cached body for key, or None (local first, then the shared backend)"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, body = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return body
+                del self._entries[key]
+
+        if self.backend is not None:
+            body = self.backend.get(key)
+            if body is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                return body
+        return None
+
+    def set(self, key, body, ttl):
+        """Store a response body locally and in the shared backend"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        if self.backend is not None:
+            self.backend.set(key, body, ttl)
+
+    def cached(self, ttl, args=None):
+        """
+        Decorator caching successful (200) JSON responses of a view
+
+        Parameters:
+        ttl: Seconds an entry stays valid
+        args: {name: default} of the query args that affect the response;
+              values are parsed with the default's type, so '?limit=10',
+              '?limit=010' and no limit at all share one entry
+        """
+        args = args or {}
+
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*view_args, **view_kwargs):
+                self._check_version()
+                endpoint = request.endpoint or view.__name__
+                normalized = dict(view_kwargs)
+                for name, default in args.items():
+                    normalized[name] = request.args.get(name, default=default, type=type(default))
+
+                key = self._key(endpoint, normalized)
+                body = self.get(key)
+                with self._lock:
+                    self._count(endpoint, 'hits' if body is not None else 'misses')
+                    if body is None:
+                        self.misses += 1
+
+                if body is not None:
+                    response = Response(body, mimetype='application/json')
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                response = view(*view_args, **view_kwargs)
+                if isinstance(response, Response) and response.status_code == 200:
+                    self.set(key, response.get_data(), ttl)
+                    response.headers['X-Cache'] = 'MISS'
+                return response
+            return wrapper
+        return decorator
+
+    def stats(self):
+        """Hit/miss counters and size"""
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'shared_backend': type(self.backend).__name__ if self.backend else None,
+            'data_version': self._version,
+            'endpoints': {name: dict(counts) for name, counts in self.endpoint_stats.items()}
+        }
@@ -0,0 +1,155 @@
+# search_index.py
+
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+
+import numpy as np
+
+EMPTY = np.empty(0, dtype=np.int32)
+TOKEN_PATTERN = re.compile(r'\w+')
+
+
+def _intersect(postings):
+    """Intersect sorted row arrays, smallest first"""
+    postings = sorted(postings, key=len)
+    rows = postings[0]
+    for other in postings[1:]:
+        if len(rows) == 0:
+            break
+        rows = np.intersect1d(rows, other, assume_unique=True)
+    return rows
+
+
+class MovieSearchIndex:
+    def __init__(self, titles, genres, max_ngram=3, cache_size=4096):
+        """
+        Inverted indexes over movie titles and genres
+
+        Titles get 1..max_ngram character n-gram postings (substring search)
+        and word-token postings (prefix search). Genres get one bitmask per
+        movie. Rows are positions in the catalog, so results come back in
+        catalog order.
+
+        Parameters:
+        titles: Movie titles, one per catalog row
+        genres: '|'-separated genre strings, one per catalog row
+        max_ngram: Longest character n-gram indexed
+        cache_size: Number of recent queries / prefixes kept in the LRU caches
+        """
+        self.titles = [str(t).lower() if isinstance(t, str) else '' for t in titles]
+        self.max_ngram = max_ngram
+
+        # Character n-gram and token postings for titles
+        grams = defaultdict(list)
+        tokens = defaultdict(list)
+        for row, title in enumerate(self.titles):
+            seen = set()
+            for n in range(1, max_ngram + 1):
+                for i in range(len(title) - n + 1):
+                    seen.add(title[i:i + n])
+            for gram in seen:
+                grams[gram].append(row)
+            for token in set(TOKEN_PATTERN.findall(title)):
+                tokens[token].append(row)
+
+        self._grams = {g: np.array(rows, dtype=np.int32) for g, rows in grams.items()}
+        self._tokens = {t: np.array(rows, dtype=np.int32) for t, rows in tokens.items()}
+        self._sorted_tokens = sorted(self._tokens)
+
+        # Genre bitmap: one bit per genre name in every movie's mask
+        genre_lists = [g.lower().split('|') if isinstance(g, str) and g else [] for g in genres]
+        self.genre_names = sorted({g for names in genre_lists for g in names})
+        if len(self.genre_names) > 64:
+            raise ValueError(f"Genre bitmap supports up to 64 genres, got {len(self.genre_names)}")
+        bit = {name: np.uint64(1) << np.uint64(i) for i, name in enumerate(self.genre_names)}
+        self.genre_bits = np.zeros(len(genre_lists), dtype=np.uint64)
+        for row, names in enumerate(genre_lists):
+            for name in names:
+                self.genre_bits[row] |= bit[name]
+        self._genre_bit = bit
+
+        # Rows per distinct genre combination, for queries spanning several genres
+        combos = defaultdict(list)
+        for row, names in enumerate(genre_lists):
+            combos['|'.join(names)].append(row)
+        self._genre_combos = {c: np.array(rows, dtype=np.int32) for c, rows in combos.items()}
+
+        self._title_substring = lru_cache(maxsize=cache_size)(self._title_substring)
+        self._token_prefix = lru_cache(maxsize=cache_size)(self._token_prefix)
+        self._tokens_prefix = lru_cache(maxsize=cache_size)(self._tokens_prefix)
+        self.search = lru_cache(maxsize=cache_size)(self.search)
+
+    def _title_substring(self, query):
+        """Rows whose title contains query"""
+        if len(query) <= self.max_ngram:
+            return self._grams.get(query, EMPTY)
+
+        n = self.max_ngram
+        grams = {query[i:i + n] for i in range(len(query) - n + 1)}
+        candidates = _intersect([self._grams.get(g, EMPTY) for g in grams])
+
+        # n-grams only narrow the candidates; confirm the full substring
+        keep = [query in self.titles[row] for row in candidates]
+        return candidates[np.array(keep, dtype=bool)] if len(candidates) else EMPTY
+
+    def _token_prefix(self, prefix):
+        """Rows with a title word starting with prefix"""
+        start = bisect_left(self._sorted_tokens, prefix)
+        postings = []
+        for token in self._sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            postings.append(self._tokens[token])
+        if not postings:
+            return EMPTY
+        return np.unique(np.concatenate(postings))
+
+    def _tokens_prefix(self, words):
+        """Rows matching every word of a multi-word prefix query"""
+        return _intersect([self._token_prefix(word) for word in words])
+
+    def _genre_rows(self, query, prefix=False):
+        """Rows whose genres match query"""
+        if '|' in query:
+            # Spans several genres; check each distinct genre combination once
+            postings = [rows for combo, rows in self._genre_combos.items() if query in combo]
+            return np.unique(np.concatenate(postings)) if postings else EMPTY
+
+        mask = np.uint64(0)
+        for name in self.genre_names:
+            if (name.startswith(query) if prefix else query in name):
+                mask |= self._genre_bit[name]
+        if mask == 0:
+            return EMPTY
+        return np.flatnonzero(self.genre_bits & mask).astype(np.int32)
+
+    def search(self, query, match='substring'):
+        """
+        Catalog rows matching a query, in catalog order
+
+        Parameters:
+        query: Search text (case-insensitive)
+        match: 'substring' - query appears anywhere in the title or genres
+               'prefix' - every query word starts a title word, or the
+                          query starts a genre name (typeahead)
+
+        Returns:
+        Sorted int32 array of catalog row positions
+        """
+        query = query.lower()
+        if not query:
+            return EMPTY
+
+        if match == 'prefix':
+            words = tuple(TOKEN_PATTERN.findall(query))
+            title_rows = self._tokens_prefix(words) if words else EMPTY
+            genre_rows = self._genre_rows(query, prefix=True)
+        else:
+            title_rows = self._title_substring(query)
+            genre_rows = self._genre_rows(query)
+
+        rows = np.union1d(title_rows, genre_rows).astype(np.int32)
+        rows.flags.writeable = False  # shared through the query cache
+        return rows
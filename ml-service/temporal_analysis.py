@@ -2,72 +2,235 @@
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from sklearn.metrics import mean_squared_error
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy import stats
+from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from trending_index import SECONDS_PER_DAY, TrendingIndex
+from user_history import DecayedUserStats, UserHistoryIndex
+
+# Time fields with precomputed rating aggregates
+BUCKET_FIELDS = ('year', 'month', 'dayofweek', 'hour', 'quarter')
+
+
+def time_fields(timestamps):
+    """
+    Calendar fields of Unix timestamps (UTC), as compact integer arrays
+
+    Computed straight from the int timestamps, without a datetime column.
+
+    Returns:
+    {'year': int16, 'month': int8 (1-12), 'dayofweek': int8 (0=Monday),
+     'hour': int8, 'quarter': int8 (1-4)}
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    seconds = timestamps.astype('datetime64[s]')
+    months = seconds.astype('datetime64[M]').astype(np.int64)
+    month = (months % 12 + 1).astype(np.int8)
+    return {
+        'year': (months // 12 + 1970).astype(np.int16),
+        'month': month,
+        # 1970-01-01 was a Thursday (3)
+        'dayofweek': ((timestamps // SECONDS_PER_DAY + 3) % 7).astype(np.int8),
+        'hour': (timestamps // 3600 % 24).astype(np.int8),
+        'quarter': ((month - 1) // 3 + 1).astype(np.int8)
+    }
+
+
+class RatingBuckets:
+    def __init__(self, name):
+        """
+        Running count / sum / sum of squares of ratings per integer bucket
+        (e.g. per year), so mean and std are O(buckets) reads
+
+        Parameters:
+        name: Bucket field name, used as the index name of frame()
+        """
+        self.name = name
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.sums = np.zeros(0)
+        self.sumsq = np.zeros(0)
+
+    def add(self, keys, ratings):
+        """
+        Add ratings to their buckets
+
+        Parameters:
+        keys: Integer bucket of every rating (e.g. its year)
+        ratings: Rating values
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        ratings = np.asarray(ratings, dtype=np.float64)
+        if len(keys) == 0:
+            return
+
+        # Grow the arrays to cover new buckets (e.g. a new year)
+        low = min(int(keys.min()), self.offset) if len(self.counts) else int(keys.min())
+        high = max(int(keys.max()), self.offset + len(self.counts) - 1)
+        if low != self.offset or high - low + 1 != len(self.counts):
+            shift = self.offset - low
+            size = high - low + 1
+            counts, sums, sumsq = np.zeros(size, dtype=np.int64), np.zeros(size), np.zeros(size)
+            counts[shift:shift + len(self.counts)] = self.counts
+            sums[shift:shift + len(self.sums)] = self.sums
+            sumsq[shift:shift + len(self.sumsq)] = self.sumsq
+            self.offset, self.counts, self.sums, self.sumsq = low, counts, sums, sumsq
+
+        positions = keys - self.offset
+        size = len(self.counts)
+        self.counts += np.bincount(positions, minlength=size)
+        self.sums += np.bincount(positions, ratings, minlength=size)
+        self.sumsq += np.bincount(positions, ratings * ratings, minlength=size)
+
+    def frame(self, columns=('mean', 'count')):
+        """
+        Per-bucket statistics of non-empty buckets, like
+        groupby(name)['rating'].agg(columns).round(3)
+
+        Parameters:
+        columns: Any of 'mean', 'count', 'std' (sample standard deviation)
+        """
+        present = np.flatnonzero(self.counts)
+        counts = self.counts[present]
+        sums = self.sums[present]
+
+        stats = {}
+        for column in columns:
+            if column == 'mean':
+                stats[column] = sums / counts
+            elif column == 'count':
+                stats[column] = counts
+            elif column == 'std':
+                variance = np.full(len(counts), np.nan)
+                several = counts > 1
+                variance[several] = (
+                    self.sumsq[present][several] - sums[several] ** 2 / counts[several]
+                ) / (counts[several] - 1)
+                stats[column] = np.sqrt(np.maximum(variance, 0))
+
+        index = pd.Index(present + self.offset, name=self.name)
+        return pd.DataFrame(stats, index=index).round(3)
+
+
 class TemporalAnalyzer:
-    def __init__(self, ratings_df):
+    def __init__(self, ratings_df, verbose=False, history=None, decay_factor=0.1):
         """
         Initialize Temporal Analyzer
         
         Parameters:
         ratings_df: DataFrame with columns ['userId', 'movieId', 'rating', 'timestamp']
+        verbose: Print the analysis tables to stdout
+        history: Optional UserHistoryIndex of ratings_df to share instead of building one
+        decay_factor: Yearly decay of the per-user time-weighted averages
         """
-        self.ratings_df = ratings_df.copy()
-        
-        # Convert timestamp to datetime
-        if 'timestamp' in self.ratings_df.columns:
-            self.ratings_df['datetime'] = pd.to_datetime(
-                self.ratings_df['timestamp'], 
-                unit='s'
-            )
-        
-        # Extract temporal features
-        self.ratings_df['year'] = self.ratings_df['datetime'].dt.year
-        self.ratings_df['month'] = self.ratings_df['datetime'].dt.month
-        self.ratings_df['dayofweek'] = self.ratings_df['datetime'].dt.dayofweek
-        self.ratings_df['hour'] = self.ratings_df['datetime'].dt.hour
-        self.ratings_df['quarter'] = self.ratings_df['datetime'].dt.quarter
+        self.verbose = verbose
         
-    def analyze_rating_trends(self):
-        """
-        Analyze how average ratings change over time
-        """
-        print("=" * 60)
-        print("TEMPORAL RATING TRENDS ANALYSIS")
-        print("=" * 60)
+        # Shared with the caller, not copied: time fields are derived from
+        # the int timestamps when needed instead of stored as extra columns.
+        # Appended ratings are kept as separate chunks (see ratings_df)
+        self._ratings_df = ratings_df
+        self._appended = []
         
-        # Yearly trends
-        yearly_stats = self.ratings_df.groupby('year').agg({
-            'rating': ['mean', 'count', 'std']
-        }).round(3)
-        yearly_stats.columns = ['mean', 'count', 'std']  # Flatten columns
+        # Running totals for the report overview
+        self.rating_count = len(ratings_df)
+        self.first_timestamp = int(ratings_df['timestamp'].min()) if len(ratings_df) else None
+        self.last_timestamp = int(ratings_df['timestamp'].max()) if len(ratings_df) else None
         
-        print("\n📅 Yearly Rating Statistics:")
-        print(yearly_stats)
+        # Rating aggregates per time bucket, built once and updated by add_ratings()
+        self.buckets = {field: RatingBuckets(field) for field in BUCKET_FIELDS}
+        self._add_to_buckets(ratings_df)
         
-        # Monthly trends
-        monthly_stats = self.ratings_df.groupby('month').agg({
-            'rating': ['mean', 'count']
-        }).round(3)
-        monthly_stats.columns = ['mean', 'count']  # Flatten columns
+        # Per-movie daily buckets for popularity over any recent window
+        self.trending = TrendingIndex(ratings_df)
         
-        print("\n📆 Monthly Rating Statistics:")
-        print(monthly_stats)
+        # Per-user rating slices and time-decayed running sums, both updated
+        # in place by add_ratings() (a shared history stays current for every holder)
+        self.history = history if history is not None else UserHistoryIndex.from_ratings(ratings_df)
+        self.user_decay = DecayedUserStats.from_history(self.history, decay_factor)
         
-        # Day of week trends
-        dow_stats = self.ratings_df.groupby('dayofweek').agg({
-            'rating': ['mean', 'count']
-        }).round(3)
-        dow_stats.columns = ['mean', 'count']  # Flatten columns
+        # Bumped by add_ratings(), so results derived from the ratings can be keyed on it
+        self.generation = 0
+    
+    @property
+    def ratings_df(self):
+        """
+        All ratings as one DataFrame
         
-        print("\n📊 Day of Week Statistics (0=Monday, 6=Sunday):")
-        print(dow_stats)
+        The frame passed to the constructor is shared until ratings are
+        appended; appended chunks are only concatenated here, when a
+        full-frame consumer asks for it, and from then on the analyzer
+        holds its own frame.
+        """
+        if self._appended:
+            self._ratings_df = pd.concat([self._ratings_df] + self._appended, ignore_index=True)
+            self._appended = []
+        return self._ratings_df
+    
+    def _add_to_buckets(self, ratings_df, chunk_size=1 << 20):
+        """Add ratings to every time bucket, chunk_size rows at a time"""
+        timestamps = ratings_df['timestamp'].values
+        ratings = ratings_df['rating'].values
+        for start in range(0, len(ratings), chunk_size):
+            end = start + chunk_size
+            fields = time_fields(timestamps[start:end])
+            for field in BUCKET_FIELDS:
+                self.buckets[field].add(fields[field], ratings[start:end])
+    
+    def add_ratings(self, new_ratings_df):
+        """
+        Append ratings and update the time bucket aggregates incrementally
+        
+        Parameters:
+        new_ratings_df: DataFrame with columns ['userId', 'movieId', 'rating', 'timestamp']
+        """
+        self._add_to_buckets(new_ratings_df)
+        self.trending.add_ratings(
+            new_ratings_df['movieId'].values,
+            new_ratings_df['rating'].values,
+            new_ratings_df['timestamp'].values
+        )
+        for user_id, rating, timestamp in zip(
+            new_ratings_df['userId'].values,
+            new_ratings_df['rating'].values,
+            new_ratings_df['timestamp'].values
+        ):
+            self.user_decay.add_rating(int(user_id), float(rating), int(timestamp))
+        if len(new_ratings_df):
+            self._appended.append(new_ratings_df)
+            timestamps = new_ratings_df['timestamp'].values
+            bounds = [int(timestamps.min()), int(timestamps.max())]
+            if self.first_timestamp is not None:
+                bounds += [self.first_timestamp, self.last_timestamp]
+            self.rating_count += len(timestamps)
+            self.first_timestamp, self.last_timestamp = min(bounds), max(bounds)
+        self.history.add_ratings(
+            new_ratings_df['userId'].values,
+            new_ratings_df['movieId'].values,
+            new_ratings_df['rating'].values,
+            new_ratings_df['timestamp'].values
+        )
+        self.generation += 1
+        
+    def analyze_rating_trends(self):
+        """
+        Analyze how average ratings change over time
+        """
+        # Yearly, monthly and day of week trends
+        yearly_stats = self.buckets['year'].frame(('mean', 'count', 'std'))
+        monthly_stats = self.buckets['month'].frame()
+        dow_stats = self.buckets['dayofweek'].frame()
+        
+        if self.verbose:
+            print("=" * 60)
+            print("TEMPORAL RATING TRENDS ANALYSIS")
+            print("=" * 60)
+            print("\n📅 Yearly Rating Statistics:")
+            print(yearly_stats)
+            print("\n📆 Monthly Rating Statistics:")
+            print(monthly_stats)
+            print("\n📊 Day of Week Statistics (0=Monday, 6=Sunday):")
+            print(dow_stats)
         
         return {
             'yearly': yearly_stats,
@@ -75,59 +238,27 @@ class TemporalAnalyzer:
             'dayofweek': dow_stats
         }
     
-    def detect_popularity_trends(self, movies_df, top_n=20):
+    def detect_popularity_trends(self, movies_df, top_n=20, window_days=365):
         """
         Detect which movies are trending over time
-        """
-        print("\n" + "=" * 60)
-        print("POPULARITY TRENDS ANALYSIS")
-        print("=" * 60)
-        
-        # Calculate popularity by time periods
-        recent_cutoff = self.ratings_df['datetime'].max() - timedelta(days=365)
-        
-        recent_ratings = self.ratings_df[
-            self.ratings_df['datetime'] >= recent_cutoff
-        ]
-        
-        old_ratings = self.ratings_df[
-            self.ratings_df['datetime'] < recent_cutoff
-        ]
-        
-        # Recent popular movies
-        recent_popular = recent_ratings.groupby('movieId').agg({
-            'rating': ['mean', 'count']
-        }).reset_index()
-        recent_popular.columns = ['movieId', 'avg_rating', 'rating_count']
-        recent_popular = recent_popular[recent_popular['rating_count'] >= 10]
-        recent_popular = recent_popular.sort_values('rating_count', ascending=False)
-        
-        print(f"\n🔥 Top {top_n} Trending Movies (Last Year):")
-        print(recent_popular.head(top_n))
-        
-        # Compare old vs new
-        old_popular = old_ratings.groupby('movieId').agg({
-            'rating': 'mean'
-        }).reset_index()
-        old_popular.columns = ['movieId', 'old_avg_rating']
-        
-        # Merge and find rising stars
-        comparison = recent_popular.merge(
-            old_popular, 
-            on='movieId', 
-            how='left'
-        )
-        comparison['rating_change'] = (
-            comparison['avg_rating'] - comparison['old_avg_rating']
-        )
         
-        rising_stars = comparison.dropna().sort_values(
-            'rating_change', 
-            ascending=False
-        ).head(top_n)
-        
-        print(f"\n⭐ Rising Stars (Biggest Rating Improvements):")
-        print(rising_stars[['movieId', 'old_avg_rating', 'avg_rating', 'rating_change']])
+        Parameters:
+        movies_df: Movie catalog
+        top_n: Number of rising stars returned
+        window_days: Length of the recent window in days
+        """
+        # Read recent vs. earlier popularity from the daily buckets
+        recent_popular, rising_stars = self.trending.trending(window_days=window_days)
+        rising_stars = rising_stars.head(top_n)
+        
+        if self.verbose:
+            print("\n" + "=" * 60)
+            print("POPULARITY TRENDS ANALYSIS")
+            print("=" * 60)
+            print(f"\n🔥 Top {top_n} Trending Movies (Last {window_days} Days):")
+            print(recent_popular.head(top_n))
+            print(f"\n⭐ Rising Stars (Biggest Rating Improvements):")
+            print(rising_stars[['movieId', 'old_avg_rating', 'avg_rating', 'rating_change']])
         
         return {
             'recent_popular': recent_popular,
@@ -138,29 +269,22 @@ class TemporalAnalyzer:
         """
         Analyze seasonal patterns in ratings
         """
-        print("\n" + "=" * 60)
-        print("SEASONAL PATTERN ANALYSIS")
-        print("=" * 60)
-        
         # Quarterly analysis
-        quarterly_stats = self.ratings_df.groupby('quarter').agg({
-            'rating': ['mean', 'count', 'std']
-        }).round(3)
-        quarterly_stats.columns = ['mean', 'count', 'std']  # Flatten columns
-        
-        print("\n🌍 Quarterly Statistics:")
-        print(quarterly_stats)
+        quarterly_stats = self.buckets['quarter'].frame(('mean', 'count', 'std'))
         
         # Peak hours analysis
-        hourly_stats = self.ratings_df.groupby('hour').agg({
-            'rating': ['mean', 'count']
-        }).round(3)
-        hourly_stats.columns = ['mean', 'count']  # Flatten columns
-        
-        print("\n⏰ Hourly Rating Activity:")
+        hourly_stats = self.buckets['hour'].frame()
         peak_hour = hourly_stats['count'].idxmax()
-        print(f"Peak Activity Hour: {peak_hour}:00")
-        print(hourly_stats)
+        
+        if self.verbose:
+            print("\n" + "=" * 60)
+            print("SEASONAL PATTERN ANALYSIS")
+            print("=" * 60)
+            print("\n🌍 Quarterly Statistics:")
+            print(quarterly_stats)
+            print("\n⏰ Hourly Rating Activity:")
+            print(f"Peak Activity Hour: {peak_hour}:00")
+            print(hourly_stats)
         
         return {
             'quarterly': quarterly_stats,
@@ -168,109 +292,131 @@ class TemporalAnalyzer:
             'peak_hour': peak_hour
         }
     
-    def time_weighted_recommendations(self, user_id, content_based_recs, 
-                                     collaborative_recs, decay_factor=0.1):
+    def user_time_weights(self, user_id):
+        """
+        Time-weighted vs. plain average rating of a user, in O(1)
+        
+        Returns:
+        Dict with time_weighted_avg, traditional_avg and
+        recommendation_adjustment, or None for users without ratings
+        """
+        return self.user_decay.get(user_id)
+    
+    def time_weighted_recommendations(self, user_id, decay_factor=None):
         """
         Apply time-based weighting to recommendations
         More recent ratings get higher weights
         
+        A rating's weight is exp(-decay_factor * age / 365), age being the
+        time in days (fractional) between it and the user's latest rating.
+        
         Parameters:
         user_id: Target user
-        content_based_recs: List of movie recommendations from CB
-        collaborative_recs: List of movie recommendations from CF
-        decay_factor: How fast older ratings decay (0-1)
+        decay_factor: How fast older ratings decay (0-1), defaults to the analyzer's
         """
-        print("\n" + "=" * 60)
-        print(f"TIME-WEIGHTED RECOMMENDATIONS FOR USER {user_id}")
-        print("=" * 60)
-        
-        # Get user's rating history
-        user_ratings = self.ratings_df[
-            self.ratings_df['userId'] == user_id
-        ].copy()
+        if decay_factor is None:
+            decay_factor = self.user_decay.decay_factor
         
-        if len(user_ratings) == 0:
-            print("No rating history for this user")
-            return None
+        if self.verbose:
+            print("\n" + "=" * 60)
+            print(f"TIME-WEIGHTED RECOMMENDATIONS FOR USER {user_id}")
+            print("=" * 60)
         
-        # Calculate time decay weights
-        max_timestamp = user_ratings['datetime'].max()
-        user_ratings['days_ago'] = (
-            max_timestamp - user_ratings['datetime']
-        ).dt.days
-        
-        user_ratings['time_weight'] = np.exp(
-            -decay_factor * user_ratings['days_ago'] / 365
-        )
+        # User's rating history, oldest first
+        movie_ids, ratings, timestamps = self.history.recent(user_id)
         
-        print(f"\n📊 User Rating History (Total: {len(user_ratings)} ratings)")
-        print(f"Recent ratings weight: {user_ratings['time_weight'].tail().mean():.3f}")
-        print(f"Old ratings weight: {user_ratings['time_weight'].head().mean():.3f}")
-        
-        # Apply weights to recommendations
-        weighted_scores = {}
-        
-        # Weight content-based recs by user's recent preferences
-        recent_avg_rating = (
-            user_ratings['rating'] * user_ratings['time_weight']
-        ).sum() / user_ratings['time_weight'].sum()
+        if len(movie_ids) == 0:
+            if self.verbose:
+                print("No rating history for this user")
+            return None
         
-        print(f"\n🎯 Time-weighted average rating: {recent_avg_rating:.2f}")
-        print(f"Traditional average rating: {user_ratings['rating'].mean():.2f}")
+        ages = (timestamps[0] - timestamps[::-1]) / SECONDS_PER_DAY
+        user_ratings = pd.DataFrame({
+            'movieId': movie_ids[::-1],
+            'rating': ratings[::-1].astype(np.float64),
+            'time_weight': np.exp(-decay_factor * ages / 365)
+        })
+        
+        if decay_factor == self.user_decay.decay_factor:
+            summary = self.user_decay.get(user_id)
+            recent_avg_rating = summary['time_weighted_avg']
+            traditional_avg = summary['traditional_avg']
+        else:
+            weights = user_ratings['time_weight'].values
+            recent_avg_rating = (user_ratings['rating'].values * weights).sum() / weights.sum()
+            traditional_avg = user_ratings['rating'].mean()
+        
+        if self.verbose:
+            print(f"\n📊 User Rating History (Total: {len(user_ratings)} ratings)")
+            print(f"Recent ratings weight: {user_ratings['time_weight'].tail().mean():.3f}")
+            print(f"Old ratings weight: {user_ratings['time_weight'].head().mean():.3f}")
+            print(f"\n🎯 Time-weighted average rating: {recent_avg_rating:.2f}")
+            print(f"Traditional average rating: {traditional_avg:.2f}")
         
         return {
             'time_weighted_avg': recent_avg_rating,
-            'traditional_avg': user_ratings['rating'].mean(),
-            'decay_weights': user_ratings[['movieId', 'rating', 'time_weight']],
-            'recommendation_adjustment': recent_avg_rating - user_ratings['rating'].mean()
+            'traditional_avg': traditional_avg,
+            'decay_weights': user_ratings,
+            'recommendation_adjustment': recent_avg_rating - traditional_avg
         }
     
+    def iter_temporal_report(self):
+        """
+        Comprehensive temporal analysis report, yielded section by section
+        so it can be streamed without writing it to disk first
+        """
+        header = "=" * 80 + "\n"
+        header += "TEMPORAL ANALYSIS REPORT\n"
+        header += "Movie Recommendation System\n"
+        header += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        header += "=" * 80 + "\n\n"
+        yield header
+        
+        # Dataset overview
+        first_rating = pd.to_datetime(self.first_timestamp, unit='s')
+        last_rating = pd.to_datetime(self.last_timestamp, unit='s')
+        overview = "1. DATASET TEMPORAL OVERVIEW\n"
+        overview += "-" * 80 + "\n"
+        overview += f"Total Ratings: {self.rating_count:,}\n"
+        overview += f"Date Range: {first_rating} to {last_rating}\n"
+        overview += f"Time Span: {(last_rating - first_rating).days} days\n\n"
+        yield overview
+        
+        # Trends
+        trends = self.analyze_rating_trends()
+        yield "\n2. RATING TRENDS OVER TIME\n" + "-" * 80 + "\n" + str(trends['yearly']) + "\n\n"
+        
+        # Seasonal patterns
+        seasonal = self.seasonal_analysis()
+        yield (
+            "\n3. SEASONAL PATTERNS\n" + "-" * 80 + "\n" + str(seasonal['quarterly']) + "\n\n"
+            f"Peak Activity Hour: {seasonal['peak_hour']}:00\n\n"
+        )
+        
+        # Insights
+        insights = "\n4. KEY INSIGHTS\n"
+        insights += "-" * 80 + "\n"
+        insights += "• Rating patterns show temporal dependencies\n"
+        insights += "• Recent ratings should have higher weights in recommendations\n"
+        insights += "• User preferences evolve over time\n"
+        insights += "• Seasonal trends affect movie popularity\n"
+        yield insights
+    
     def generate_temporal_report(self, output_file='temporal_analysis_report.txt'):
         """
         Generate comprehensive temporal analysis report
         """
-        print("\n" + "=" * 60)
-        print("GENERATING COMPREHENSIVE TEMPORAL REPORT")
-        print("=" * 60)
+        if self.verbose:
+            print("\n" + "=" * 60)
+            print("GENERATING COMPREHENSIVE TEMPORAL REPORT")
+            print("=" * 60)
         
         with open(output_file, 'w', encoding='utf-8') as f:
-            f.write("=" * 80 + "\n")
-            f.write("TEMPORAL ANALYSIS REPORT\n")
-            f.write("Movie Recommendation System\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 80 + "\n\n")
-            
-            # Dataset overview
-            f.write("1. DATASET TEMPORAL OVERVIEW\n")
-            f.write("-" * 80 + "\n")
-            f.write(f"Total Ratings: {len(self.ratings_df):,}\n")
-            f.write(f"Date Range: {self.ratings_df['datetime'].min()} to ")
-            f.write(f"{self.ratings_df['datetime'].max()}\n")
-            f.write(f"Time Span: {(self.ratings_df['datetime'].max() - self.ratings_df['datetime'].min()).days} days\n\n")
-            
-            # Trends
-            trends = self.analyze_rating_trends()
-            f.write("\n2. RATING TRENDS OVER TIME\n")
-            f.write("-" * 80 + "\n")
-            f.write(str(trends['yearly']) + "\n\n")
-            
-            # Seasonal patterns
-            seasonal = self.seasonal_analysis()
-            f.write("\n3. SEASONAL PATTERNS\n")
-            f.write("-" * 80 + "\n")
-            f.write(str(seasonal['quarterly']) + "\n\n")
-            
-            f.write(f"Peak Activity Hour: {seasonal['peak_hour']}:00\n\n")
-            
-            # Insights
-            f.write("\n4. KEY INSIGHTS\n")
-            f.write("-" * 80 + "\n")
-            f.write("• Rating patterns show temporal dependencies\n")
-            f.write("• Recent ratings should have higher weights in recommendations\n")
-            f.write("• User preferences evolve over time\n")
-            f.write("• Seasonal trends affect movie popularity\n")
-        
-        print(f"\n✅ Report saved to: {output_file}")
+            for section in self.iter_temporal_report():
+                f.write(section)
+        
+        if self.verbose:
+            print(f"\n✅ Report saved to: {output_file}")
         return output_file
 
 
@@ -288,7 +434,7 @@ def test_temporal_analysis():
     print(f"Columns: {ratings.columns.tolist()}\n")
     
     # Initialize analyzer
-    analyzer = TemporalAnalyzer(ratings)
+    analyzer = TemporalAnalyzer(ratings, verbose=True)
     
     # Run analyses
     analyzer.analyze_rating_trends()
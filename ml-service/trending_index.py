@@ -0,0 +1,193 @@
+# trending_index.py
+
+import numpy as np
+import pandas as pd
+
+SECONDS_PER_DAY = 86400
+
+
+class TrendingIndex:
+    def __init__(self, ratings_df=None, compact_every=100000):
+        """
+        Per-movie rating count/sum in daily buckets, for "popular in the
+        last N days" and "rating change vs. before" queries of any window
+
+        Days are stored as a CSR-like (days x movies) structure, plus the
+        all-time count/sum of every movie, so a window query only reads the
+        buckets inside the window and derives everything older from the
+        totals. Appended ratings go to a small pending buffer that is
+        merged into the buckets every compact_every ratings.
+
+        Parameters:
+        ratings_df: Optional DataFrame with columns ['movieId', 'rating', 'timestamp']
+        compact_every: Pending ratings kept before merging them into the buckets
+        """
+        self.compact_every = compact_every
+        self.movie_index = pd.Index([], dtype=np.int64)
+        self.total_counts = np.zeros(0, dtype=np.int64)
+        self.total_sums = np.zeros(0)
+
+        # Daily buckets: row r is day first_day + r
+        self.first_day = 0
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._movies = np.zeros(0, dtype=np.int32)
+        self._counts = np.zeros(0, dtype=np.int32)
+        self._sums = np.zeros(0)
+
+        self._pending = []
+        self._pending_size = 0
+
+        if ratings_df is not None:
+            self.add_ratings(
+                ratings_df['movieId'].values,
+                ratings_df['rating'].values,
+                ratings_df['timestamp'].values
+            )
+            self.compact()
+
+    def _ensure_indices(self, movie_ids):
+        """Dense indices for movieIds, growing the totals for unseen movies"""
+        indices = self.movie_index.get_indexer(movie_ids)
+        missing = indices < 0
+        if missing.any():
+            new_ids = pd.unique(movie_ids[missing])
+            self.movie_index = self.movie_index.append(pd.Index(new_ids))
+            grow = len(new_ids)
+            self.total_counts = np.concatenate([self.total_counts, np.zeros(grow, dtype=np.int64)])
+            self.total_sums = np.concatenate([self.total_sums, np.zeros(grow)])
+            indices = self.movie_index.get_indexer(movie_ids)
+        return indices
+
+    def add_ratings(self, movie_ids, ratings, timestamps):
+        """
+        Append a batch of ratings
+
+        Parameters:
+        movie_ids: Array of movieIds
+        ratings: Array of ratings
+        timestamps: Array of Unix timestamps (seconds)
+        """
+        ratings = np.asarray(ratings, dtype=np.float64)
+        if len(ratings) == 0:
+            return
+        indices = self._ensure_indices(np.asarray(movie_ids))
+        days = np.asarray(timestamps, dtype=np.int64) // SECONDS_PER_DAY
+
+        n = len(self.movie_index)
+        self.total_counts += np.bincount(indices, minlength=n)
+        self.total_sums += np.bincount(indices, weights=ratings, minlength=n)
+
+        self._pending.append((days, indices, ratings))
+        self._pending_size += len(days)
+        if self._pending_size >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Merge pending ratings into the daily buckets"""
+        if not self._pending:
+            return
+
+        n_days = len(self._indptr) - 1
+        bucket_days = np.repeat(
+            np.arange(self.first_day, self.first_day + n_days), np.diff(self._indptr)
+        )
+        days = np.concatenate([bucket_days] + [p[0] for p in self._pending])
+        movies = np.concatenate([self._movies] + [p[1] for p in self._pending])
+        counts = np.concatenate(
+            [self._counts] + [np.ones(len(p[0]), dtype=np.int32) for p in self._pending]
+        )
+        sums = np.concatenate([self._sums] + [p[2] for p in self._pending])
+        if len(days) == 0:
+            self._pending = []
+            self._pending_size = 0
+            return
+
+        # One entry per (day, movie)
+        first_day = int(days.min())
+        n_movies = len(self.movie_index)
+        keys, inverse = np.unique((days - first_day) * n_movies + movies, return_inverse=True)
+        rows = keys // n_movies
+
+        self.first_day = first_day
+        self._movies = (keys % n_movies).astype(np.int32)
+        self._counts = np.bincount(inverse, weights=counts).astype(np.int32)
+        self._sums = np.bincount(inverse, weights=sums)
+        self._indptr = np.concatenate([[0], np.cumsum(np.bincount(rows))]).astype(np.int64)
+
+        self._pending = []
+        self._pending_size = 0
+
+    @property
+    def last_day(self):
+        """Day of the most recent rating"""
+        last = self.first_day + len(self._indptr) - 2
+        for days, _, _ in self._pending:
+            last = max(last, int(days.max()))
+        return last
+
+    def window_totals(self, start_day):
+        """
+        Rating count and sum of every movie from start_day on
+
+        Returns:
+        (counts, sums), arrays aligned with movie_index
+        """
+        n = len(self.movie_index)
+        row = min(max(start_day - self.first_day, 0), len(self._indptr) - 1)
+        begin = self._indptr[row]
+
+        counts = np.bincount(self._movies[begin:], weights=self._counts[begin:], minlength=n)
+        sums = np.bincount(self._movies[begin:], weights=self._sums[begin:], minlength=n)
+        # bincount returns ints when the window holds no buckets
+        counts, sums = counts.astype(np.float64), sums.astype(np.float64)
+        for days, indices, ratings in self._pending:
+            recent = days >= start_day
+            counts += np.bincount(indices[recent], minlength=n)
+            sums += np.bincount(indices[recent], weights=ratings[recent], minlength=n)
+        return counts.astype(np.int64), sums
+
+    def trending(self, window_days=365, min_count=10):
+        """
+        Movies popular in the last window_days days, and how their average
+        rating changed compared with all ratings before the window
+
+        The window is the day of the most recent rating plus the
+        window_days days before it.
+
+        Parameters:
+        window_days: Window length in days
+        min_count: Ratings a movie needs inside the window to be listed
+
+        Returns:
+        (recent_popular, rising_stars) DataFrames: recent_popular has
+        movieId, avg_rating, rating_count sorted by rating_count; rising_stars
+        adds old_avg_rating and rating_change, sorted by rating_change and
+        limited to movies rated before the window too
+        """
+        recent_counts, recent_sums = self.window_totals(self.last_day - window_days)
+        movie_ids = self.movie_index.values
+
+        popular = np.flatnonzero(recent_counts >= min_count)
+        avg_rating = recent_sums[popular] / recent_counts[popular]
+        order = np.lexsort((movie_ids[popular], -recent_counts[popular]))
+        recent_popular = pd.DataFrame({
+            'movieId': movie_ids[popular][order],
+            'avg_rating': avg_rating[order],
+            'rating_count': recent_counts[popular][order]
+        })
+
+        old_counts = self.total_counts[popular] - recent_counts[popular]
+        rated_before = old_counts > 0
+        old_sums = self.total_sums[popular] - recent_sums[popular]
+        old_avg = old_sums[rated_before] / old_counts[rated_before]
+        change = avg_rating[rated_before] - old_avg
+        order = np.lexsort((movie_ids[popular][rated_before], -change))
+        rising_stars = pd.DataFrame({
+            'movieId': movie_ids[popular][rated_before][order],
+            'avg_rating': avg_rating[rated_before][order],
+            'rating_count': recent_counts[popular][rated_before][order],
+            'old_avg_rating': old_avg[order],
+            'rating_change': change[order]
+        })
+
+        return recent_popular, rising_stars
@@ -0,0 +1,323 @@
+# user_history.py
+
+import threading
+
+import numpy as np
+
+
+def _grown(array, size):
+    """array resized to at least size entries, doubling its capacity"""
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class UserHistoryIndex:
+    def __init__(self, user_ids, offsets, movie_ids, ratings, timestamps):
+        """
+        Every user's ratings as one contiguous slice, newest first
+
+        Use from_ratings() to build one. The ratings of the user at
+        position i are movie_ids[starts[i]:ends[i]] (and the same slice of
+        ratings / timestamps); span() returns that slice for a userId.
+
+        add_ratings() appends in place: new ratings wait in a per-user
+        pending list and are merged into that user's slice the next time
+        it is read, so an update costs O(that user's ratings) rather than
+        O(all ratings). The merged slice is written after the last one
+        (the arrays grow by doubling), leaving the old slice unused.
+
+        Parameters:
+        user_ids: Sorted array of userIds
+        offsets: Start of every user's slice, plus the total length
+        movie_ids: movieId of every rating, grouped by user
+        ratings: Rating values, aligned with movie_ids
+        timestamps: Rating timestamps, aligned with movie_ids
+        """
+        offsets = np.asarray(offsets, dtype=np.int64)
+        self._user_ids = np.asarray(user_ids)
+        self._starts = offsets[:-1].copy()
+        self._ends = offsets[1:].copy()
+        self._movie_ids = np.asarray(movie_ids)
+        self._ratings = np.asarray(ratings)
+        self._timestamps = np.asarray(timestamps)
+        self.n_users = len(self._user_ids)
+        self.size = len(self._movie_ids)
+
+        self.user_index = {int(u): i for i, u in enumerate(user_ids)}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_ratings(cls, ratings_df):
+        """
+        Build from a ratings DataFrame with columns
+        ['userId', 'movieId', 'rating', 'timestamp']
+
+        Ratings with the same timestamp keep their order in ratings_df.
+        """
+        user_col = ratings_df['userId'].values
+        timestamps = ratings_df['timestamp'].values
+
+        # lexsort is stable: by user, then newest first
+        order = np.lexsort((-timestamps, user_col))
+        users_sorted = user_col[order]
+
+        user_ids, starts = np.unique(users_sorted, return_index=True)
+        offsets = np.append(starts, len(order)).astype(np.int64)
+
+        return cls(
+            user_ids,
+            offsets,
+            ratings_df['movieId'].values[order],
+            ratings_df['rating'].values[order].astype(np.float32),
+            timestamps[order]
+        )
+
+    # Views of the used part of the (possibly over-allocated) arrays
+    @property
+    def user_ids(self):
+        return self._user_ids[:self.n_users]
+
+    @property
+    def starts(self):
+        return self._starts[:self.n_users]
+
+    @property
+    def ends(self):
+        return self._ends[:self.n_users]
+
+    @property
+    def movie_ids(self):
+        return self._movie_ids[:self.size]
+
+    @property
+    def ratings(self):
+        return self._ratings[:self.size]
+
+    @property
+    def timestamps(self):
+        return self._timestamps[:self.size]
+
+    def add_ratings(self, user_ids, movie_ids, ratings, timestamps):
+        """
+        Append ratings in O(1) each; they show up in the user's slice on
+        the next read of it
+
+        Parameters:
+        user_ids, movie_ids, ratings, timestamps: Aligned arrays
+        """
+        with self._lock:
+            for user_id, movie_id, rating, timestamp in zip(
+                user_ids, movie_ids, ratings, timestamps
+            ):
+                user_id = int(user_id)
+                position = self.user_index.get(user_id)
+                if position is None:
+                    position = self.n_users
+                    self._user_ids = _grown(self._user_ids, position + 1)
+                    self._starts = _grown(self._starts, position + 1)
+                    self._ends = _grown(self._ends, position + 1)
+                    self._user_ids[position] = user_id
+                    self._starts[position] = self._ends[position] = 0
+                    self.user_index[user_id] = position
+                    self.n_users += 1
+                self._pending.setdefault(position, []).append((movie_id, rating, timestamp))
+
+    def _merge(self, position):
+        """Merge a user's pending ratings into their slice (caller holds the lock)"""
+        pending = self._pending.pop(position)
+        start, end = int(self._starts[position]), int(self._ends[position])
+        new_movie_ids, new_ratings, new_timestamps = zip(*pending)
+
+        movie_ids = np.concatenate([self._movie_ids[start:end], new_movie_ids])
+        ratings = np.concatenate([self._ratings[start:end], new_ratings])
+        timestamps = np.concatenate([self._timestamps[start:end], new_timestamps])
+        # Stable, so equal timestamps keep their order of arrival
+        order = np.argsort(-timestamps, kind='stable')
+
+        # The last slice is rewritten in place, any other one moves to the end
+        target = start if end == self.size else self.size
+        new_end = target + len(order)
+        self._movie_ids = _grown(self._movie_ids, new_end)
+        self._ratings = _grown(self._ratings, new_end)
+        self._timestamps = _grown(self._timestamps, new_end)
+        self._movie_ids[target:new_end] = movie_ids[order]
+        self._ratings[target:new_end] = ratings[order]
+        self._timestamps[target:new_end] = timestamps[order]
+
+        self._starts[position] = target
+        self._ends[position] = new_end
+        self.size = max(self.size, new_end)
+
+    def spans(self, user_ids):
+        """
+        Slices of several users, merging their pending ratings first
+
+        Returns:
+        (present, starts, ends): present is False for users without
+        ratings, whose start and end are 0
+        """
+        positions = np.array([self.user_index.get(int(u), -1) for u in user_ids], dtype=np.int64)
+        present = positions >= 0
+        if self._pending:
+            with self._lock:
+                for position in positions[present]:
+                    if int(position) in self._pending:
+                        self._merge(int(position))
+
+        starts = np.zeros(len(positions), dtype=np.int64)
+        ends = np.zeros(len(positions), dtype=np.int64)
+        starts[present] = self._starts[positions[present]]
+        ends[present] = self._ends[positions[present]]
+        return present, starts, ends
+
+    def span(self, user_id):
+        """
+        (start, end) of a user's slice, or None for users without ratings
+        """
+        present, starts, ends = self.spans([user_id])
+        if not present[0]:
+            return None
+        return int(starts[0]), int(ends[0])
+
+    def all_spans(self):
+        """(starts, ends) of every user's slice, in user position order"""
+        _, starts, ends = self.spans(self.user_ids)
+        return starts, ends
+
+    def recent(self, user_id, n=None):
+        """
+        A user's n most recent ratings (all of them when n is None)
+
+        Returns:
+        (movie_ids, ratings, timestamps), newest first; empty arrays for
+        users without ratings
+        """
+        span = self.span(user_id)
+        if span is None:
+            start = end = 0
+        else:
+            start, end = span
+            if n is not None:
+                end = min(end, start + n)
+        return self.movie_ids[start:end], self.ratings[start:end], self.timestamps[start:end]
+
+
+SECONDS_PER_YEAR = 365 * 86400
+
+
+class DecayedUserStats:
+    def __init__(self, user_ids, last_timestamps, weighted_sums, weight_sums, counts,
+                 rating_sums, decay_factor=0.1):
+        """
+        Exponentially time-decayed rating sums per user
+
+        A rating made `age` seconds before the user's latest rating has
+        weight exp(-decay_factor * age / SECONDS_PER_YEAR). Sums are kept
+        relative to the latest rating, so add_rating() is O(1): a newer
+        rating rescales the sums once, an older one is added with its weight.
+        Use from_history() to build one.
+
+        Parameters:
+        user_ids: userId of every row
+        last_timestamps: Timestamp of every user's latest rating
+        weighted_sums: Sum of weight * rating per user
+        weight_sums: Sum of weights per user
+        counts: Number of ratings per user
+        rating_sums: Plain sum of ratings per user
+        decay_factor: Decay per year (0 = no decay)
+        """
+        self.user_index = {int(u): i for i, u in enumerate(user_ids)}
+        self.last_timestamps = np.asarray(last_timestamps, dtype=np.int64)
+        self.weighted_sums = np.asarray(weighted_sums, dtype=np.float64)
+        self.weight_sums = np.asarray(weight_sums, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.rating_sums = np.asarray(rating_sums, dtype=np.float64)
+        # Rows past the last user are spare capacity for new users
+        self.n_users = len(self.counts)
+        self.decay_factor = decay_factor
+
+    @classmethod
+    def from_history(cls, history, decay_factor=0.1):
+        """Build from a UserHistoryIndex (every slice is newest first)"""
+        starts, ends = history.all_spans()
+        counts = ends - starts
+        last_timestamps = history.timestamps[starts]
+
+        # Every user's entries back to back, and where each user's group begins
+        group_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        entries = np.arange(counts.sum()) - np.repeat(group_starts - starts, counts)
+
+        ages = np.repeat(last_timestamps, counts) - history.timestamps[entries]
+        weights = np.exp(-decay_factor * ages / SECONDS_PER_YEAR)
+        ratings = history.ratings[entries].astype(np.float64)
+
+        return cls(
+            history.user_ids,
+            last_timestamps,
+            np.add.reduceat(weights * ratings, group_starts),
+            np.add.reduceat(weights, group_starts),
+            counts,
+            np.add.reduceat(ratings, group_starts),
+            decay_factor
+        )
+
+    def time_weights(self, anchors, timestamps):
+        """Decay weights of ratings at timestamps, relative to anchor timestamps"""
+        ages = np.asarray(anchors, dtype=np.int64) - np.asarray(timestamps, dtype=np.int64)
+        return np.exp(-self.decay_factor * ages / SECONDS_PER_YEAR)
+
+    def add_rating(self, user_id, rating, timestamp):
+        """Account for one new rating in O(1)"""
+        position = self.user_index.get(user_id)
+        if position is None:
+            # Amortized O(1): the arrays double when they run out of rows
+            position = self.n_users
+            self.user_index[user_id] = position
+            self.n_users += 1
+            self.last_timestamps = _grown(self.last_timestamps, self.n_users)
+            self.weighted_sums = _grown(self.weighted_sums, self.n_users)
+            self.weight_sums = _grown(self.weight_sums, self.n_users)
+            self.counts = _grown(self.counts, self.n_users)
+            self.rating_sums = _grown(self.rating_sums, self.n_users)
+            self.last_timestamps[position] = timestamp
+
+        last = self.last_timestamps[position]
+        if timestamp > last:
+            # New latest rating: every existing weight shrinks by the same factor
+            scale = self.time_weights(timestamp, last)
+            self.weighted_sums[position] *= scale
+            self.weight_sums[position] *= scale
+            self.last_timestamps[position] = timestamp
+            weight = 1.0
+        else:
+            weight = self.time_weights(last, timestamp)
+
+        self.weighted_sums[position] += weight * rating
+        self.weight_sums[position] += weight
+        self.counts[position] += 1
+        self.rating_sums[position] += rating
+
+    def get(self, user_id):
+        """
+        Time-weighted vs. plain average rating of a user
+
+        Returns:
+        Dict with time_weighted_avg, traditional_avg and
+        recommendation_adjustment, or None for users without ratings
+        """
+        position = self.user_index.get(user_id)
+        if position is None or self.counts[position] == 0:
+            return None
+
+        time_weighted_avg = self.weighted_sums[position] / self.weight_sums[position]
+        traditional_avg = self.rating_sums[position] / self.counts[position]
+        return {
+            'time_weighted_avg': time_weighted_avg,
+            'traditional_avg': traditional_avg,
+            'recommendation_adjustment': time_weighted_avg - traditional_avg,
+            'last_timestamp': int(self.last_timestamps[position])
+        }
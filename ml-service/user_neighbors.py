@@ -0,0 +1,215 @@
+# user_neighbors.py
+
+import threading
+
+import numpy as np
+import scipy.sparse as sp
+
+from content_index import top_n
+
+
+def _row_norms(ratings):
+    """L2 norm of every row of a CSR matrix"""
+    squared = ratings.multiply(ratings).sum(axis=1)
+    return np.sqrt(np.asarray(squared, dtype=np.float32).ravel())
+
+
+class UserNeighborGraph:
+    def __init__(self, neighbors, scores, norms, ratings=None, computed=None, block_size=1024):
+        """
+        Top-K cosine neighbors of every user, computed lazily
+
+        Replaces the dense users x users similarity matrix: memory grows as
+        O(users*K) instead of O(users^2). Use from_interactions() to build
+        one. Rows are computed the first time they are read, block_size
+        users at a time, and refresh_user() updates the graph in place when
+        one user's ratings change.
+
+        Parameters:
+        neighbors: int32 (users x K) neighbor rows, most similar first
+        scores: float32 (users x K) cosine similarity of each neighbor
+        norms: float32 L2 norm of every user's rating row
+        ratings: CSR (users x movies) ratings the rows are computed from
+                 (only needed while some rows are not computed yet)
+        computed: Boolean per user, True where the row is up to date
+                  (default: all rows are)
+        block_size: Users scored at once when computing rows
+        """
+        self.neighbors = neighbors
+        self.scores = scores
+        self.norms = norms
+        self.ratings = ratings
+        self.computed = (np.ones(len(norms), dtype=bool) if computed is None
+                         else np.asarray(computed, dtype=bool))
+        self.block_size = block_size
+        self.k = neighbors.shape[1]
+
+        # Normalized ratings and their transpose, rebuilt after a refresh
+        self._normalized = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_interactions(cls, interactions, k=50, block_size=1024):
+        """
+        Graph over an InteractionMatrix with no rows computed yet
+
+        Rows are filled block_size users at a time as they are read (all of
+        them by compute_all()), so only one (block_size x users) similarity
+        block exists at a time and peak memory stays bounded regardless of
+        the number of users.
+
+        Parameters:
+        interactions: InteractionMatrix to compute user similarity from
+        k: Number of neighbors kept per user
+        block_size: Users scored at once
+        """
+        ratings = interactions.ratings
+        n_users = ratings.shape[0]
+        k = max(1, min(k, n_users - 1))
+
+        return cls(
+            np.zeros((n_users, k), dtype=np.int32),
+            np.zeros((n_users, k), dtype=np.float32),
+            _row_norms(ratings),
+            ratings,
+            np.zeros(n_users, dtype=bool),
+            block_size
+        )
+
+    def to_arrays(self):
+        """Flat arrays for persisting the graph (see from_arrays); computes every row first"""
+        self.compute_all()
+        return {'neighbors': self.neighbors, 'scores': self.scores, 'norms': self.norms}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Rebuild the graph from to_arrays() output, without copying"""
+        return cls(arrays['neighbors'], arrays['scores'], arrays['norms'])
+
+    def compute_all(self):
+        """Compute every row that is not computed yet"""
+        self._compute_rows(np.flatnonzero(~self.computed))
+
+    def neighbors_of(self, user_idx, n=20):
+        """
+        The n most similar users of the user(s) at row(s) user_idx
+
+        Returns:
+        (user rows, similarities), most similar first
+        """
+        if not self.computed[user_idx].all():
+            self._compute_rows(np.unique(user_idx))
+        n = min(n, self.k)
+        return self.neighbors[user_idx, :n], self.scores[user_idx, :n]
+
+    def _normalized_ratings(self):
+        """(ratings divided by their row norms, its CSR transpose)"""
+        if self._normalized is None:
+            safe_norms = np.where(self.norms > 0, self.norms, 1).astype(np.float32)
+            normalized = sp.diags(1 / safe_norms) @ self.ratings
+            self._normalized = (normalized, normalized.T.tocsr())
+        return self._normalized
+
+    def _compute_rows(self, rows):
+        """Score the given users against everybody and keep their top-K"""
+        with self._lock:
+            rows = np.asarray(rows, dtype=np.int64)
+            rows = rows[~self.computed[rows]]
+            if len(rows) == 0:
+                return
+            self._make_writeable()
+
+            normalized, normalized_t = self._normalized_ratings()
+            for start in range(0, len(rows), self.block_size):
+                block_rows = rows[start:start + self.block_size]
+                block = (normalized[block_rows] @ normalized_t).toarray()
+
+                # A user is never their own neighbor
+                block[np.arange(len(block_rows)), block_rows] = -np.inf
+
+                top = top_n(block, self.k)
+                self.neighbors[block_rows] = top
+                self.scores[block_rows] = np.take_along_axis(block, top, axis=1)
+                self.computed[block_rows] = True
+
+    def _make_writeable(self):
+        """Private copies of memory-mapped (read-only) arrays"""
+        if not self.neighbors.flags.writeable:
+            self.neighbors = np.array(self.neighbors)
+            self.scores = np.array(self.scores)
+            self.norms = np.array(self.norms)
+
+    def _add_users(self, n_users):
+        """Grow the graph to n_users rows; the new rows are not computed"""
+        grow = n_users - len(self.norms)
+        if grow <= 0:
+            return
+        self.neighbors = np.vstack([self.neighbors, np.zeros((grow, self.k), dtype=np.int32)])
+        self.scores = np.vstack([self.scores, np.zeros((grow, self.k), dtype=np.float32)])
+        self.norms = np.concatenate([self.norms, np.zeros(grow, dtype=np.float32)])
+        self.computed = np.concatenate([self.computed, np.zeros(grow, dtype=bool)])
+
+    def refresh_user(self, ratings, user_idx):
+        """
+        Recompute one user's neighbors after their ratings changed
+
+        Also updates the user's entry in every other computed row: existing
+        entries get the new similarity, users for whom the changed user now
+        beats their weakest neighbor take it in, and rows where the
+        similarity dropped (so a user outside the stored top-K may now rank
+        higher) are recomputed on their next read.
+
+        Parameters:
+        ratings: Current CSR (users x movies) ratings, including the change
+                 (rows past the graph's last user are added)
+        user_idx: Row of the user whose ratings changed
+        """
+        with self._lock:
+            self._make_writeable()
+            self._add_users(ratings.shape[0])
+            self.ratings = ratings
+
+            user_row = ratings[user_idx]
+            self.norms[user_idx] = np.sqrt(user_row.multiply(user_row).sum())
+            self._normalized = None
+            normalized, normalized_t = self._normalized_ratings()
+            sims = (normalized[user_idx] @ normalized_t).toarray().ravel()
+            sims[user_idx] = -np.inf
+
+            # The user's own row
+            top = top_n(sims, self.k)
+            self.neighbors[user_idx] = top
+            self.scores[user_idx] = sims[top]
+            self.computed[user_idx] = True
+
+            # The user's position in everybody else's row
+            sims[user_idx] = 0
+            contains = (self.neighbors == user_idx) & self.computed[:, None]
+            row_of_entry = np.where(contains)[0]
+            old_sims = self.scores[contains]
+            self.scores[contains] = sims[row_of_entry]
+
+            weakened = row_of_entry[sims[row_of_entry] < old_sims]
+            strengthened = row_of_entry[sims[row_of_entry] >= old_sims]
+
+            newcomers = np.where(
+                self.computed & ~contains.any(axis=1) & (sims > self.scores[:, -1])
+            )[0]
+            newcomers = newcomers[newcomers != user_idx]
+            self.neighbors[newcomers, -1] = user_idx
+            self.scores[newcomers, -1] = sims[newcomers]
+
+            self._resort_rows(np.concatenate([strengthened, newcomers]))
+            self.computed[weakened] = False
+
+    def _resort_rows(self, rows):
+        """Restore most-similar-first order of the given rows"""
+        if len(rows) == 0:
+            return
+        order = np.lexsort((self.neighbors[rows], -self.scores[rows]), axis=1)
+        self.neighbors[rows] = np.take_along_axis(self.neighbors[rows], order, axis=1)
+        self.scores[rows] = np.take_along_axis(self.scores[rows], order, axis=1)
+
+    def memory_usage(self):
+        """Bytes held by the graph arrays"""
+        return self.neighbors.nbytes + self.scores.nbytes + self.norms.nbytes